@@ -1,79 +1,68 @@
 import threading
-import queue
 import random
-import time
 import csv
-import matplotlib.pyplot as plt
-
-class Customer:
-    def __init__(self, customer_id, arrival_time):
-        self.customer_id = customer_id
-        self.arrival_time = arrival_time
-        self.start_time = None
-        self.end_time = None
-        self.teller_id = None  
-
-class Teller(threading.Thread):
-    def __init__(self, teller_id, customer_queue, data_lock, timing_data, customer_count):
-        threading.Thread.__init__(self)
-        self.teller_id = teller_id
-        self.customer_queue = customer_queue
-        self.data_lock = data_lock
-        self.timing_data = timing_data
-        self.customer_count = customer_count
-        self.daemon = True
-        self.start()
-
-    def run(self):
-        while True:
-            customer = self.customer_queue.get()
-            if customer is None:
-                break
-            with self.data_lock:
-                customer.start_time = time.time()
-                customer.teller_id = self.teller_id  
-                self.customer_count[self.teller_id] += 1  # Increment the counter for this teller
-            print(f"Customer {customer.customer_id} is in Teller {self.teller_id}")
-            service_time = random.randint(1, 5)
-            time.sleep(service_time)  
-            with self.data_lock:
-                customer.end_time = time.time()
-                self.timing_data.append(customer)
-            print(f"Customer {customer.customer_id} leaves Teller {self.teller_id}")
-            self.customer_queue.task_done()
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from eventLog import DEPARTURE, DISPATCH, ENQUEUE, EventLog, from_argv
+from policies import ARRIVAL_TIME, CUSTOMER_ID, FIRST_START_TIME
+from report import report_from_argv
+from simClock import clock, format_overshoot, from_argv as clock_from_argv
+from threadedTellers import STOP, PolicyQueue, new_customer, serve
+
+# Buffered event log for the teller hot paths; written by a background thread once started
+event_log = EventLog()
+
+# Charts for this run; set from --report DIR, None skips plotting entirely
+report = None
 
 def main():
     num_tellers = 3
-    customer_queue = queue.Queue(maxsize=10)
+    customer_queue = PolicyQueue("FCFS", maxsize=10)
     data_lock = threading.Lock()
-    timing_data = []
+    timing_data = []  # (customer, start time, end time) for every customer served
     customer_count = {i: 0 for i in range(1, num_tellers + 1)}  # Dictionary to count customers attended by each teller
 
-    tellers = [Teller(i, customer_queue, data_lock, timing_data, customer_count) for i in range(1, num_tellers + 1)]
+    # Teller callbacks for threadedTellers.serve()
+    def started(teller_id, customer, start_time):
+        with data_lock:
+            customer_count[teller_id] += 1  # Increment the counter for this teller
+        event_log.record(DISPATCH, customer[CUSTOMER_ID], teller_id)
+
+    def departed(teller_id, customer, start_time, end_time):
+        with data_lock:
+            timing_data.append((customer, start_time, end_time))
+        event_log.record(DEPARTURE, customer[CUSTOMER_ID], teller_id)
+
+    tellers = [threading.Thread(target=serve, args=(i, customer_queue, departed, started), daemon=True)
+               for i in range(1, num_tellers + 1)]
+    for teller in tellers:
+        teller.start()
 
     customer_id = 1
     try:
         while customer_id <= 50:  # Limit number of customers for demonstration
-            if not customer_queue.full():
-                arrival_time = time.time()
-                customer = Customer(customer_id, arrival_time)
-                print(f"Customer {customer.customer_id} enters the Queue")
-                customer_queue.put(customer)
-                customer_id += 1
-                time.sleep(random.uniform(0.5, 1.5))  # Random arrival time
-            else:
-                print("Queue is FULL.")
+            arrival_time = clock.time()
+            service_time = random.randint(1, 5)
+            event_log.record(ENQUEUE, customer_id, value=service_time)
+            customer_queue.put(new_customer(customer_id, arrival_time, service_time))  # Waits while the queue is full
+            customer_id += 1
+            clock.sleep(random.uniform(0.5, 1.5))  # Random arrival time
     except KeyboardInterrupt:
         pass
     finally:
-        # Signal the tellers to stop
+        # Signal the tellers to stop once the queue has drained
         for teller in tellers:
-            customer_queue.put(None)
+            customer_queue.put(STOP)
 
         # Ensure all threads have finished
         for teller in tellers:
             teller.join()
 
+        # Console events first, so they do not land inside the stats block
+        event_log.flush()
         # Write the data to a CSV file
         write_to_csv(timing_data, customer_count)
 
@@ -82,10 +71,10 @@ def write_to_csv(timing_data, customer_count):
     total_waiting_time = 0
     total_response_time = 0
 
-    for customer in timing_data:
-        total_turnaround_time += customer.end_time - customer.arrival_time
-        total_waiting_time += customer.start_time - customer.arrival_time
-        total_response_time += customer.start_time - customer.arrival_time  # This is the time when they enter the queue
+    for customer, start_time, end_time in timing_data:
+        total_turnaround_time += end_time - customer[ARRIVAL_TIME]
+        total_waiting_time += start_time - customer[ARRIVAL_TIME]
+        total_response_time += customer[FIRST_START_TIME] - customer[ARRIVAL_TIME]  # This is the time when they enter the queue
 
     num_customers = len(timing_data)
 
@@ -103,17 +92,22 @@ def write_to_csv(timing_data, customer_count):
     generate_graph(avg_turnaround_time, avg_waiting_time, avg_response_time)
 
 def generate_graph(avg_turnaround_time, avg_waiting_time, avg_response_time):
-    labels = ['Turnaround Time', 'Waiting Time', 'Response Time']
-    values = [avg_turnaround_time, avg_waiting_time, avg_response_time]
-
-    plt.figure(figsize=(8, 6))
-    plt.plot(labels, values, marker='o', linestyle='-')
-    plt.xlabel('Metrics')
-    plt.ylabel('Time (seconds)')
-    plt.title('Average Turnaround Time, Waiting Time, and Response Time')
-    plt.grid(True)  # Add grid lines
-    plt.show()
+    if report is not None:
+        report.averages("FCFS averages", avg_turnaround_time, avg_waiting_time, avg_response_time)
 
 
 if __name__ == "__main__":
-    main()
+    # Optional: --report DIR renders the chart to a PNG file once the run ends
+    report = report_from_argv(sys.argv)
+    # Optional: --speedup N runs the threaded tellers N times faster; times stay in simulated seconds
+    clock_from_argv(sys.argv)
+    # Optional: --log-level debug|info|warning|off and --log-file events.ndjson|events.bin
+    event_log = from_argv(sys.argv).start()
+    try:
+        main()
+    finally:
+        event_log.close()
+    print(format_overshoot(clock.report()))
+    if report is not None:
+        for path in report.render():
+            print(f"Wrote {path}")
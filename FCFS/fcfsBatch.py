@@ -0,0 +1,104 @@
+import heapq
+import time
+
+import numpy as np
+
+
+# Multi-server FCFS in one pass over NumPy arrays, without threads or Customer objects.
+# Customers are served in arrival order, each by the teller with the earliest
+# free time, even when several are already idle; only tellers that free up at
+# exactly the same time go by lowest teller id. Start and end times match the
+# threaded Teller pool in fcfsAlgorithm.py when tellers never sit idle with
+# customers waiting, though which idle teller gets a customer may differ.
+# Returns a dict of start, end, waiting, turnaround and teller arrays.
+def fcfs_batch(arrival_times, service_times, num_tellers):
+    arrival_times = np.asarray(arrival_times, dtype=np.float64)
+    service_times = np.asarray(service_times, dtype=np.float64)
+    if arrival_times.shape != service_times.shape or arrival_times.ndim != 1:
+        raise ValueError("arrival_times and service_times must be 1-D arrays of the same length")
+    if num_tellers < 1:
+        raise ValueError("num_tellers must be at least 1")
+
+    order = np.argsort(arrival_times, kind="stable")
+    arrivals = arrival_times[order]
+    services = service_times[order]
+
+    if num_tellers == 1:
+        # Lindley recursion end[i] = max(arrival[i], end[i-1]) + service[i], unrolled into
+        # end[i] = cumsum[i] + max over j <= i of (arrival[j] - cumsum[j-1])
+        cumulative = np.cumsum(services)
+        previous = cumulative - services
+        ends = cumulative + np.maximum.accumulate(arrivals - previous)
+        starts = ends - services
+        tellers = np.ones(len(arrivals), dtype=np.int32)
+    else:
+        starts, tellers = _dispatch(arrivals.tolist(), services.tolist(), num_tellers)
+        starts = np.array(starts, dtype=np.float64)
+        tellers = np.array(tellers, dtype=np.int32)
+        ends = starts + services
+
+    # Put results back in the caller's order
+    result_starts = np.empty_like(starts)
+    result_starts[order] = starts
+    result_ends = np.empty_like(ends)
+    result_ends[order] = ends
+    result_tellers = np.empty_like(tellers)
+    result_tellers[order] = tellers
+    return {
+        "start_times": result_starts,
+        "end_times": result_ends,
+        "waiting_times": result_starts - arrival_times,
+        "turnaround_times": result_ends - arrival_times,
+        "teller_ids": result_tellers,
+    }
+
+
+# Heap of (free_time, teller_id): each customer takes the earliest free teller
+def _dispatch(arrivals, services, num_tellers):
+    free = [(0.0, teller_id) for teller_id in range(1, num_tellers + 1)]
+    starts = [0.0] * len(arrivals)
+    tellers = [0] * len(arrivals)
+    heapreplace = heapq.heapreplace
+    for i, arrival in enumerate(arrivals):
+        free_time, teller_id = free[0]
+        start = arrival if arrival > free_time else free_time
+        starts[i] = start
+        tellers[i] = teller_id
+        heapreplace(free, (start + services[i], teller_id))
+    return starts, tellers
+
+
+# The same summary write_to_csv prints, computed from fcfs_batch output
+def summarize(result, num_tellers):
+    waiting_times = result["waiting_times"]
+    counts = np.bincount(result["teller_ids"], minlength=num_tellers + 1)
+    return {
+        "avg_turnaround_time": float(result["turnaround_times"].mean()),
+        "avg_waiting_time": float(waiting_times.mean()),
+        "avg_response_time": float(waiting_times.mean()),  # Response equals waiting for non-preemptive FCFS
+        "customer_count": {teller_id: int(counts[teller_id]) for teller_id in range(1, num_tellers + 1)},
+    }
+
+
+if __name__ == "__main__":
+    num_customers = 10_000_000
+    # fcfsAlgorithm.py's three tellers would run at 100% utilization on these distributions,
+    # where waits grow without bound over millions of customers; a fourth keeps it near 75%
+    num_tellers = 4
+    rng = np.random.default_rng(1)
+    # Same distributions as fcfsAlgorithm.py: 0.5-1.5 s between arrivals, 1-5 s of service
+    arrival_times = np.cumsum(rng.uniform(0.5, 1.5, num_customers))
+    service_times = rng.integers(1, 6, num_customers).astype(np.float64)
+    utilization = service_times.sum() / (num_tellers * arrival_times[-1])
+
+    started = time.perf_counter()
+    result = fcfs_batch(arrival_times, service_times, num_tellers)
+    elapsed = time.perf_counter() - started
+    summary = summarize(result, num_tellers)
+    print(f"{num_customers:,} customers on {num_tellers} tellers in {elapsed:.2f} seconds")
+    print(f"Offered utilization: {utilization:.1%}")
+    print(f"Average Turnaround Time: {summary['avg_turnaround_time']:.2f} seconds")
+    print(f"Average Waiting Time: {summary['avg_waiting_time']:.2f} seconds")
+    print(f"Average Response Time: {summary['avg_response_time']:.2f} seconds")
+    for teller_id, count in summary["customer_count"].items():
+        print(f"Teller {teller_id} attended {count} customers")
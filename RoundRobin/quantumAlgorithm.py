@@ -1,8 +1,23 @@
 import threading
-import time
 import random
-import queue
-import matplotlib.pyplot as plt
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from accumulators import ShardedStats, StreamingStats
+from admission import BALKED, BoundedWait, format_admission, from_argv as admission_from_argv
+from completion import CompletionTracker
+from contention import InstrumentedLock, format_report
+from eventLog import BALK, DEPARTURE, DISPATCH, DROP, ENQUEUE, INFO, PREEMPT, WARNING, EventLog, from_argv
+from policies import ARRIVAL_TIME, CUSTOMER_ID, FIRST_START_TIME, REMAINING_TIME, SERVICE_TIME
+from report import report_from_argv
+from rrQueue import RoundRobinQueue
+from simClock import clock, format_overshoot, from_argv as clock_from_argv
+from threadedTellers import STOP, new_customer, serve
+
+# Charts for this run; set from --report DIR, None skips plotting entirely
+report = None
 
 # Constants
 NUM_TELLERS = 3
@@ -10,26 +25,33 @@ QUEUE_CAPACITY = 10
 MAX_SERVICE_DURATION = 8
 TIME_QUANTUM = 2
 
-# Shared queue for customers
-customer_queue = queue.Queue(QUEUE_CAPACITY)
-
-# Statistics dictionaries
-arrival_times = {}
-service_durations = {}
-completion_times = {}
-first_service_start_times = {}
-remaining_service_times = {}
-turnaround_times = []
-waiting_times = []
-response_times = []
+# Shared ready queue: QUEUE_CAPACITY bounds new arrivals only, preempted customers are always requeued
+customer_queue = RoundRobinQueue(QUEUE_CAPACITY, TIME_QUANTUM)
+
+# Totals; each customer's own times travel with its record (threadedTellers.new_customer)
+turnaround_times = StreamingStats()
+waiting_times = StreamingStats()
+response_times = StreamingStats()
 customers_served_by_teller = {i: 0 for i in range(1, NUM_TELLERS + 1)}
 
-# Lock for safe updates to statistics
-stats_lock = threading.Lock()
+# Per-teller statistics buffers, merged into the totals above by merge_teller_stats()
+teller_stats = ShardedStats(("turnaround_times", "waiting_times", "response_times"))
+
+# Lock for the shared totals; instrumented to show contention
+stats_lock = InstrumentedLock()
 
 # Event to stop threads
 stop_simulation = threading.Event()
 
+# Customers admitted but not yet departed; main_simulation() sleeps on it until the last one leaves
+completion = CompletionTracker()
+
+# Admission control for arrivals at a full queue; never blocks the arrival generator
+admission = BoundedWait(1.0)
+
+# Buffered event log for the teller hot paths; written by a background thread once started
+event_log = EventLog()
+
 def clear_queue(q):
     while not q.empty():
         q.get()
@@ -37,49 +59,47 @@ def clear_queue(q):
 # Function to simulate customer arrival
 def simulate_customer_arrival(customer_id):
     service_duration = random.randint(3, MAX_SERVICE_DURATION)
-    arrival_timestamp = time.time()
-    with stats_lock:
-        arrival_times[customer_id] = arrival_timestamp
-        service_durations[customer_id] = service_duration
-        remaining_service_times[customer_id] = service_duration
-    print(f"Customer {customer_id} arrives with service time {service_duration}")
-    try:
-        customer_queue.put((service_duration, customer_id), timeout=1)
-    except queue.Full:
-        print("Queue is FULL.")
+    completion.admit()  # Outstanding until it departs or customer_rejected() cancels it
+    admission.offer(new_customer(customer_id, clock.time(), service_duration))  # Admits, turns away or hands to a waiting room at once
+
+# Called by the admission stage, possibly from its own thread, once a customer is in the
+# ready queue. The customer record itself carries its times through the queue.
+def customer_admitted(customer):
+    event_log.record(ENQUEUE, customer[CUSTOMER_ID], value=customer[SERVICE_TIME])
 
-# Round Robin teller service function
+# Called by the admission stage, possibly from its own thread, for customers it turned away
+def customer_rejected(customer, outcome):
+    customer_id = customer[CUSTOMER_ID]
+    completion.cancel()
+    if outcome == BALKED:
+        event_log.record(BALK, customer_id, value=admission.waiting(), level=INFO)
+    else:
+        event_log.record(DROP, customer_id, level=WARNING)
+
+# Teller callbacks for threadedTellers.serve(); each runs on the teller's own thread.
+# This teller's counter is only written by this teller.
+def customer_started(teller_id, customer, start_timestamp):
+    customer_id = customer[CUSTOMER_ID]
+    if customer[FIRST_START_TIME] == start_timestamp:
+        teller_stats.shard(teller_id)["response_times"].add(start_timestamp - customer[ARRIVAL_TIME])
+    customers_served_by_teller[teller_id] += 1  # Increment the counter for this teller
+    event_log.record(DISPATCH, customer_id, teller_id)
+
+def customer_requeued(teller_id, customer):
+    completion.requeue()
+    event_log.record(PREEMPT, customer[CUSTOMER_ID], teller_id, customer[REMAINING_TIME])
+
+def customer_departed(teller_id, customer, start_timestamp, end_timestamp):
+    customer_id = customer[CUSTOMER_ID]
+    stats = teller_stats.shard(teller_id)  # This teller's own accumulators, recorded without a lock
+    stats["turnaround_times"].add(end_timestamp - customer[ARRIVAL_TIME])
+    stats["waiting_times"].add(start_timestamp - customer[ARRIVAL_TIME])
+    event_log.record(DEPARTURE, customer_id, teller_id)
+    completion.depart()
+
+# Round Robin teller service function: at most TIME_QUANTUM per turn, then back to the tail
 def teller_round_robin_service(teller_id):
-    while not stop_simulation.is_set():
-        try:
-            service_duration, customer_id = customer_queue.get(timeout=1)
-            start_timestamp = time.time()
-            with stats_lock:
-                if customer_id not in first_service_start_times:
-                    first_service_start_times[customer_id] = start_timestamp
-                    response_times.append(start_timestamp - arrival_times[customer_id])
-                customers_served_by_teller[teller_id] += 1  # Increment the counter for this teller
-            print(f"Customer {customer_id} is at Teller {teller_id} for {TIME_QUANTUM} seconds")
-            if service_duration <= TIME_QUANTUM:
-                time.sleep(service_duration)
-                end_timestamp = time.time()
-                with stats_lock:
-                    completion_times[customer_id] = end_timestamp
-                    turnaround_time = end_timestamp - arrival_times[customer_id]
-                    turnaround_times.append(turnaround_time)
-                    waiting_time = start_timestamp - arrival_times[customer_id]
-                    waiting_times.append(waiting_time)
-                    remaining_service_times.pop(customer_id, None)
-                print(f"Customer {customer_id} completed at Teller {teller_id}")
-            else:
-                time.sleep(TIME_QUANTUM)
-                remaining_time = service_duration - TIME_QUANTUM
-                with stats_lock:
-                    remaining_service_times[customer_id] = remaining_time
-                customer_queue.put((remaining_time, customer_id))
-                print(f"Customer {customer_id} remaining service time: {remaining_time} seconds")
-        except queue.Empty:
-            continue
+    serve(teller_id, customer_queue, customer_departed, customer_started, customer_requeued, stop_simulation)
 
 # Function to start teller threads
 def launch_teller_threads(service_function):
@@ -90,53 +110,93 @@ def launch_teller_threads(service_function):
         threads.append(thread)
     return threads
 
+# Wake every teller with a STOP item so it exits at once, then join them.
+# After an interrupt the tellers leave on their own once they see stop_simulation.
+def stop_teller_threads(threads):
+    if not stop_simulation.is_set():
+        for _ in threads:
+            customer_queue.put(STOP)
+    for thread in threads:
+        thread.join()
+
 # Main function to handle customer arrivals and manage simulation
 def main_simulation(service_function, description):
     clear_queue(customer_queue)
+    admission.attach(customer_queue, QUEUE_CAPACITY, on_admit=customer_admitted, on_reject=customer_rejected)
     customer_id = 1
+    start_timestamp = clock.time()
     try:
         tellers = launch_teller_threads(service_function)
         while customer_id <= 50:
             simulate_customer_arrival(customer_id)
             customer_id += 1
-            time.sleep(random.uniform(0.5, 2))  # Randomized inter-arrival time
+            clock.sleep(random.uniform(0.5, 2))  # Randomized inter-arrival time
     except KeyboardInterrupt:
         print("Simulation interrupted.")
         stop_simulation.set()
     finally:
-        for teller in tellers:
-            teller.join()
+        completion.close()
+        if not stop_simulation.is_set():
+            completion.wait()  # Returns the moment the last admitted customer departs
+        admission.close(discard=stop_simulation.is_set())
+        stop_teller_threads(tellers)
         compute_statistics(description)
+        print(format_admission(admission.report(completion.summary()["departed"], clock.time() - start_timestamp)))
+        print(format_overshoot(clock.report()))
+        clock.reset()
+        completion.reset()
         stop_simulation.clear()
 
+# Fold the per-teller buffers into the totals; called once the tellers have stopped
+def merge_teller_stats():
+    with stats_lock:
+        teller_stats.merge_into({"turnaround_times": turnaround_times, "waiting_times": waiting_times,
+                                 "response_times": response_times})
+        teller_stats.clear()
+
 # Function to compute and display statistics
 def compute_statistics(description):
+    event_log.flush()  # Console events first, so they do not land inside the stats block
+    merge_teller_stats()
     with stats_lock:
-        avg_turnaround_time = sum(turnaround_times) / len(turnaround_times)
-        avg_waiting_time = sum(waiting_times) / len(waiting_times)
-        avg_response_time = sum(response_times) / len(response_times)
+        avg_turnaround_time = turnaround_times.mean
+        avg_waiting_time = waiting_times.mean
+        avg_response_time = response_times.mean
     print(f"\nStatistics for {description}:")
     print(f"Average Turnaround Time: {avg_turnaround_time:.4f} seconds")
     print(f"Average Waiting Time: {avg_waiting_time:.4f} seconds")
     print(f"Average Response Time: {avg_response_time:.4f} seconds")
     for teller_id, count in customers_served_by_teller.items():
         print(f"Teller {teller_id} attended {count} customers")
+    if completion.shutdown_latency is not None:
+        print(f"Shutdown latency: {completion.shutdown_latency * 1000:.2f} ms after the last departure")
+    print(format_report("Stats lock", stats_lock.report()))
+    queue_report = customer_queue.report()
+    print(f"Context switches: {queue_report['context_switches']} "
+          f"(avg {queue_report['avg_switches_per_quantum']:.2f}, max {queue_report['max_switches_per_quantum']} per {TIME_QUANTUM}s quantum)")
+    print(f"Queue depth: avg {queue_report['avg_queue_depth']:.2f}, max {queue_report['max_queue_depth']}")
     generate_graph(avg_turnaround_time, avg_waiting_time, avg_response_time)
 
 # Function to plot statistics
 def generate_graph(avg_turnaround_time, avg_waiting_time, avg_response_time):
-    labels = ['Turnaround Time', 'Waiting Time', 'Response Time']
-    values = [avg_turnaround_time, avg_waiting_time, avg_response_time]
-
-    plt.figure(figsize=(8, 6))
-    plt.plot(labels, values, marker='o', linestyle='-')
-    plt.xlabel('Metrics')
-    plt.ylabel('Time (seconds)')
-    plt.title('Average Turnaround Time, Waiting Time, and Response Time')
-    plt.grid(True)  # Add grid lines
-    plt.show()
+    if report is not None:
+        report.averages("Round Robin averages", avg_turnaround_time, avg_waiting_time, avg_response_time)
 
 
 # Execute the simulation
 if __name__ == "__main__":
-    main_simulation(teller_round_robin_service, "Round Robin Scheduling")
+    # Optional: --log-level debug|info|warning|off and --log-file events.ndjson|events.bin
+    event_log = from_argv(sys.argv).start()
+    # Optional: --admission reject|balk|wait|overflow for arrivals that find the queue full
+    admission = admission_from_argv(sys.argv)
+    # Optional: --report DIR renders the chart to a PNG file once the run ends
+    report = report_from_argv(sys.argv)
+    # Optional: --speedup N runs the threaded tellers N times faster; times stay in simulated seconds
+    clock_from_argv(sys.argv)
+    try:
+        main_simulation(teller_round_robin_service, "Round Robin Scheduling")
+    finally:
+        event_log.close()
+    if report is not None:
+        for path in report.render():
+            print(f"Wrote {path}")
@@ -1,49 +1,143 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.dates import date2num
-from matplotlib.ticker import MultipleLocator, FixedFormatter
-
-# Read the data from the CSV file
-data = pd.read_csv("./RoundRobin/rrData.csv")
-
-# Convert entering and exiting time columns to datetime objects
-data["Entering Time"] = pd.to_datetime(data["Entering Time"], unit="s")
-data["Exiting Time"] = pd.to_datetime(data["Exiting Time"], unit="s")
-
-# Calculate the duration of each task
-data["Duration"] = data["Exiting Time"] - data["Entering Time"]
-
-# Set up the figure and axis
-fig, ax = plt.subplots(figsize=(12, 8))
-
-# Plot each task as a horizontal bar
-for i, row in data.iterrows():
-    ax.barh(row["Customer ID"], row["Duration"].total_seconds() / 3600, left=date2num(row["Entering Time"]),
-            color="skyblue", edgecolor="black")
-
-# Set y-axis labels and ticks
-ax.set_yticks(data["Customer ID"])
-ax.set_yticklabels(["Customer " + str(cid) for cid in data["Customer ID"]])
-ax.invert_yaxis()  # Invert y-axis to have Customer 1 at the top
-
-# Set x-axis labels and ticks
-ax.xaxis_date()  # Set x-axis as dates
-ax.set_xlabel("Time")
-ax.xaxis.set_major_locator(MultipleLocator(1))  # Set major ticks every 1 hour
-ax.xaxis.set_minor_locator(MultipleLocator(0.25))  # Set minor ticks every 15 minutes
-ax.xaxis.set_major_formatter(FixedFormatter(["{:02d}:{:02d}".format(int(h), int(m)) for h, m in 
-                                             zip(range(24), [0]*24)]))  # Format major ticks as hours:minutes
-
-# Add grid lines
-ax.grid(True, which='both', linestyle='--', linewidth=0.5)
-
-# Add title and labels
-ax.set_title("Gantt Chart for Customer Service")
-ax.set_ylabel("Customer")
-plt.tight_layout()
-
-# Save the plot as an image file (optional)
-plt.savefig("gantt_chart.png")
-
-# Show the plot
-plt.show()
+import sys
+import time
+
+import numpy as np
+
+CSV_PATH = "./RoundRobin/rrData.csv"
+BAR_HEIGHT = 0.8
+MAX_LABELLED_ROWS = 50
+
+
+# Read quantum slices from the Round Robin CSV ("Customer ID", "Entering Time",
+# "Exiting Time", optionally "Teller ID"). Rows of the chart are tellers when
+# the teller column is present, customers otherwise. Times become seconds
+# since the first slice.
+def load_segments(path=CSV_PATH):
+    import pandas as pd
+
+    data = pd.read_csv(path)
+    row_column = "Teller ID" if "Teller ID" in data.columns else "Customer ID"
+    starts = data["Entering Time"].to_numpy(dtype=np.float64)
+    ends = data["Exiting Time"].to_numpy(dtype=np.float64)
+    origin = starts.min() if len(starts) else 0.0
+    return data[row_column].to_numpy(dtype=np.int64), starts - origin, ends - origin, row_column.replace(" ID", "")
+
+
+# Random non-overlapping slices on a few tellers, for trying the renderer at scale
+def synthetic_segments(num_segments, num_tellers=8, seed=1):
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(1, num_tellers + 1, num_segments)
+    durations = rng.uniform(0.5, 2.0, num_segments)
+    gaps = rng.exponential(0.3, num_segments)
+    order = np.argsort(rows, kind="stable")
+    rows, durations, gaps = rows[order], durations[order], gaps[order]
+    # Lay each teller's slices end to end, restarting the clock at every new teller
+    step = durations + gaps
+    cumulative = np.cumsum(step)
+    first = np.r_[0, np.flatnonzero(np.diff(rows)) + 1]
+    offsets = np.repeat(cumulative[first] - step[first], np.diff(np.r_[first, len(rows)]))
+    ends = cumulative - offsets - gaps
+    return rows, ends - durations, ends, "Teller"
+
+
+# Sort slices by row, then by start time
+def sort_segments(rows, starts, ends):
+    order = np.lexsort((starts, rows))
+    return rows[order], starts[order], ends[order]
+
+
+# Merge slices of the same row that are closer than min_gap (e.g. one pixel of
+# time) into a single bar. Input must be sorted by row then start, and slices
+# in one row must not overlap (a teller serves one customer at a time).
+def merge_segments(rows, starts, ends, min_gap):
+    if len(rows) < 2 or min_gap <= 0:
+        return rows, starts, ends
+    new_group = np.empty(len(rows), dtype=bool)
+    new_group[0] = True
+    new_group[1:] = (rows[1:] != rows[:-1]) | (starts[1:] - ends[:-1] > min_gap)
+    first = np.flatnonzero(new_group)
+    return rows[first], starts[first], np.maximum.reduceat(ends, first)
+
+
+# Rectangle vertices for a PolyCollection, shape (n, 4, 2)
+def bar_vertices(rows, starts, ends):
+    bottom = rows - BAR_HEIGHT / 2
+    top = rows + BAR_HEIGHT / 2
+    verts = np.empty((len(rows), 4, 2))
+    verts[:, 0, 0] = verts[:, 1, 0] = starts
+    verts[:, 2, 0] = verts[:, 3, 0] = ends
+    verts[:, 0, 1] = verts[:, 3, 1] = bottom
+    verts[:, 1, 1] = verts[:, 2, 1] = top
+    return verts
+
+
+# Gantt chart drawn as one PolyCollection. Only the slices inside the visible
+# time range are drawn, merged down to the resolution of the axes, and the
+# collection is rebuilt whenever the x-limits change (zoom or pan).
+class GanttChart:
+    def __init__(self, ax, rows, starts, ends):
+        from matplotlib.collections import PolyCollection
+
+        self.ax = ax
+        self.rows, self.starts, self.ends = sort_segments(rows, starts, ends)
+        self.unique_rows = np.unique(self.rows)
+        self.collection = PolyCollection([], cmap="tab10", edgecolors="face", linewidths=0)
+        ax.add_collection(self.collection)
+        ax.set_xlim(0, self.ends.max())
+        ax.set_ylim(self.unique_rows.min() - 1, self.unique_rows.max() + 1)
+        self.refresh()
+        ax.callbacks.connect("xlim_changed", lambda _: self.refresh())
+
+    def visible_segments(self, xmin, xmax):
+        visible = (self.ends >= xmin) & (self.starts <= xmax)
+        return self.rows[visible], self.starts[visible], self.ends[visible]
+
+    def refresh(self):
+        xmin, xmax = self.ax.get_xlim()
+        width_pixels = max(1, self.ax.get_window_extent().width)
+        rows, starts, ends = self.visible_segments(xmin, xmax)
+        rows, starts, ends = merge_segments(rows, starts, ends, (xmax - xmin) / width_pixels)
+        self.collection.set_verts(bar_vertices(rows, starts, ends))
+        self.collection.set_array(rows % 10)
+        self.drawn = len(rows)
+
+
+# Save the chart to `output` and/or open it in a window, where zooming and
+# panning redraw the visible range
+def render(rows, starts, ends, row_label, output=None, show=False):
+    import matplotlib
+    if not show:
+        matplotlib.use("Agg")  # Headless: render straight to the file
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(12, 8))
+    chart = GanttChart(ax, rows, starts, ends)
+    if len(chart.unique_rows) <= MAX_LABELLED_ROWS:
+        ax.set_yticks(chart.unique_rows)
+        ax.set_yticklabels([f"{row_label} {row}" for row in chart.unique_rows])
+    ax.invert_yaxis()  # Invert y-axis to have the first row at the top
+    ax.set_xlabel("Time (seconds since first slice)")
+    ax.set_ylabel(row_label)
+    ax.set_title("Gantt Chart for Customer Service")
+    ax.grid(True, which="both", linestyle="--", linewidth=0.5)
+    plt.tight_layout()
+    chart.refresh()
+    if output is not None:
+        fig.savefig(output)
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
+    return chart
+
+
+if __name__ == "__main__":
+    # Usage: python RoundRobin/quantumPlot.py [--output gantt_chart.png] [--show] [--synthetic N]
+    output = sys.argv[sys.argv.index("--output") + 1] if "--output" in sys.argv else "gantt_chart.png"
+    started = time.perf_counter()
+    if "--synthetic" in sys.argv:
+        segments = synthetic_segments(int(sys.argv[sys.argv.index("--synthetic") + 1]))
+    else:
+        segments = load_segments()
+    chart = render(*segments, output=output, show="--show" in sys.argv)
+    print(f"Rendered {len(segments[0]):,} slices as {chart.drawn:,} bars in {time.perf_counter() - started:.2f} seconds")
@@ -0,0 +1,148 @@
+import queue
+import threading
+import time
+from collections import deque
+
+from policies import REMAINING_TIME
+from simClock import clock
+
+
+# Ready queue for Round Robin tellers.
+# New arrivals go through put(), which honours the admission bound and the
+# usual block/timeout semantics of queue.Queue. Customers whose quantum
+# expired go back through requeue(), which never blocks, so tellers cannot
+# deadlock on a queue that arrivals have filled. Both share one FIFO order.
+# Tellers running threadedTellers.serve() put policies customer records and
+# take (customer, time_slice) from next_slice(), at most one quantum each.
+# The queue also records context switches and the time-weighted queue depth
+# in constant memory.
+class RoundRobinQueue:
+    def __init__(self, admission_limit=0, quantum=1):
+        self.admission_limit = admission_limit  # 0 means unbounded, as with queue.Queue
+        self.quantum = quantum
+        self.ready = deque()  # (item, is_new_arrival) in service order
+        self.unstarted = 0  # Admitted arrivals that have not had a quantum yet
+        self.mutex = threading.Lock()
+        self.not_empty = threading.Condition(self.mutex)
+        self.not_full = threading.Condition(self.mutex)
+
+        # Instrumentation
+        self.started = clock.time()
+        self.context_switches = 0
+        self.window = 0  # Index of the current quantum-length window
+        self.window_switches = 0  # Context switches in it so far
+        self.max_switches_per_quantum = 0
+        self.depth = 0  # Queue depth since last_change
+        self.last_change = self.started
+        self.depth_area = 0.0  # Integral of the depth over time up to last_change
+        self.max_depth = 0
+
+    # Called after every change to the ready deque
+    def _record_depth(self, now):
+        self.depth_area += self.depth * (now - self.last_change)
+        self.last_change = now
+        self.depth = len(self.ready)
+        if self.depth > self.max_depth:
+            self.max_depth = self.depth
+
+    def put(self, item, block=True, timeout=None):
+        with self.not_full:
+            if self.admission_limit > 0:
+                if not block:
+                    if self.unstarted >= self.admission_limit:
+                        raise queue.Full
+                elif timeout is None:
+                    while self.unstarted >= self.admission_limit:
+                        self.not_full.wait()
+                else:
+                    deadline = time.monotonic() + timeout
+                    while self.unstarted >= self.admission_limit:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise queue.Full
+                        self.not_full.wait(remaining)
+            self.ready.append((item, True))
+            self.unstarted += 1
+            self._record_depth(clock.time())
+            self.not_empty.notify()
+
+    def put_nowait(self, item):
+        self.put(item, block=False)
+
+    # Put a preempted customer back at the tail; never blocks and never counts
+    # against the admission bound
+    def requeue(self, item):
+        with self.mutex:
+            now = clock.time()
+            self.ready.append((item, False))
+            self.context_switches += 1
+            window = int((now - self.started) // self.quantum)
+            if window != self.window:
+                self.window = window
+                self.window_switches = 0
+            self.window_switches += 1
+            if self.window_switches > self.max_switches_per_quantum:
+                self.max_switches_per_quantum = self.window_switches
+            self._record_depth(now)
+            self.not_empty.notify()
+
+    def get(self, block=True, timeout=None):
+        with self.not_empty:
+            if not block:
+                if not self.ready:
+                    raise queue.Empty
+            elif timeout is None:
+                while not self.ready:
+                    self.not_empty.wait()
+            else:
+                deadline = time.monotonic() + timeout
+                while not self.ready:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise queue.Empty
+                    self.not_empty.wait(remaining)
+            item, is_new_arrival = self.ready.popleft()
+            if is_new_arrival:
+                self.unstarted -= 1
+                self.not_full.notify()
+            self._record_depth(clock.time())
+            return item
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def next_slice(self, timeout=None):
+        customer = self.get(timeout=timeout)
+        return customer, min(customer[REMAINING_TIME], self.quantum)
+
+    # Nothing to forget: a departed customer is simply never requeued
+    def complete(self, customer):
+        pass
+
+    def qsize(self):
+        with self.mutex:
+            return len(self.ready)
+
+    def empty(self):
+        with self.mutex:
+            return not self.ready
+
+    def full(self):
+        with self.mutex:
+            return 0 < self.admission_limit <= self.unstarted
+
+    # Summary of the instrumentation collected so far. Averages are over time:
+    # every quantum-length window since the start counts, switches or not.
+    def report(self):
+        with self.mutex:
+            now = clock.time()
+            elapsed = now - self.started
+            windows = int(elapsed // self.quantum) + 1
+            area = self.depth_area + self.depth * (now - self.last_change)
+            return {
+                "context_switches": self.context_switches,
+                "avg_switches_per_quantum": self.context_switches / windows,
+                "max_switches_per_quantum": self.max_switches_per_quantum,
+                "avg_queue_depth": area / elapsed if elapsed > 0 else float(self.depth),
+                "max_queue_depth": self.max_depth,
+            }
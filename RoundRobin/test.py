@@ -3,6 +3,16 @@ import time
 import random
 import queue
 from collections import deque
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from accumulators import StreamingStats
+from eventLog import DEPARTURE, DISPATCH, DROP, ENQUEUE, WARNING, EventLog, from_argv
+from policies import ARRIVAL_TIME, CUSTOMER_ID
+from simClock import clock, format_overshoot, from_argv as clock_from_argv
+from threadedTellers import STOP, PolicyQueue, new_customer, serve
 
 # Constants
 NUM_TELLERS = 3
@@ -10,15 +20,12 @@ QUEUE_SIZE = 10
 MAX_SERVICE_TIME = 8
 QUANTUM_TIME = 2
 
-# Thread-safe queue for customers
-customer_queue = queue.Queue(QUEUE_SIZE)
+# Thread-safe Round Robin queue for customers; QUEUE_SIZE bounds new arrivals only
+customer_queue = PolicyQueue("RR", QUEUE_SIZE, QUANTUM_TIME)
 
 # Statistics tracking
-arrival_times = {}
-service_times = {}
-completion_times = {}
-turnaround_times = []
-waiting_times = []
+turnaround_times = StreamingStats()
+waiting_times = StreamingStats()
 
 # Lock for thread-safe updates to statistics
 lock = threading.Lock()
@@ -26,6 +33,9 @@ lock = threading.Lock()
 # Flag to stop threads
 stop_event = threading.Event()
 
+# Buffered event log for the teller hot paths; written by a background thread once started
+event_log = EventLog()
+
 def timeConverter(t1):
     local_time = time.localtime(t1)
     formatted_time = time.strftime("%Y-%m-%d %H:%M:%S", local_time)
@@ -38,39 +48,28 @@ def empty_queue(q):
 # Common Customer Arrival Function
 def customer_arrival(customer_id):
     service_time = random.randint(3, MAX_SERVICE_TIME)
-    arrival_time = time.time()
-    with lock:
-        arrival_times[customer_id] = arrival_time
-        service_times[customer_id] = service_time
-    print(f"Customer{customer_id} enters the Queue with service time {service_time} at {timeConverter(arrival_time)}")
+    arrival_time = clock.time()
+    event_log.record(ENQUEUE, customer_id, value=service_time)
     try:
-        customer_queue.put((service_time, customer_id), timeout=1)
+        customer_queue.put(new_customer(customer_id, arrival_time, service_time), timeout=1)
     except queue.Full:
-        print("Queue is FULL.")
+        event_log.record(DROP, customer_id, level=WARNING)
+
+# Teller callbacks for threadedTellers.serve()
+def customer_started(teller_id, customer, start_time):
+    event_log.record(DISPATCH, customer[CUSTOMER_ID], teller_id)
 
-# Round Robin Teller Service Function
+def customer_departed(teller_id, customer, start_time, end_time):
+    customer_id = customer[CUSTOMER_ID]
+    with lock:
+        turnaround_times.add(end_time - customer[ARRIVAL_TIME])
+        waiting_times.add(start_time - customer[ARRIVAL_TIME])
+    event_log.record(DEPARTURE, customer_id, teller_id)
+
+# Round Robin Teller Service Function: customers with work left after a quantum
+# go back through requeue(), which never blocks on a queue arrivals have filled
 def teller_service_rr(teller_id):
-    while not stop_event.is_set():
-        try:
-            service_time, customer_id = customer_queue.get(timeout=1)
-            print(f"Customer {customer_id} is in Teller {teller_id} for a quantum of {QUANTUM_TIME}")
-            start_time = time.time()
-            if service_time <= QUANTUM_TIME:
-                time.sleep(service_time)
-                end_time = time.time()
-                with lock:
-                    completion_times[customer_id] = end_time
-                    turnaround_time = end_time - arrival_times[customer_id]
-                    turnaround_times.append(turnaround_time)
-                    waiting_time = start_time - arrival_times[customer_id]
-                    waiting_times.append(waiting_time)
-                print(f"Customer {customer_id} leaves the Teller{teller_id}")
-            else:
-                time.sleep(QUANTUM_TIME)
-                remaining_time = service_time - QUANTUM_TIME
-                customer_queue.put((remaining_time, customer_id))
-        except queue.Empty:
-            continue
+    serve(teller_id, customer_queue, customer_departed, customer_started, stop_event=stop_event)
 
 # Start Tellers as Threads for a Given Service Function
 def start_tellers(service_function):
@@ -87,29 +86,43 @@ def main(service_function, description):
     customer_id = 1
     try:
         tellers = start_tellers(service_function)
-        start_time = time.time()
+        start_time = clock.time()
         while customer_id <= 50:
             customer_arrival(customer_id)
             customer_id += 1
-            time.sleep(random.uniform(0.5, 2))  # Random arrival time
+            clock.sleep(random.uniform(0.5, 2))  # Random arrival time
     except KeyboardInterrupt:
         print("Simulation stopped.")
         stop_event.set()
     finally:
+        # Each teller exits on a STOP, handed out only once no customer is left waiting
+        if not stop_event.is_set():
+            for _ in tellers:
+                customer_queue.put(STOP)
         for t in tellers:
             t.join()
         calculate_stats(description)
+        print(format_overshoot(clock.report()))
+        clock.reset()
         stop_event.clear()
 
 # Calculate and Print Statistics
 def calculate_stats(description):
+    event_log.flush()  # Console events first, so they do not land inside the stats block
     with lock:
-        avg_turnaround_time = sum(turnaround_times) / len(turnaround_times)
-        avg_waiting_time = sum(waiting_times) / len(waiting_times)
+        avg_turnaround_time = turnaround_times.mean
+        avg_waiting_time = waiting_times.mean
     print(f"\nStatistics for {description}:")
     print(f"Average Turnaround Time: {avg_turnaround_time:.4f} seconds")
     print(f"Average Waiting Time: {avg_waiting_time:.4f} seconds")
 
 # Run the Simulations
 if __name__ == "__main__":
-    main(teller_service_rr, "Round Robin")
\ No newline at end of file
+    # Optional: --speedup N runs the threaded tellers N times faster; times stay in simulated seconds
+    clock_from_argv(sys.argv)
+    # Optional: --log-level debug|info|warning|off and --log-file events.ndjson|events.bin
+    event_log = from_argv(sys.argv).start()
+    try:
+        main(teller_service_rr, "Round Robin")
+    finally:
+        event_log.close()
\ No newline at end of file
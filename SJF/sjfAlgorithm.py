@@ -1,62 +1,59 @@
 import threading
-import queue
 import random
-import time
-import matplotlib.pyplot as plt
+import os
+import sys
 
-class Customer:
-    def __init__(self, id, service_time, arrival_time):
-        self.id = id
-        self.service_time = service_time
-        self.remaining_time = service_time
-        self.arrival_time = arrival_time
-        self.start_time = None
-        self.end_time = None
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from completion import CompletionTracker
+from eventLog import DEPARTURE, DISPATCH, ENQUEUE, EventLog, from_argv
+from policies import ARRIVAL_TIME, CUSTOMER_ID, FIRST_START_TIME
+from report import report_from_argv
+from simClock import clock, format_overshoot, from_argv as clock_from_argv
+from threadedTellers import STOP, PolicyQueue, new_customer, serve
+
+# Buffered event log for the teller hot paths; written by a background thread once started
+event_log = EventLog()
 
-    def __lt__(self, other):
-        return self.service_time < other.service_time
+# Charts for this run; set from --report DIR, None skips plotting entirely
+report = None
 
 class Teller(threading.Thread):
-    def __init__(self, id, queue, lock, completed_customers, stop_event):
+    def __init__(self, id, queue, lock, completed_customers, stop_event, completion):
         threading.Thread.__init__(self)
         self.id = id
         self.queue = queue
         self.lock = lock
-        self.current_customer = None
         self.completed_customers = completed_customers
         self.stop_event = stop_event
+        self.completion = completion
         self.customers_attended = 0  # Initialize the count of customers served by the teller
         self.daemon = True
 
     def run(self):
-        while not self.stop_event.is_set() or not self.queue.empty():
-            try:
-                customer = self.queue.get(timeout=1)
-                self.current_customer = customer
-                start_time = time.time()
-                self.current_customer.start_time = start_time
-                print(f"Customer {self.current_customer.id} starts at Teller {self.id} with service time {self.current_customer.service_time}")
-                time.sleep(self.current_customer.service_time)
-                self.current_customer.end_time = time.time()
-                self.completed_customers.append(self.current_customer)
-                self.customers_attended += 1  # Increment the count of customers served
-                print(f"Customer {self.current_customer.id} leaves Teller {self.id}")
-                self.queue.task_done()
-                self.current_customer = None
-            except queue.Empty:
-                continue
-
-def generate_customers(num_customers, queue, lock):
+        serve(self.id, self.queue, self.departed, self.started, stop_event=self.stop_event)
+
+    def started(self, teller_id, customer, start_time):
+        event_log.record(DISPATCH, customer[CUSTOMER_ID], self.id)
+
+    def departed(self, teller_id, customer, start_time, end_time):
+        with self.lock:
+            self.completed_customers.append((customer, start_time, end_time))
+        self.customers_attended += 1  # Increment the count of customers served
+        event_log.record(DEPARTURE, customer[CUSTOMER_ID], self.id)
+        self.completion.depart()
+
+def generate_customers(num_customers, queue, lock, completion):
     for i in range(num_customers):
         service_time = random.uniform(1, 5)  # Random service time
-        arrival_time = time.time()
-        customer = Customer(i + 1, service_time, arrival_time)
-        print(f"Customer {customer.id} enters the Queue with service time {customer.service_time}")
+        arrival_time = clock.time()
+        event_log.record(ENQUEUE, i + 1, value=service_time)
         
         with lock:
-            queue.put(customer)
+            completion.admit()
+            queue.put(new_customer(i + 1, arrival_time, service_time))
 
-        time.sleep(random.uniform(0.1, 0.5))  # Simulate random arrival times
+        clock.sleep(random.uniform(0.1, 0.5))  # Simulate random arrival times
 
 def calculate_averages(completed_customers):
     total_turnaround_time = 0
@@ -65,10 +62,10 @@ def calculate_averages(completed_customers):
 
     num_customers = len(completed_customers)
 
-    for customer in completed_customers:
-        turnaround_time = customer.end_time - customer.arrival_time
-        waiting_time = customer.start_time - customer.arrival_time
-        response_time = customer.start_time - customer.arrival_time
+    for customer, start_time, end_time in completed_customers:
+        turnaround_time = end_time - customer[ARRIVAL_TIME]
+        waiting_time = start_time - customer[ARRIVAL_TIME]
+        response_time = customer[FIRST_START_TIME] - customer[ARRIVAL_TIME]
 
         total_turnaround_time += turnaround_time
         total_waiting_time += waiting_time
@@ -86,45 +83,55 @@ def calculate_averages(completed_customers):
 def main():
     num_tellers = 3
     num_customers = 50
-    q = queue.PriorityQueue()
+    q = PolicyQueue("SJF")
     lock = threading.Lock()
     completed_customers = []
     stop_event = threading.Event()
+    completion = CompletionTracker()
 
     try:
         # Create tellers
-        tellers = [Teller(i + 1, q, lock, completed_customers, stop_event) for i in range(num_tellers)]
+        tellers = [Teller(i + 1, q, lock, completed_customers, stop_event, completion) for i in range(num_tellers)]
 
         # Start teller threads
         for teller in tellers:
             teller.start()
 
         # Generate customers
-        generate_customers(num_customers, q, lock)
+        generate_customers(num_customers, q, lock, completion)
     except KeyboardInterrupt:
         print("Simulation stopped")
     finally:
-        while not q.empty() or any(teller.current_customer is not None for teller in tellers):
-            time.sleep(1)
+        completion.close()
+        completion.wait()  # Returns the moment the last customer departs
         stop_event.set()
+        for teller in tellers:
+            q.put(STOP)
         for teller in tellers:
             teller.join()
+        event_log.flush()  # Console events first, so they do not land inside the stats block
         for teller in tellers:
             print(f"Teller {teller.id} served {teller.customers_attended} customers.")
+        print(f"Shutdown latency: {completion.shutdown_latency * 1000:.2f} ms after the last departure")
         calculate_averages(completed_customers)
 
 def generate_graph(avg_turnaround_time, avg_waiting_time, avg_response_time):
-    labels = ['Turnaround Time', 'Waiting Time', 'Response Time']
-    values = [avg_turnaround_time, avg_waiting_time, avg_response_time]
-
-    plt.figure(figsize=(8, 6))
-    plt.plot(labels, values, marker='o', linestyle='-')
-    plt.xlabel('Metrics')
-    plt.ylabel('Time (seconds)')
-    plt.title('Average Turnaround Time, Waiting Time, and Response Time')
-    plt.grid(True)  # Add grid lines
-    plt.show()
+    if report is not None:
+        report.averages("SJF averages", avg_turnaround_time, avg_waiting_time, avg_response_time)
 
 
 if __name__ == "__main__":
-    main()
+    # Optional: --report DIR renders the chart to a PNG file once the run ends
+    report = report_from_argv(sys.argv)
+    # Optional: --speedup N runs the threaded tellers N times faster; times stay in simulated seconds
+    clock_from_argv(sys.argv)
+    # Optional: --log-level debug|info|warning|off and --log-file events.ndjson|events.bin
+    event_log = from_argv(sys.argv).start()
+    try:
+        main()
+    finally:
+        event_log.close()
+    print(format_overshoot(clock.report()))
+    if report is not None:
+        for path in report.render():
+            print(f"Wrote {path}")
@@ -1,81 +1,110 @@
 import threading
-import queue
 import random
-import time
-import matplotlib.pyplot as plt
+import os
+import sys
 
-class Customer:
-    def __init__(self, id, service_time, arrival_time):
-        self.id = id
-        self.service_time = service_time
-        self.remaining_time = service_time
-        self.arrival_time = arrival_time
-        self.start_time = None
-        self.end_time = None
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from completion import CompletionTracker
+from eventLog import DEPARTURE, DISPATCH, ENQUEUE, PREEMPT, EventLog, from_argv
+from policies import ARRIVAL_TIME, CUSTOMER_ID, FIRST_START_TIME, REMAINING_TIME, SRTFPolicy
+from report import report_from_argv
+from simClock import clock, format_overshoot, from_argv as clock_from_argv
+from threadedTellers import new_customer
+
+# Buffered event log for the teller hot paths; written by a background thread once started
+event_log = EventLog()
 
-    def __lt__(self, other):
-        return self.remaining_time < other.remaining_time
+# Charts for this run; set from --report DIR, None skips plotting entirely
+report = None
 
 class Teller(threading.Thread):
-    def __init__(self, id, queue, lock, completed_customers, stop_event):
+    def __init__(self, id, queue, lock, completed_customers, stop_event, tellers, completion):
         threading.Thread.__init__(self)
         self.id = id
         self.queue = queue
         self.lock = lock
+        self.wakeup = threading.Condition(lock)  # Signalled on new work, preemption or stop
         self.current_customer = None
         self.start_time = None
         self.completed_customers = completed_customers
         self.stop_event = stop_event
+        self.tellers = tellers
+        self.completion = completion
         self.customers_attended = 0  # Initialize the count of customers served by the teller
         self.daemon = True
 
+    # Remaining service time of the current customer, derived from when this service slice began
+    def remaining_time(self, now):
+        return self.current_customer[REMAINING_TIME] - (now - self.start_time)
+
+    # Called with the lock held: hand a customer to this teller and wake it up
+    def assign(self, customer, now):
+        self.current_customer = customer
+        self.start_time = now
+        if customer[FIRST_START_TIME] is None:
+            customer[FIRST_START_TIME] = now
+        event_log.record(DISPATCH, customer[CUSTOMER_ID], self.id)
+        self.wakeup.notify()
+
     def run(self):
-        while not self.stop_event.is_set() or not self.queue.empty():
-            with self.lock:
-                if self.current_customer is None and not self.queue.empty():
-                    self.current_customer = self.queue.get()
-                    self.start_time = time.time()
-                    self.current_customer.start_time = self.start_time
-                    print(f"Customer {self.current_customer.id} starts at Teller {self.id} with remaining time {self.current_customer.remaining_time}")
-
-            if self.current_customer is not None:
-                time.sleep(0.1)  # Simulate processing time slice
-                with self.lock:
-                    if self.current_customer is not None:  # Re-check to ensure no preemption has occurred
-                        self.current_customer.remaining_time -= 0.1
-                        if self.current_customer.remaining_time <= 0:
-                            self.current_customer.end_time = time.time()
-                            print(f"Customer {self.current_customer.id} leaves Teller {self.id}")
-                            self.completed_customers.append(self.current_customer)
-                            self.customers_attended += 1  # Increment the count of customers served
-                            self.current_customer = None
-                        elif not self.queue.empty() and self.queue.queue[0].remaining_time < self.current_customer.remaining_time:
-                            self.queue.put(self.current_customer)
-                            print(f"Customer {self.current_customer.id} is preempted by Customer {self.queue.queue[0].id} at Teller {self.id}")
-                            self.current_customer = None
-
-def generate_customers(num_customers, queue, lock, tellers):  # Added 'tellers' as an argument
+        with self.lock:
+            while True:
+                if self.current_customer is None:
+                    if self.stop_event.is_set() and not len(self.queue):
+                        break
+                    self.wakeup.wait()
+                    continue
+                now = clock.time()
+                remaining_time = self.remaining_time(now)
+                if remaining_time > 0:
+                    # Sleep until the customer is done; an arrival that preempts us notifies earlier
+                    clock.wait(self.wakeup, remaining_time)
+                    continue
+                self.current_customer[REMAINING_TIME] = 0
+                event_log.record(DEPARTURE, self.current_customer[CUSTOMER_ID], self.id)
+                self.completed_customers.append((self.current_customer, self.start_time, now))
+                self.customers_attended += 1  # Increment the count of customers served
+                self.current_customer = None
+                self.completion.depart()
+                dispatch(self.queue, self.tellers, self.completion)
+
+# Called with the lock held: give waiting customers to idle tellers, then preempt
+# the longest-remaining customer in service while the policy prefers a waiting one.
+# SRTF cannot run on threadedTellers.serve(): an arrival has to cut a slice short,
+# so each teller sleeps on its own condition and this function wakes it.
+def dispatch(ready, tellers, completion):
+    now = clock.time()
+    for teller in tellers:
+        if teller.current_customer is None and len(ready):
+            teller.assign(ready.select_next(now), now)
+    while len(ready) and tellers:
+        teller = max(tellers, key=lambda t: t.remaining_time(now))
+        remaining_time = teller.remaining_time(now)
+        if not ready.should_preempt(remaining_time, now):
+            break
+        preempted = teller.current_customer
+        preempted[REMAINING_TIME] = remaining_time
+        customer = ready.select_next(now)
+        ready.on_quantum_expired(preempted, now)
+        completion.requeue()  # Still outstanding, back in the ready heap
+        event_log.record(PREEMPT, preempted[CUSTOMER_ID], teller.id, remaining_time)
+        teller.assign(customer, now)
+
+# Each arrival joins the ready heap and goes straight through dispatch(), which may preempt a teller
+def generate_customers(num_customers, queue, lock, tellers, completion):
     for i in range(num_customers):
         service_time = random.uniform(1, 5)  # Random service time
-        arrival_time = time.time()
-        customer = Customer(i + 1, service_time, arrival_time)
-        print(f"Customer {customer.id} enters the Queue with service time {customer.service_time}")
+        arrival_time = clock.time()
+        customer = new_customer(i + 1, arrival_time, service_time)
+        event_log.record(ENQUEUE, i + 1, value=service_time)
 
         with lock:
-            # Preempt current customers if needed
-            preempted_customers = []
-            for teller in tellers:
-                if teller.current_customer and customer.remaining_time < teller.current_customer.remaining_time:
-                    preempted_customers.append(teller.current_customer)
-                    teller.current_customer = None
+            completion.admit()
+            queue.on_arrival(customer, arrival_time)
+            dispatch(queue, tellers, completion)
 
-            # Put preempted customers back in the queue
-            for pc in preempted_customers:
-                queue.put(pc)
-
-            queue.put(customer)
-
-        time.sleep(random.uniform(0.1, 0.5))  # Simulate random arrival times
+        clock.sleep(random.uniform(0.1, 0.5))  # Simulate random arrival times
 
 def calculate_averages(completed_customers):
     total_turnaround_time = 0
@@ -83,10 +112,10 @@ def calculate_averages(completed_customers):
     total_response_time = 0
     num_customers = len(completed_customers)
 
-    for customer in completed_customers:
-        turnaround_time = customer.end_time - customer.arrival_time
-        waiting_time = customer.start_time - customer.arrival_time
-        response_time = customer.start_time - customer.arrival_time
+    for customer, start_time, end_time in completed_customers:
+        turnaround_time = end_time - customer[ARRIVAL_TIME]
+        waiting_time = start_time - customer[ARRIVAL_TIME]
+        response_time = customer[FIRST_START_TIME] - customer[ARRIVAL_TIME]
         
         total_turnaround_time += turnaround_time
         total_waiting_time += waiting_time
@@ -104,44 +133,57 @@ def calculate_averages(completed_customers):
 def main():
     num_tellers = 3
     num_customers = 50
-    q = queue.PriorityQueue()
+    q = SRTFPolicy()  # Waiting customers ordered by remaining time, guarded by lock
     lock = threading.Lock()
     completed_customers = []
     stop_event = threading.Event()
+    completion = CompletionTracker()
+    tellers = []
 
     try:
         # Create tellers
-        tellers = [Teller(i + 1, q, lock, completed_customers, stop_event) for i in range(num_tellers)]
+        tellers.extend(Teller(i + 1, q, lock, completed_customers, stop_event, tellers, completion)
+                       for i in range(num_tellers))
 
         # Start teller threads
         for teller in tellers:
             teller.start()
 
         # Generate customers
-        generate_customers(num_customers, q, lock, tellers)  # Pass 'tellers' as an argument
+        generate_customers(num_customers, q, lock, tellers, completion)
     except KeyboardInterrupt:
         print("Simulation stopped")
     finally:
-        while not q.empty() or any(teller.current_customer is not None for teller in tellers):
-            time.sleep(1)
+        completion.close()
+        completion.wait()  # Returns the moment the last customer departs
         stop_event.set()
+        with lock:
+            for teller in tellers:
+                teller.wakeup.notify()
         for teller in tellers:
             teller.join()
+        event_log.flush()  # Console events first, so they do not land inside the stats block
         for teller in tellers:
             print(f"Teller {teller.id} served {teller.customers_attended} customers.")
+        print(f"Shutdown latency: {completion.shutdown_latency * 1000:.2f} ms after the last departure")
         calculate_averages(completed_customers)
 
 def generate_graph(avg_turnaround_time, avg_waiting_time, avg_response_time):
-    labels = ['Turnaround Time', 'Waiting Time', 'Response Time']
-    values = [avg_turnaround_time, avg_waiting_time, avg_response_time]
-
-    plt.figure(figsize=(8, 6))
-    plt.plot(labels, values, marker='o', linestyle='-')
-    plt.xlabel('Metrics')
-    plt.ylabel('Time (seconds)')
-    plt.title('Average Turnaround Time, Waiting Time, and Response Time')
-    plt.grid(True)  # Add grid lines
-    plt.show()
+    if report is not None:
+        report.averages("SRTF averages", avg_turnaround_time, avg_waiting_time, avg_response_time)
 
 if __name__ == "__main__":
-    main()
+    # Optional: --report DIR renders the chart to a PNG file once the run ends
+    report = report_from_argv(sys.argv)
+    # Optional: --speedup N runs the threaded tellers N times faster; times stay in simulated seconds
+    clock_from_argv(sys.argv)
+    # Optional: --log-level debug|info|warning|off and --log-file events.ndjson|events.bin
+    event_log = from_argv(sys.argv).start()
+    try:
+        main()
+    finally:
+        event_log.close()
+    print(format_overshoot(clock.report()))
+    if report is not None:
+        for path in report.render():
+            print(f"Wrote {path}")
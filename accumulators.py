@@ -0,0 +1,166 @@
+import math
+import threading
+
+from fieldState import FieldState
+
+
+# Constant-memory running statistics for one metric (e.g. waiting time).
+# count, mean and variance are kept with Welford's online update, min/max
+# exactly, and quantiles approximately with a log-bucketed sketch whose
+# answers are within `relative_accuracy` of the true value. The sketch holds
+# at most `max_buckets` counters no matter how many values are added.
+class StreamingStats(FieldState):
+    state_fields = ("relative_accuracy", "max_buckets", "gamma", "log_gamma", "count", "mean", "m2",
+                    "min", "max", "total", "zero_count", "buckets")
+
+    def __init__(self, relative_accuracy=0.01, max_buckets=2048):
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.clear()
+
+    def clear(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.total = 0.0
+        self.zero_count = 0  # Values too small for a log bucket (zero waits are common)
+        self.buckets = {}
+
+    def __len__(self):
+        return self.count
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if value <= 1e-9:
+            self.zero_count += 1
+            return
+        index = math.ceil(math.log(value) / self.log_gamma)
+        buckets = self.buckets
+        buckets[index] = buckets.get(index, 0) + 1
+        if len(buckets) > self.max_buckets:
+            self._collapse()
+
+    # Fold the two lowest buckets together, sacrificing accuracy on the smallest values first
+    def _collapse(self):
+        lowest, second = sorted(self.buckets)[:2]
+        self.buckets[second] += self.buckets.pop(lowest)
+
+    # Combine another accumulator into this one (Chan et al. parallel variance update)
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.mean, self.m2 = other.mean, other.m2
+        else:
+            count = self.count + other.count
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / count
+            self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.zero_count += other.zero_count
+        for index, bucket_count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + bucket_count
+        while len(self.buckets) > self.max_buckets:
+            self._collapse()
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    def _bucket_value(self, index):
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    # Approximate q-quantile (0 <= q <= 1)
+    def quantile(self, q):
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return max(self.min, 0.0)
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                return min(max(self._bucket_value(index), self.min), self.max)
+        return self.max
+
+    # Representative values and counts, e.g. for plt.hist(values, weights=counts)
+    def histogram(self):
+        values = [0.0] if self.zero_count else []
+        counts = [self.zero_count] if self.zero_count else []
+        for index in sorted(self.buckets):
+            values.append(self._bucket_value(index))
+            counts.append(self.buckets[index])
+        return values, counts
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "std": self.std,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+            "p50": self.quantile(0.50),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+# One set of StreamingStats per writer (e.g. per teller thread). A writer only
+# ever records into its own shard, so recording takes no lock; snapshot() and
+# merge_into() combine the shards for reporting. Merge after the writers
+# have stopped, or accept that a shard written mid-merge may be a value behind.
+class ShardedStats:
+    def __init__(self, metrics, relative_accuracy=0.01, max_buckets=2048):
+        self.metrics = tuple(metrics)
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.shards = {}
+        self.lock = threading.Lock()  # Guards shard creation only
+
+    def new_set(self):
+        return {metric: StreamingStats(self.relative_accuracy, self.max_buckets) for metric in self.metrics}
+
+    # The accumulators owned by `key`, created on first use
+    def shard(self, key):
+        shard = self.shards.get(key)
+        if shard is None:
+            with self.lock:
+                shard = self.shards.setdefault(key, self.new_set())
+        return shard
+
+    def snapshot(self):
+        return self.merge_into(self.new_set())
+
+    # Add every shard into `targets` ({metric: StreamingStats}) and return it
+    def merge_into(self, targets):
+        with self.lock:
+            shards = list(self.shards.values())
+        for shard in shards:
+            for metric, stats in shard.items():
+                targets[metric].merge(stats)
+        return targets
+
+    def clear(self):
+        with self.lock:
+            self.shards.clear()
@@ -0,0 +1,241 @@
+import collections
+import queue
+import random
+import threading
+import time
+
+from simClock import clock
+
+# Outcomes of offering a customer to the ready queue
+ADMITTED = "admitted"
+DROPPED = "dropped"
+BALKED = "balked"
+
+
+# Admission control between the arrival generator and a bounded ready queue.
+# offer() never blocks the generator: it decides at once, or hands the
+# customer to a background thread that waits for a slot on its behalf.
+# Whatever the outcome, on_admit(item) or on_reject(item, outcome) is called
+# exactly once per offered item, from the generator or that thread. Call
+# attach() before each run and close() after it; report() gives the counts.
+class AdmissionControl:
+    name = None
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.ready_queue = None
+        self.capacity = 0
+        self.on_admit = None
+        self.on_reject = None
+        self.counts = {ADMITTED: 0, DROPPED: 0, BALKED: 0}
+
+    # Start a run against ready_queue, which admits at most `capacity` arrivals
+    def attach(self, ready_queue, capacity, on_admit=None, on_reject=None):
+        self.ready_queue = ready_queue
+        self.capacity = capacity
+        self.on_admit = on_admit
+        self.on_reject = on_reject
+        with self.lock:
+            self.counts = {ADMITTED: 0, DROPPED: 0, BALKED: 0}
+        return self
+
+    def offer(self, item):
+        raise NotImplementedError
+
+    # Stop accepting; with discard=True, drop whoever is still waiting for a slot
+    def close(self, discard=False):
+        pass
+
+    def record(self, item, outcome):
+        with self.lock:
+            self.counts[outcome] += 1
+        if outcome == ADMITTED:
+            if self.on_admit is not None:
+                self.on_admit(item)
+        elif self.on_reject is not None:
+            self.on_reject(item, outcome)
+
+    # Arrivals in the ready queue that no teller has started, the quantity
+    # `capacity` bounds. The threaded ready queues count them in `unstarted`,
+    # leaving out customers requeued after a quantum; in a plain queue.Queue
+    # every item is one.
+    def waiting(self):
+        unstarted = getattr(self.ready_queue, "unstarted", None)
+        return self.ready_queue.qsize() if unstarted is None else unstarted
+
+    # Put the item in if there is room right now; True if it went in
+    def try_put(self, item):
+        try:
+            self.ready_queue.put_nowait(item)
+        except queue.Full:
+            return False
+        return True
+
+    # Admission counts for a run that served `served` customers in `elapsed` seconds
+    def report(self, served, elapsed):
+        with self.lock:
+            counts = dict(self.counts)
+        offered = sum(counts.values())
+        return {
+            "policy": self.name,
+            "offered": offered,
+            **counts,
+            "drop_rate": counts[DROPPED] / offered if offered else 0.0,
+            "balk_rate": counts[BALKED] / offered if offered else 0.0,
+            "served": served,
+            "throughput": served / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+# Turn the customer away when the queue is full
+class RejectWhenFull(AdmissionControl):
+    name = "reject"
+
+    def offer(self, item):
+        self.record(item, ADMITTED if self.try_put(item) else DROPPED)
+
+
+# The customer looks at the queue and leaves without joining with a
+# probability that grows linearly with the arrivals waiting to start, up to `probability` just
+# below capacity; a full queue turns everyone away
+class Balking(AdmissionControl):
+    name = "balk"
+
+    def __init__(self, probability=0.5, rng=None):
+        super().__init__()
+        self.probability = probability
+        self.rng = rng or random.Random()
+
+    def offer(self, item):
+        if self.capacity > 0 and self.rng.random() < self.probability * self.waiting() / self.capacity:
+            self.record(item, BALKED)
+        else:
+            self.record(item, ADMITTED if self.try_put(item) else DROPPED)
+
+
+# Customers who find the queue full wait in a FIFO waiting room, served by
+# one background thread that puts them into the queue as slots free up. The
+# room holds at most `room_capacity` customers (None: unbounded) and each
+# waits at most `timeout` simulated seconds (simClock; None: until a slot
+# frees) before it is dropped. While anyone waits, new arrivals queue behind
+# them rather than take a freed slot first. The thread waits on the queue in
+# slices of at most `poll` real seconds so that close(discard=True) can stop it.
+class WaitingRoom(AdmissionControl):
+    def __init__(self, room_capacity=None, timeout=None, poll=0.25):
+        super().__init__()
+        self.room_capacity = room_capacity
+        self.timeout = timeout
+        self.poll = poll
+        self.room = collections.deque()  # (item, deadline or None), oldest first
+        self.changed = threading.Condition(self.lock)
+        self.closing = False
+        self.discarding = False
+        self.mover = None
+
+    def attach(self, ready_queue, capacity, on_admit=None, on_reject=None):
+        super().attach(ready_queue, capacity, on_admit, on_reject)
+        self.closing = self.discarding = False
+        self.mover = threading.Thread(target=self.move, name=f"{self.name}-admission", daemon=True)
+        self.mover.start()
+        return self
+
+    def offer(self, item):
+        with self.lock:
+            waiting = bool(self.room)
+        # Only the generator adds to the room, so it is still empty if it was empty above
+        if not waiting and self.try_put(item):
+            self.record(item, ADMITTED)
+        else:
+            self.wait_for_slot(item)
+
+    def wait_for_slot(self, item):
+        with self.lock:
+            if self.room_capacity is not None and len(self.room) >= self.room_capacity:
+                full = True
+            else:
+                full = False
+                deadline = time.monotonic() + clock.real(self.timeout) if self.timeout is not None else None
+                self.room.append((item, deadline))
+                self.changed.notify()
+        if full:
+            self.record(item, DROPPED)
+
+    # Background thread: admit the oldest waiting customer as soon as there is
+    # room, dropping it once its deadline passes
+    def move(self):
+        while True:
+            with self.lock:
+                while not self.room and not self.closing:
+                    self.changed.wait()
+                if not self.room:
+                    return
+                if self.discarding:
+                    discarded = list(self.room)
+                    self.room.clear()
+                else:
+                    discarded = None
+                    item, deadline = self.room[0]  # Only this thread removes from the room
+            if discarded is not None:
+                for item, _ in discarded:
+                    self.record(item, DROPPED)
+                continue
+            while True:
+                wait = self.poll if deadline is None else min(self.poll, deadline - time.monotonic())
+                if wait <= 0 or self.discarding:
+                    # Out of time: one last look, in case a slot freed since the last wait
+                    admitted = not self.discarding and self.try_put(item)
+                    break
+                try:
+                    self.ready_queue.put(item, timeout=wait)
+                except queue.Full:
+                    continue
+                admitted = True
+                break
+            with self.lock:
+                self.room.popleft()
+            self.record(item, ADMITTED if admitted else DROPPED)
+
+    def close(self, discard=False):
+        with self.lock:
+            self.closing = True
+            self.discarding = discard
+            self.changed.notify()
+        if self.mover is not None:
+            self.mover.join()
+            self.mover = None
+
+
+# Wait up to `timeout` seconds for a slot, as customer_queue.put(timeout=...)
+# did, but in the waiting room rather than on the generator's thread
+class BoundedWait(WaitingRoom):
+    name = "wait"
+
+    def __init__(self, timeout=1.0, poll=0.25):
+        super().__init__(None, timeout, poll)
+
+
+# A second, overflow queue of `room_capacity` customers who wait as long as it
+# takes; only arrivals that find the overflow queue full as well are dropped
+class Overflow(WaitingRoom):
+    name = "overflow"
+
+    def __init__(self, room_capacity=10, poll=0.25):
+        super().__init__(room_capacity, None, poll)
+
+
+ADMISSION_POLICIES = {policy.name: policy for policy in (RejectWhenFull, Balking, BoundedWait, Overflow)}
+
+
+def format_admission(report):
+    return (f"Admission ({report['policy']}): {report['offered']} offered, {report[ADMITTED]} admitted, "
+            f"{report[DROPPED]} dropped ({report['drop_rate']:.1%}), {report[BALKED]} balked "
+            f"({report['balk_rate']:.1%}); effective throughput {report['throughput']:.3f} customers/s")
+
+
+# Build an admission policy from the --admission reject|balk|wait|overflow
+# command line option, or `default` (a name) when it is absent
+def from_argv(argv, default="wait"):
+    name = argv[argv.index("--admission") + 1] if "--admission" in argv else default
+    if name not in ADMISSION_POLICIES:
+        raise ValueError(f"Unknown admission policy {name!r}, expected one of {tuple(ADMISSION_POLICIES)}")
+    return ADMISSION_POLICIES[name]()
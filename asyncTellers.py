@@ -0,0 +1,203 @@
+import asyncio
+import sys
+import threading
+import time
+
+from accumulators import ShardedStats, StreamingStats
+from eventEngine import generate_workload
+from eventLog import DEPARTURE, DISPATCH, DROP, ENQUEUE, PREEMPT, WARNING
+from policies import ARRIVAL_TIME, CUSTOMER_ID, FIRST_START_TIME, REMAINING_TIME, make_policy
+from simClock import clock
+from threadedTellers import STOP, PolicyQueue, new_customer, serve
+
+
+# Asyncio teller runtime: every teller is a coroutine on one event loop, all
+# sharing one ready queue owned by a policies.SchedulingPolicy (or its name),
+# so the coroutine tellers order and slice customers exactly as
+# eventEngine.EventSimulator and threadedTellers.PolicyQueue do. A coroutine
+# costs a few KB instead of a thread stack, and switching between them never
+# touches the GIL, so thousands of tellers are practical. queue_size bounds
+# only admitted customers that have not been served yet, so customers given
+# back after a slice never turn new arrivals away. Sleeps are divided by
+# `speedup` and metrics are reported in simulated seconds. Events go to an
+# optional eventLog.EventLog.
+class AsyncTellerPool:
+    def __init__(self, policy, num_tellers, quantum=None, queue_size=None, speedup=1.0, log=None):
+        self.policy = make_policy(policy, quantum)
+        if self.policy.preemptive:
+            raise ValueError(f"{self.policy.name} preempts running customers, which the coroutine tellers do not")
+        self.num_tellers = num_tellers
+        self.queue_size = queue_size
+        self.speedup = speedup
+        self.log = log
+
+        self.turnaround_times = StreamingStats()
+        self.waiting_times = StreamingStats()
+        self.response_times = StreamingStats()
+        self.customers_served_by_teller = {i: 0 for i in range(1, num_tellers + 1)}
+        self.dropped = 0
+
+    # Simulated seconds since the run started
+    def now(self):
+        return (self.loop.time() - self.started) * self.speedup
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(seconds / self.speedup)
+
+    # The next customer and how long to serve it, as PolicyQueue.next_slice()
+    async def next_slice(self):
+        await self.waiting.acquire()  # One permit per customer in the policy
+        customer = self.policy.select_next(self.now())
+        if customer[FIRST_START_TIME] is None:
+            self.unstarted -= 1
+        # Read after select_next(): a policy may vary the quantum per customer
+        quantum, time_slice = self.policy.quantum, customer[REMAINING_TIME]
+        if quantum is not None and time_slice > quantum:
+            time_slice = quantum
+        return customer, time_slice
+
+    def finish(self):
+        self.outstanding -= 1
+        if self.outstanding == 0 and self.arrivals_done:
+            self.all_done.set()
+
+    async def teller(self, teller_id):
+        while True:
+            customer, time_slice = await self.next_slice()
+            start_time = self.now()
+            if customer[FIRST_START_TIME] is None:
+                customer[FIRST_START_TIME] = start_time
+            if self.log:
+                self.log.record(DISPATCH, customer[CUSTOMER_ID], teller_id)
+            await self.sleep(time_slice)
+            if time_slice < customer[REMAINING_TIME]:
+                customer[REMAINING_TIME] -= time_slice
+                if self.log:
+                    self.log.record(PREEMPT, customer[CUSTOMER_ID], teller_id, customer[REMAINING_TIME])
+                self.policy.on_quantum_expired(customer, self.now())
+                self.waiting.release()
+                continue
+            end_time = self.now()
+            self.policy.on_complete(customer, end_time)
+            arrival_time = customer[ARRIVAL_TIME]
+            self.turnaround_times.add(end_time - arrival_time)
+            self.waiting_times.add(start_time - arrival_time)
+            self.response_times.add(customer[FIRST_START_TIME] - arrival_time)
+            self.customers_served_by_teller[teller_id] += 1
+            if self.log:
+                self.log.record(DEPARTURE, customer[CUSTOMER_ID], teller_id)
+            self.finish()
+
+    async def arrivals(self, workload):
+        for customer_id, record in enumerate(workload, start=1):
+            arrival_time, service_time = record[0], record[1]
+            delay = arrival_time - self.now()
+            if delay > 0:
+                await self.sleep(delay)
+            if self.queue_size is not None and self.unstarted >= self.queue_size:
+                self.dropped += 1
+                if self.log:
+                    self.log.record(DROP, customer_id, level=WARNING)
+                continue
+            self.outstanding += 1
+            self.unstarted += 1
+            if self.log:
+                self.log.record(ENQUEUE, customer_id, value=service_time)
+            now = self.now()
+            self.policy.on_arrival([customer_id, now, service_time, service_time, None], now)
+            self.waiting.release()
+        self.arrivals_done = True
+        if self.outstanding == 0:
+            self.all_done.set()
+
+    async def run_async(self, workload):
+        self.loop = asyncio.get_running_loop()
+        self.waiting = asyncio.Semaphore(0)
+        self.unstarted = 0  # Admitted customers that have not been served yet
+        self.outstanding = 0
+        self.arrivals_done = False
+        self.all_done = asyncio.Event()
+        self.started = self.loop.time()
+        tellers = [asyncio.create_task(self.teller(i)) for i in range(1, self.num_tellers + 1)]
+        await self.arrivals(workload)
+        await self.all_done.wait()
+        for task in tellers:
+            task.cancel()
+        await asyncio.gather(*tellers, return_exceptions=True)
+        return self
+
+    def run(self, workload):
+        return asyncio.run(self.run_async(workload))
+
+
+# Threaded counterpart used by the benchmark: the backend final.py ships, one
+# OS thread per teller running threadedTellers.serve() on a shared
+# PolicyQueue, timed by the shared SimClock at the same speed-up. Departures
+# are recorded into per-teller shards, as AsyncTellerPool records them.
+# Returns the wall-clock seconds to serve the whole workload.
+def run_threaded(policy, workload, num_tellers, speedup, quantum=None):
+    ready = PolicyQueue(policy, 0, quantum)
+    stats = ShardedStats(("turnaround_times", "waiting_times", "response_times"))
+
+    def customer_departed(teller_id, customer, start_time, end_time):
+        shard = stats.shard(teller_id)
+        arrival_time = customer[ARRIVAL_TIME]
+        shard["turnaround_times"].add(end_time - arrival_time)
+        shard["waiting_times"].add(start_time - arrival_time)
+        shard["response_times"].add(customer[FIRST_START_TIME] - arrival_time)
+
+    previous_speedup = clock.speedup
+    clock.set_speedup(speedup)
+    try:
+        threads = [threading.Thread(target=serve, args=(teller_id, ready, customer_departed))
+                   for teller_id in range(1, num_tellers + 1)]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        origin = clock.time()
+        for customer_id, (arrival_time, service_time, *_) in enumerate(workload, start=1):
+            delay = origin + arrival_time - clock.time()
+            if delay > 0:
+                clock.sleep(delay)
+            ready.put(new_customer(customer_id, clock.time(), service_time))
+        for _ in threads:
+            ready.put(STOP)  # Handed out only once no customer is waiting
+        for thread in threads:
+            thread.join()
+        return time.monotonic() - started
+    finally:
+        clock.reset()
+        clock.set_speedup(previous_speedup)
+
+
+# Wall-clock time for both backends to serve the same burst of customers
+# under `policy`. Every customer arrives at t=0, so the ideal makespan is
+# known and the difference is pure runtime overhead.
+def benchmark(teller_counts=(10, 100, 5000), customers_per_teller=4, speedup=1000, policy="FCFS", quantum=2):
+    results = []
+    for num_tellers in teller_counts:
+        num_customers = num_tellers * customers_per_teller
+        workload = list(generate_workload(num_customers, seed=1, min_interarrival=0, max_interarrival=0))
+
+        threaded_elapsed = run_threaded(policy, workload, num_tellers, speedup, quantum)
+
+        started = time.monotonic()
+        AsyncTellerPool(policy, num_tellers, quantum=quantum, speedup=speedup).run(workload)
+        async_elapsed = time.monotonic() - started
+
+        results.append((num_tellers, num_customers, threaded_elapsed, async_elapsed))
+    return results
+
+
+if __name__ == "__main__":
+    # Optional: --policy FCFS|SJF|RR|MLFQ (default FCFS), then teller counts
+    policy = "FCFS"
+    if "--policy" in sys.argv:
+        index = sys.argv.index("--policy")
+        policy = sys.argv[index + 1]
+        del sys.argv[index:index + 2]
+    counts = tuple(int(arg) for arg in sys.argv[1:]) or (10, 100, 5000)
+    print(f"{policy}: threadedTellers.serve() on a PolicyQueue against coroutine tellers")
+    print(f"{'tellers':>8} {'customers':>10} {'threaded':>10} {'asyncio':>10}")
+    for num_tellers, num_customers, threaded_elapsed, async_elapsed in benchmark(counts, policy=policy):
+        print(f"{num_tellers:>8} {num_customers:>10} {threaded_elapsed:>9.3f}s {async_elapsed:>9.3f}s")
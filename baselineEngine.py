@@ -0,0 +1,268 @@
+import heapq
+from collections import deque
+
+from accumulators import StreamingStats
+
+# Reference implementations for policyBenchmark.py, kept here so the benchmark
+# needs no git history: eventEngine.py as it was before the policy plugins,
+# where the algorithm is chosen by string comparisons inside
+# enqueue/dequeue/dispatch, and SJF/srtfAlgorithm.py's preemptive dispatch()
+# from the same commit, run on a virtual clock instead of teller threads.
+# Do not optimize these; they are the yardstick.
+
+# Event kinds, ordered so that simultaneous events are handled departures first
+DEPARTURE = 0
+QUANTUM_EXPIRED = 1
+ARRIVAL = 2
+
+POLICIES = ("FCFS", "SJF", "RR")
+
+# Customer record layout (a plain list so RR can update the remaining time in place)
+CUSTOMER_ID = 0
+ARRIVAL_TIME = 1
+SERVICE_TIME = 2
+REMAINING_TIME = 3
+FIRST_START_TIME = 4
+
+
+# Discrete-event simulator: a virtual clock advanced from an event heap,
+# so service time costs nothing in wall-clock time
+class EventSimulator:
+    def __init__(self, policy, num_tellers, quantum=None, queue_size=None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}, expected one of {POLICIES}")
+        if policy == "RR" and not quantum:
+            raise ValueError("Round Robin needs a positive quantum")
+        self.policy = policy
+        self.num_tellers = num_tellers
+        self.quantum = quantum
+        self.queue_size = queue_size
+
+        self.clock = 0.0
+        self.events = []
+        self.sequence = 0
+        self.ready = [] if policy == "SJF" else deque()
+        self.idle_tellers = list(range(1, num_tellers + 1))
+        self.next_customer_id = 1
+
+        # Same bookkeeping as final.py's calculate_stats
+        self.turnaround_times = StreamingStats()
+        self.waiting_times = StreamingStats()
+        self.response_times = StreamingStats()
+        self.dropped = 0
+
+    def schedule(self, time, kind, teller_id, customer):
+        heapq.heappush(self.events, (time, kind, self.sequence, teller_id, customer))
+        self.sequence += 1
+
+    # Arrivals are pulled lazily so only one pending arrival sits on the heap
+    def schedule_next_arrival(self, arrivals):
+        for record in arrivals:
+            arrival_time, service_time = record[0], record[1]
+            customer = [self.next_customer_id, arrival_time, service_time, service_time, None]
+            self.next_customer_id += 1
+            self.schedule(arrival_time, ARRIVAL, None, customer)
+            return
+
+    def ready_count(self):
+        return len(self.ready)
+
+    def enqueue(self, customer):
+        if self.policy == "SJF":
+            heapq.heappush(self.ready, (customer[SERVICE_TIME], self.sequence, customer))
+            self.sequence += 1
+        else:
+            self.ready.append(customer)
+
+    def dequeue(self):
+        if self.policy == "SJF":
+            return heapq.heappop(self.ready)[2]
+        return self.ready.popleft()
+
+    def on_arrival(self, customer):
+        if self.queue_size is not None and self.ready_count() >= self.queue_size:
+            self.dropped += 1
+            return
+        self.enqueue(customer)
+
+    def on_departure(self, teller_id, customer, start_time):
+        arrival_time = customer[ARRIVAL_TIME]
+        self.turnaround_times.add(self.clock - arrival_time)
+        self.waiting_times.add(start_time - arrival_time)
+        self.response_times.add(customer[FIRST_START_TIME] - arrival_time)
+        heapq.heappush(self.idle_tellers, teller_id)
+
+    def on_quantum_expired(self, teller_id, customer):
+        customer[REMAINING_TIME] -= self.quantum
+        self.ready.append(customer)
+        heapq.heappush(self.idle_tellers, teller_id)
+
+    # Hand waiting customers to idle tellers, lowest teller id first
+    def dispatch(self):
+        while self.idle_tellers and self.ready:
+            teller_id = heapq.heappop(self.idle_tellers)
+            customer = self.dequeue()
+            if customer[FIRST_START_TIME] is None:
+                customer[FIRST_START_TIME] = self.clock
+            remaining_time = customer[REMAINING_TIME]
+            if self.policy == "RR" and remaining_time > self.quantum:
+                self.schedule(self.clock + self.quantum, QUANTUM_EXPIRED, teller_id, customer)
+            else:
+                self.schedule(self.clock + remaining_time, DEPARTURE, teller_id, (customer, self.clock))
+
+    # workload yields (arrival_time, service_time, ...) sorted by arrival time,
+    # e.g. generate_workload() or a trace from traceLoader.load_trace()
+    def run(self, workload):
+        arrivals = iter(workload)
+        self.schedule_next_arrival(arrivals)
+        while self.events:
+            time, kind, _, teller_id, payload = heapq.heappop(self.events)
+            self.clock = time
+            if kind == ARRIVAL:
+                self.on_arrival(payload)
+                self.schedule_next_arrival(arrivals)
+            elif kind == DEPARTURE:
+                customer, start_time = payload
+                self.on_departure(teller_id, customer, start_time)
+            else:
+                self.on_quantum_expired(teller_id, payload)
+            self.dispatch()
+        return self
+
+    def stats(self):
+        served = len(self.turnaround_times)
+        return {
+            "served": served,
+            "dropped": self.dropped,
+            "avg_turnaround_time": self.turnaround_times.mean,
+            "avg_waiting_time": self.waiting_times.mean,
+            "avg_response_time": self.response_times.mean,
+            "makespan": self.clock,
+        }
+
+
+# Convenience wrapper: build a simulator, run it over a workload and return it
+def simulate(policy, workload, num_tellers=3, quantum=None, queue_size=None):
+    return EventSimulator(policy, num_tellers, quantum, queue_size).run(workload)
+
+
+# SJF/srtfAlgorithm.py's customer: a heap of these is ordered by remaining time
+class Customer:
+    def __init__(self, id, service_time, arrival_time):
+        self.id = id
+        self.service_time = service_time
+        self.remaining_time = service_time
+        self.arrival_time = arrival_time
+        self.start_time = None
+        self.first_start_time = None
+        self.end_time = None
+
+    def __lt__(self, other):
+        return self.remaining_time < other.remaining_time
+
+
+class Teller:
+    def __init__(self, id):
+        self.id = id
+        self.current_customer = None
+        self.start_time = None
+
+    # Remaining service time of the current customer, derived from when this service slice began
+    def remaining_time(self, now):
+        return self.current_customer.remaining_time - (now - self.start_time)
+
+
+# srtfAlgorithm.py's scheduling on a virtual clock: the same heap of Customer
+# objects and the same dispatch(), called on every arrival and departure. A
+# teller's departure event is stale once it has been given another customer.
+# queue_size drops arrivals the way EventSimulator does, so both sides do the
+# same work; the threaded original had no bound.
+class SRTFSimulator:
+    def __init__(self, num_tellers, queue_size=None):
+        self.queue_size = queue_size
+        self.clock = 0.0
+        self.events = []
+        self.sequence = 0
+        self.ready = []
+        self.tellers = [Teller(i + 1) for i in range(num_tellers)]
+
+        self.turnaround_times = StreamingStats()
+        self.waiting_times = StreamingStats()
+        self.response_times = StreamingStats()
+        self.dropped = 0
+        self.preemptions = 0
+
+    def assign(self, teller, customer, now):
+        teller.current_customer = customer
+        teller.start_time = now
+        customer.start_time = now
+        if customer.first_start_time is None:
+            customer.first_start_time = now
+        heapq.heappush(self.events, (now + customer.remaining_time, DEPARTURE, self.sequence, teller, customer, now))
+        self.sequence += 1
+
+    # Give waiting customers to idle tellers, then preempt the longest-remaining
+    # customer in service while a shorter one is waiting
+    def dispatch(self):
+        now = self.clock
+        ready, tellers = self.ready, self.tellers
+        for teller in tellers:
+            if teller.current_customer is None and ready:
+                self.assign(teller, heapq.heappop(ready), now)
+        while ready and tellers:
+            teller = max(tellers, key=lambda t: t.remaining_time(now))
+            remaining_time = teller.remaining_time(now)
+            if ready[0].remaining_time >= remaining_time:
+                break
+            preempted = teller.current_customer
+            preempted.remaining_time = remaining_time
+            customer = heapq.heappop(ready)
+            heapq.heappush(ready, preempted)
+            self.preemptions += 1
+            self.assign(teller, customer, now)
+
+    def run(self, workload):
+        arrivals = iter(workload)
+        next_customer_id = 1
+        for arrival_time, service_time, *_ in arrivals:
+            heapq.heappush(self.events, (arrival_time, ARRIVAL, self.sequence, None,
+                                         Customer(next_customer_id, service_time, arrival_time), None))
+            self.sequence += 1
+            next_customer_id += 1
+            break
+        while self.events:
+            time, kind, _, teller, customer, start_time = heapq.heappop(self.events)
+            self.clock = time
+            if kind == ARRIVAL:
+                if self.queue_size is not None and len(self.ready) >= self.queue_size:
+                    self.dropped += 1
+                else:
+                    heapq.heappush(self.ready, customer)
+                for arrival_time, service_time, *_ in arrivals:
+                    heapq.heappush(self.events, (arrival_time, ARRIVAL, self.sequence, None,
+                                                 Customer(next_customer_id, service_time, arrival_time), None))
+                    self.sequence += 1
+                    next_customer_id += 1
+                    break
+            elif teller.current_customer is not customer or teller.start_time != start_time:
+                continue  # Preempted before it finished
+            else:
+                customer.remaining_time = 0
+                customer.end_time = time
+                self.turnaround_times.add(time - customer.arrival_time)
+                self.waiting_times.add(customer.start_time - customer.arrival_time)
+                self.response_times.add(customer.first_start_time - customer.arrival_time)
+                teller.current_customer = None
+            self.dispatch()
+        return self
+
+    def stats(self):
+        return {
+            "served": len(self.turnaround_times),
+            "dropped": self.dropped,
+            "preemptions": self.preemptions,
+            "avg_turnaround_time": self.turnaround_times.mean,
+            "avg_waiting_time": self.waiting_times.mean,
+            "avg_response_time": self.response_times.mean,
+            "makespan": self.clock,
+        }
@@ -0,0 +1,259 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from accumulators import StreamingStats
+from eventEngine import POLICIES, EventSimulator, generate_workload
+from policies import SchedulingPolicy, make_policy
+
+BASELINE_PATH = "benchBaseline.json"
+TELLER_COUNTS = (1, 4, 16)
+QUEUE_DEPTHS = (10, 100, 1000)
+QUANTUM = 2
+THRESHOLD = 0.2  # Fail when throughput drops more than 20% below the baseline, or the baseline's spread if wider
+
+
+# Policy wrapper that times dispatch: from the moment a teller is free and a
+# customer is waiting (whichever happens last) to select_next() handing that
+# customer over. Everything else is delegated to the wrapped policy.
+class DispatchTimer(SchedulingPolicy):
+    def __init__(self, policy):
+        self.policy = policy
+        self.name = policy.name
+        self.preemptive = policy.preemptive
+        self.freed = deque()  # perf_counter_ns() of tellers waiting to be given work
+        self.latencies = StreamingStats()
+
+    def __len__(self):
+        return len(self.policy)
+
+    @property
+    def quantum(self):
+        return self.policy.quantum
+
+    def teller_freed(self):
+        self.freed.append(time.perf_counter_ns())
+
+    def on_arrival(self, customer, now):
+        if self.freed:
+            # Tellers were idle with nothing to do; the clock starts now
+            stamp = time.perf_counter_ns()
+            self.freed = deque([stamp] * len(self.freed))
+        self.policy.on_arrival(customer, now)
+
+    def select_next(self, now):
+        customer = self.policy.select_next(now)
+        if self.freed:
+            self.latencies.add(time.perf_counter_ns() - self.freed.popleft())
+        return customer
+
+    # Quantum expiry or preemption: the customer goes back and its teller is free
+    def on_quantum_expired(self, customer, now):
+        self.policy.on_quantum_expired(customer, now)
+        self.teller_freed()
+
+    def on_complete(self, customer, now):
+        self.policy.on_complete(customer, now)
+        self.teller_freed()
+
+    def should_preempt(self, remaining_time, now):
+        return self.policy.should_preempt(remaining_time, now)
+
+
+# Arrivals scaled with the teller count so every case is overloaded the same
+# way and the ready queue sits at its bound, i.e. at the case's queue depth
+def case_workload(num_customers, num_tellers, seed=1):
+    scale = 3 / num_tellers
+    return list(generate_workload(num_customers, seed=seed,
+                                  min_interarrival=0.5 * scale, max_interarrival=2 * scale))
+
+
+# Run one case in this process: `repeats` runs on the plain engine, then one
+# instrumented pass for dispatch latency. Throughput is the best run, the one
+# least disturbed by the rest of the machine; the median and the spread
+# (how far the worst run fell below the best) show how noisy the case was.
+# Meant to run in a fresh process so ru_maxrss is this case's peak alone.
+def run_case(case):
+    policy, num_tellers, queue_depth, num_customers, repeats = case
+    workload = case_workload(num_customers, num_tellers)
+    quantum = QUANTUM if POLICIES[policy].needs_quantum else None
+
+    elapsed = []
+    for _ in range(repeats):
+        simulator = EventSimulator(policy, num_tellers, quantum, queue_depth)
+        started = time.perf_counter()
+        simulator.run(workload)
+        elapsed.append(time.perf_counter() - started)
+
+    timer = DispatchTimer(make_policy(policy, quantum))
+    EventSimulator(timer, num_tellers, quantum, queue_depth).run(workload)
+    latencies = timer.latencies
+    return {
+        "policy": policy,
+        "num_tellers": num_tellers,
+        "queue_depth": queue_depth,
+        "num_customers": num_customers,
+        "repeats": repeats,
+        "customers_per_second": num_customers / min(elapsed),
+        "median_customers_per_second": num_customers / statistics.median(elapsed),
+        "spread": 1 - min(elapsed) / max(elapsed),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "dispatch_latency_p50_us": latencies.quantile(0.5) / 1000,
+        "dispatch_latency_p99_us": latencies.quantile(0.99) / 1000,
+    }
+
+
+def case_name(result):
+    return (f"{result['policy']}/tellers={result['num_tellers']}/depth={result['queue_depth']}"
+            f"/customers={result['num_customers']}")
+
+
+# Every policy at every teller count and queue depth, each case in its own
+# spawned process (forked children would inherit the parent's RSS)
+def run_suite(policies=tuple(POLICIES), teller_counts=TELLER_COUNTS, queue_depths=QUEUE_DEPTHS,
+              num_customers=50_000, repeats=5):
+    cases = [(policy, num_tellers, queue_depth, num_customers, repeats)
+             for policy, num_tellers, queue_depth in itertools.product(policies, teller_counts, queue_depths)]
+    return [run_isolated(case) for case in cases]
+
+
+def run_isolated(case):
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(run_case, case).result()
+
+
+# Compare against the baseline, re-measuring regressed cases up to `attempts`
+# more times and keeping each one's best throughput, so one noisy run does
+# not fail the suite while a real regression stays below the threshold on
+# every attempt. Returns the compare() rows and regressions.
+def check(results, baseline, threshold=THRESHOLD, attempts=2, repeats=5):
+    rows, regressions = compare(results, baseline, threshold)
+    for _ in range(attempts):
+        if not regressions:
+            break
+        for index, result in enumerate(results):
+            if case_name(result) in regressions:
+                retry = run_isolated((result["policy"], result["num_tellers"], result["queue_depth"],
+                                      result["num_customers"], repeats))
+                if retry["customers_per_second"] > result["customers_per_second"]:
+                    results[index] = retry
+        rows, regressions = compare(results, baseline, threshold)
+    return rows, regressions
+
+
+# What the throughput figures depend on besides the code: interpreter build and the machine it ran on
+def machine():
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "compiler": platform.python_compiler(),
+        "platform": platform.platform(),
+        "processor": platform.machine(),
+        "cpu_model": cpu_model(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def cpu_model():
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or None
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+# Record the results as the baseline of their cases. Cases already in the
+# file that were not run (e.g. other policies) are kept, so a new policy can
+# be added without re-recording the others.
+def store_baseline(results, path=BASELINE_PATH):
+    try:
+        cases = load_baseline(path)["cases"]
+    except FileNotFoundError:
+        cases = {}
+    cases.update((case_name(result), result) for result in results)
+    with open(path, "w") as f:
+        json.dump({"machine": machine(), "cases": cases}, f, indent=2)
+        f.write("\n")
+
+
+# Compare best-run throughput against the baseline. A case regresses when it
+# falls by more than `threshold`, or by more than the spread its baseline runs
+# showed if that is wider: a case that varied by 30% between repeats when it
+# was recorded cannot flag a 25% drop. Returns (name, baseline, current,
+# change) rows and the names that regressed.
+def compare(results, baseline, threshold=THRESHOLD):
+    rows = []
+    regressions = []
+    for result in results:
+        name = case_name(result)
+        reference = baseline["cases"].get(name)
+        if reference is None:
+            rows.append((name, None, result["customers_per_second"], None))
+            continue
+        change = result["customers_per_second"] / reference["customers_per_second"] - 1
+        rows.append((name, reference["customers_per_second"], result["customers_per_second"], change))
+        if change < -max(threshold, reference.get("spread", 0.0)):
+            regressions.append(name)
+    return rows, regressions
+
+
+def print_results(results, rows):
+    changes = {name: change for name, _, _, change in rows}
+    print(f"{'case':<44} {'customers/s':>12} {'spread':>7} {'vs base':>8} {'peak RSS':>10} {'p50 µs':>8} {'p99 µs':>8}")
+    for result in results:
+        change = changes.get(case_name(result))
+        change = f"{change:+.1%}" if change is not None else "new"
+        print(f"{case_name(result):<44} {result['customers_per_second']:>12,.0f} {result['spread']:>7.1%} {change:>8} "
+              f"{result['peak_rss_kb'] / 1024:>8.1f}MB {result['dispatch_latency_p50_us']:>8.2f} "
+              f"{result['dispatch_latency_p99_us']:>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every scheduling policy against a stored baseline")
+    parser.add_argument("--customers", type=int, default=50_000)
+    parser.add_argument("--repeats", type=int, default=5, help="throughput is the best of this many runs")
+    parser.add_argument("--policies", default=",".join(POLICIES))
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="allowed throughput drop as a fraction of the baseline")
+    parser.add_argument("--attempts", type=int, default=2, help="re-measurements before a regression fails")
+    parser.add_argument("--update", action="store_true", help="write the results into the baseline, keeping cases that were not run")
+    args = parser.parse_args()
+
+    results = run_suite(args.policies.split(","), num_customers=args.customers, repeats=args.repeats)
+    if args.update:
+        store_baseline(results, args.baseline)
+        print_results(results, [])
+        print(f"Wrote {len(results)} cases into the baseline at {args.baseline}")
+        sys.exit(0)
+
+    try:
+        baseline = load_baseline(args.baseline)
+    except FileNotFoundError:
+        sys.exit(f"No baseline at {args.baseline}; run with --update first")
+    if baseline["machine"] != machine():
+        recorded = baseline["machine"]
+        print(f"Warning: baseline was recorded on {recorded['platform']} ({recorded.get('cpu_model')}, "
+              f"{recorded.get('cpu_count')} CPUs), Python {recorded['python']}; throughput is only "
+              f"comparable on the same machine", file=sys.stderr)
+    rows, regressions = check(results, baseline, args.threshold, args.attempts, args.repeats)
+    print_results(results, rows)
+    if regressions:
+        sys.exit(f"Throughput regressed by more than {args.threshold:.0%} in: {', '.join(regressions)}")
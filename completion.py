@@ -0,0 +1,85 @@
+import threading
+import time
+
+
+# Tracks customers from admission to departure so the main thread can sleep
+# until the last one leaves instead of sleeping a fixed time or polling.
+# Call admit() before a customer is offered to the ready queue, so customers
+# still in an admission waiting room count, and cancel() if it is turned away
+# (it then no longer counts as admitted); requeue() when it goes back after a quantum or a
+# preemption (it stays outstanding), depart() when it leaves, and close()
+# once no more arrivals will come. wait() returns as soon as the tracker is
+# closed and nothing is outstanding; shutdown_latency is how long after the
+# last departure (or close(), if later) the waiter woke up.
+class CompletionTracker:
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.reset()
+
+    def reset(self):
+        with self.condition:
+            self.outstanding = 0
+            self.admitted = 0
+            self.cancelled = 0
+            self.requeued = 0
+            self.departed = 0
+            self.closed = False
+            self.finished_at = None  # perf_counter() when the last customer left after close()
+            self.shutdown_latency = None
+
+    def admit(self):
+        with self.condition:
+            self.outstanding += 1
+            self.admitted += 1
+
+    def cancel(self):
+        with self.condition:
+            self.outstanding -= 1
+            self.admitted -= 1
+            self.cancelled += 1
+            self._check_done()
+
+    def requeue(self):
+        with self.condition:
+            self.requeued += 1
+
+    def depart(self):
+        with self.condition:
+            self.outstanding -= 1
+            self.departed += 1
+            self._check_done()
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self._check_done()
+
+    # Called with the condition held
+    def _check_done(self):
+        if self.closed and self.outstanding == 0 and self.finished_at is None:
+            self.finished_at = time.perf_counter()
+            self.condition.notify_all()
+
+    def done(self):
+        with self.condition:
+            return self.finished_at is not None
+
+    # Block until every admitted customer has departed; False on timeout
+    def wait(self, timeout=None):
+        with self.condition:
+            if not self.condition.wait_for(lambda: self.finished_at is not None, timeout):
+                return False
+            if self.shutdown_latency is None:
+                self.shutdown_latency = time.perf_counter() - self.finished_at
+            return True
+
+    def summary(self):
+        with self.condition:
+            return {
+                "admitted": self.admitted,
+                "cancelled": self.cancelled,
+                "requeued": self.requeued,
+                "departed": self.departed,
+                "outstanding": self.outstanding,
+                "shutdown_latency": self.shutdown_latency,
+            }
@@ -0,0 +1,7 @@
+# Bank configuration shared by the threaded simulators and the event-engine
+# tools (replicate, sweep, queueModel), kept apart from final.py so those
+# tools do not load the threaded stack just to read four numbers
+NUM_TELLERS = 3
+QUEUE_SIZE = 10
+MAX_SERVICE_TIME = 8
+QUANTUM_TIME = 2
@@ -0,0 +1,109 @@
+import sys
+import threading
+import time
+
+from accumulators import ShardedStats, StreamingStats
+from customerTable import CustomerTable
+
+
+# Drop-in replacement for threading.Lock that measures contention: how long
+# each acquire() waited for the lock and how long it was then held. The
+# statistics are updated while the lock is held, so they need no lock of their own.
+class InstrumentedLock:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.wait_times = StreamingStats()
+        self.hold_times = StreamingStats()
+        self.acquired_at = 0.0
+
+    def acquire(self, blocking=True, timeout=-1):
+        started = time.perf_counter()
+        acquired = self._lock.acquire(blocking, timeout)
+        if acquired:
+            self.acquired_at = time.perf_counter()
+            self.wait_times.add(self.acquired_at - started)
+        return acquired
+
+    def release(self):
+        self.hold_times.add(time.perf_counter() - self.acquired_at)
+        self._lock.release()
+
+    def locked(self):
+        return self._lock.locked()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    def reset(self):
+        with self._lock:
+            self.wait_times.clear()
+            self.hold_times.clear()
+
+    def report(self):
+        with self._lock:
+            return {
+                "acquisitions": self.wait_times.count,
+                "total_wait": self.wait_times.total,
+                "max_wait": self.wait_times.max if self.wait_times.count else 0.0,
+                "p99_wait": self.wait_times.quantile(0.99),
+                "total_hold": self.hold_times.total,
+                "max_hold": self.hold_times.max if self.hold_times.count else 0.0,
+            }
+
+
+def format_report(name, report):
+    return (f"{name}: {report['acquisitions']} acquisitions, waited {report['total_wait'] * 1000:.2f} ms "
+            f"(max {report['max_wait'] * 1000:.3f} ms), held {report['total_hold'] * 1000:.2f} ms "
+            f"(max {report['max_hold'] * 1000:.3f} ms)")
+
+
+# Record `completions` departures per teller thread the way the threaded
+# simulators do: every teller updating shared accumulators under one global
+# lock, or every teller recording into its own shard
+def record_completions(num_tellers, completions, sharded):
+    customers = CustomerTable(num_tellers * completions + 1)
+    for customer_id in range(1, num_tellers * completions + 1):
+        customers.add(customer_id, 0.0, 1.0)
+    lock = InstrumentedLock()
+    turnaround_times = StreamingStats()
+    waiting_times = StreamingStats()
+    teller_stats = ShardedStats(("turnaround_times", "waiting_times"))
+
+    def teller(teller_id):
+        stats = teller_stats.shard(teller_id)
+        for customer_id in range(teller_id, num_tellers * completions + 1, num_tellers):
+            end_time = time.time()
+            if sharded:
+                customers.end_service(customer_id, end_time)
+                stats["turnaround_times"].add(end_time - customers.arrival_time[customer_id])
+                stats["waiting_times"].add(1.0)
+            else:
+                with lock:
+                    customers.end_service(customer_id, end_time)
+                    turnaround_times.add(end_time - customers.arrival_time[customer_id])
+                    waiting_times.add(1.0)
+
+    threads = [threading.Thread(target=teller, args=(i,)) for i in range(1, num_tellers + 1)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if sharded:
+        teller_stats.snapshot()  # The merge step is part of the sharded cost
+    return time.perf_counter() - started, lock.report()
+
+
+if __name__ == "__main__":
+    counts = tuple(int(arg) for arg in sys.argv[1:]) or (2, 8, 32)
+    completions = 20_000
+    print(f"{'tellers':>8} {'global lock':>12} {'sharded':>10} {'lock wait':>12} {'max wait':>10}")
+    for num_tellers in counts:
+        locked_elapsed, report = record_completions(num_tellers, completions, sharded=False)
+        sharded_elapsed, _ = record_completions(num_tellers, completions, sharded=True)
+        print(f"{num_tellers:>8} {locked_elapsed:>11.3f}s {sharded_elapsed:>9.3f}s "
+              f"{report['total_wait'] * 1000:>10.1f}ms {report['max_wait'] * 1000:>8.2f}ms")
@@ -0,0 +1,144 @@
+import math
+from array import array
+
+NAN = math.nan
+
+# Per-customer columns, all float seconds; NaN means "not happened yet"
+FIELDS = ("arrival_time", "service_time", "remaining_time", "start_time", "first_start_time", "end_time")
+
+
+# Customer store backed by one preallocated typed array per field, indexed by
+# customer id. A customer costs 6 doubles + 1 int instead of an object with a
+# __dict__ or entries in several parallel dicts. Rows may be written from
+# several threads without a lock as long as each row has one writer at a time
+# (the arrival thread, then the teller serving that customer): single-element
+# writes and the in-place extend() in ensure_capacity() are atomic under the
+# GIL. add() itself must only be called from one thread at a time.
+class CustomerTable:
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        for name in FIELDS:
+            setattr(self, name, array("d", [NAN]) * capacity)
+        self.teller_id = array("i", [0]) * capacity
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, customer_id):
+        return 0 <= customer_id < self.capacity and not math.isnan(self.arrival_time[customer_id])
+
+    # Grow every column geometrically so that customer_id fits
+    def ensure_capacity(self, customer_id):
+        if customer_id < self.capacity:
+            return
+        new_capacity = self.capacity
+        while new_capacity <= customer_id:
+            new_capacity *= 2
+        extra = new_capacity - self.capacity
+        for name in FIELDS:
+            getattr(self, name).extend(array("d", [NAN]) * extra)
+        self.teller_id.extend(array("i", [0]) * extra)
+        self.capacity = new_capacity
+
+    def add(self, customer_id, arrival_time, service_time):
+        self.ensure_capacity(customer_id)
+        self.arrival_time[customer_id] = arrival_time
+        self.service_time[customer_id] = service_time
+        self.remaining_time[customer_id] = service_time
+        self.count += 1
+
+    def has_started(self, customer_id):
+        return not math.isnan(self.first_start_time[customer_id])
+
+    def is_complete(self, customer_id):
+        return not math.isnan(self.end_time[customer_id])
+
+    # Record the start of a service slice, remembering the very first one for response time
+    def start_service(self, customer_id, start_time, teller_id=0):
+        self.start_time[customer_id] = start_time
+        if math.isnan(self.first_start_time[customer_id]):
+            self.first_start_time[customer_id] = start_time
+        self.teller_id[customer_id] = teller_id
+
+    def end_service(self, customer_id, end_time):
+        self.end_time[customer_id] = end_time
+        self.remaining_time[customer_id] = 0.0
+
+    def nbytes(self):
+        columns = [getattr(self, name) for name in FIELDS] + [self.teller_id]
+        return sum(column.itemsize * len(column) for column in columns)
+
+
+# Memory benchmark: per-customer cost of a Customer object with __dict__ (as the
+# SJF and FCFS scripts kept), of the parallel dicts quantumAlgorithm.py kept, of
+# the policies customer records the threaded simulators now pass through their
+# queues (and drop on departure), and of the table
+def benchmark(num_customers=1_000_000):
+    import gc
+    import tracemalloc
+
+    class Customer:
+        def __init__(self, id, service_time, arrival_time):
+            self.id = id
+            self.service_time = service_time
+            self.remaining_time = service_time
+            self.arrival_time = arrival_time
+            self.start_time = None
+            self.end_time = None
+
+    def measure(build):
+        gc.collect()
+        tracemalloc.start()
+        kept = build()
+        allocated = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        del kept
+        return allocated / num_customers
+
+    # Every representation is measured after service, with start and end times filled in
+    def build_objects():
+        customers = []
+        for i in range(num_customers):
+            customer = Customer(i, 1.0 + i % 5, i * 0.5)
+            customer.start_time = i * 0.5 + 0.25
+            customer.end_time = i * 0.5 + 2.25
+            customers.append(customer)
+        return customers
+
+    def build_dicts():
+        dicts = ({}, {}, {}, {}, {})
+        arrival_times, service_times, remaining_times, first_starts, completions = dicts
+        for i in range(num_customers):
+            arrival_times[i] = i * 0.5
+            service_times[i] = 1.0 + i % 5
+            remaining_times[i] = 1.0 + i % 5
+            first_starts[i] = i * 0.5 + 0.25
+            completions[i] = i * 0.5 + 2.25
+        return dicts
+
+    def build_records():
+        return [[i, i * 0.5, 1.0 + i % 5, 0.0, i * 0.5 + 0.25] for i in range(num_customers)]
+
+    def build_table():
+        table = CustomerTable(num_customers)
+        for i in range(num_customers):
+            table.add(i, i * 0.5, 1.0 + i % 5)
+            table.start_service(i, i * 0.5 + 0.25, 1)
+            table.end_service(i, i * 0.5 + 2.25)
+        return table
+
+    results = {
+        "Customer objects": measure(build_objects),
+        "parallel dicts": measure(build_dicts),
+        "customer records": measure(build_records),
+        "CustomerTable": measure(build_table),
+    }
+    return results
+
+
+if __name__ == "__main__":
+    results = benchmark()
+    table_cost = results["CustomerTable"]
+    for name, per_customer in results.items():
+        print(f"{name:>17}: {per_customer:7.1f} bytes/customer ({per_customer / table_cost:4.1f}x CustomerTable)")
@@ -0,0 +1,253 @@
+import heapq
+import os
+import pickle
+import random
+import zlib
+from itertools import islice, repeat
+from operator import itemgetter
+
+from accumulators import StreamingStats
+from fieldState import FieldState
+from policies import ARRIVAL_TIME, FIRST_START_TIME, POLICIES, REMAINING_TIME, SchedulingPolicy, make_policy
+
+# Event kinds, ordered so that simultaneous events are handled departures first
+DEPARTURE = 0
+QUANTUM_EXPIRED = 1
+ARRIVAL = 2
+
+# Events between checkpoints when run() is given a checkpoint path
+CHECKPOINT_EVERY = 1_000_000
+# First bytes of a checkpoint file; the rest is a zlib-compressed pickle
+CHECKPOINT_MAGIC = b"EVSIM2\n"
+# Bump whenever a change to the engine or the policies changes results, so
+# that sweep caches keyed on it are not reused across the change
+ENGINE_VERSION = 2
+
+
+# Generate the same workload final.py draws: integer service times and
+# uniform inter-arrival gaps, as (arrival_time, service_time) pairs
+def generate_workload(num_customers, seed=None, min_service_time=3, max_service_time=8,
+                      min_interarrival=0.5, max_interarrival=2):
+    rng = random.Random(seed)
+    arrival_time = 0.0
+    for _ in range(num_customers):
+        service_time = rng.randint(min_service_time, max_service_time)
+        yield arrival_time, service_time
+        arrival_time += rng.uniform(min_interarrival, max_interarrival)
+
+
+# Discrete-event simulator: a virtual clock advanced from an event heap,
+# so service time costs nothing in wall-clock time. This is the single
+# dispatch core; the scheduling algorithm is a policies.SchedulingPolicy
+# (or its name) that owns the ready queue.
+class EventSimulator(FieldState):
+    # Everything but the workload iterator, which load() rebuilds
+    state_fields = ("policy", "preemptive", "num_tellers", "quantum", "queue_size", "clock", "events", "sequence",
+                    "idle_tellers", "running", "next_customer_id", "waiting", "unstarted", "turnaround_times",
+                    "waiting_times", "response_times", "dropped", "preemptions")
+
+    def __init__(self, policy, num_tellers, quantum=None, queue_size=None):
+        self.policy = make_policy(policy, quantum)
+        self.preemptive = self.policy.preemptive
+        self.num_tellers = num_tellers
+        self.quantum = quantum
+        self.queue_size = queue_size
+
+        self.clock = 0.0
+        self.events = []
+        self.sequence = 0
+        self.idle_tellers = list(range(1, num_tellers + 1))
+        # Per teller: the (customer, slice start, slice end, slice length) it was last given.
+        # Events carry this tuple, so an event whose slice was preempted is recognised as stale.
+        self.running = [None] * (num_tellers + 1)
+        self.next_customer_id = 1
+        # Customers the policy is holding; counted here so the hot loop never calls len(policy)
+        self.waiting = 0
+        # Admitted customers not yet dispatched. queue_size bounds these only, as in the
+        # threaded queues, so customers requeued after a quantum or a preemption never
+        # turn arrivals away.
+        self.unstarted = 0
+
+        # Same bookkeeping as final.py's calculate_stats
+        self.turnaround_times = StreamingStats()
+        self.waiting_times = StreamingStats()
+        self.response_times = StreamingStats()
+        self.dropped = 0
+        self.preemptions = 0
+
+    def schedule(self, time, kind, teller_id, payload):
+        heapq.heappush(self.events, (time, kind, self.sequence, teller_id, payload))
+        self.sequence += 1
+
+    # Arrivals are pulled lazily so only one pending arrival sits on the heap
+    def schedule_next_arrival(self, arrivals):
+        for record in arrivals:
+            arrival_time, service_time = record[0], record[1]
+            customer = [self.next_customer_id, arrival_time, service_time, service_time, None]
+            self.next_customer_id += 1
+            self.schedule(arrival_time, ARRIVAL, None, customer)
+            return
+
+    def ready_count(self):
+        return self.waiting
+
+    def on_arrival(self, customer):
+        if self.queue_size is not None and self.unstarted >= self.queue_size:
+            self.dropped += 1
+            return
+        self.policy.on_arrival(customer, self.clock)
+        self.waiting += 1
+        self.unstarted += 1
+        if self.preemptive and not self.idle_tellers:
+            self.preempt()
+
+    # Preemptive policies: free the teller whose customer has the most work
+    # left if the policy prefers a waiting customer; process() refills it
+    def preempt(self):
+        clock = self.clock
+        # Every teller is busy, so every running slot holds a slice
+        slice_ = max(self.running[1:], key=itemgetter(2))
+        customer, _, end_time, _ = slice_
+        teller_id = self.running.index(slice_)
+        if self.policy.should_preempt(end_time - clock, clock):
+            customer[REMAINING_TIME] = end_time - clock
+            self.running[teller_id] = None
+            self.preemptions += 1
+            self.policy.on_quantum_expired(customer, clock)
+            self.waiting += 1
+            heapq.heappush(self.idle_tellers, teller_id)
+
+    # workload yields (arrival_time, service_time, ...) sorted by arrival time,
+    # e.g. generate_workload() or a trace from traceLoader.load_trace().
+    # With a checkpoint path, the full state is saved there every
+    # checkpoint_every events; load() and resume() continue from it.
+    def run(self, workload, checkpoint=None, checkpoint_every=CHECKPOINT_EVERY):
+        self.arrivals = iter(workload)
+        self.schedule_next_arrival(self.arrivals)
+        return self.resume(checkpoint, checkpoint_every)
+
+    # Process events until none are left, checkpointing along the way if asked
+    def resume(self, checkpoint=None, checkpoint_every=CHECKPOINT_EVERY):
+        if checkpoint is None:
+            self.process()
+            return self
+        while self.process(checkpoint_every):
+            self.save(checkpoint)
+        return self
+
+    # Process up to `limit` events (all of them if None); True if any are left
+    def process(self, limit=None):
+        arrivals = self.arrivals
+        # Bound once: this loop runs once per event
+        events, running, idle_tellers = self.events, self.running, self.idle_tellers
+        heappop, heappush = heapq.heappop, heapq.heappush
+        policy = self.policy
+        on_arrival, requeue, select_next = self.on_arrival, policy.on_quantum_expired, policy.select_next
+        add_turnaround, add_waiting = self.turnaround_times.add, self.waiting_times.add
+        add_response = self.response_times.add
+        # Most policies keep nothing per customer; skip the empty on_complete() call for them
+        on_complete = policy.on_complete
+        if type(policy).on_complete is SchedulingPolicy.on_complete:
+            on_complete = None
+        for _ in repeat(None) if limit is None else repeat(None, limit):
+            if not events:
+                break
+            time, kind, _, teller_id, payload = heappop(events)
+            self.clock = time
+            if kind == ARRIVAL:
+                on_arrival(payload)
+                self.schedule_next_arrival(arrivals)
+            elif running[teller_id] is not payload:
+                continue  # The slice was cut short by a preemption
+            elif kind == DEPARTURE:
+                # Handled inline too: FCFS and SJF take this branch on most events
+                customer = payload[0]
+                arrival_time = customer[ARRIVAL_TIME]
+                add_turnaround(time - arrival_time)
+                add_waiting(payload[1] - arrival_time)
+                add_response(customer[FIRST_START_TIME] - arrival_time)
+                if on_complete is not None:
+                    on_complete(customer, time)
+                heappush(idle_tellers, teller_id)
+            else:
+                # Quantum expired, handled inline: RR takes this branch on most events
+                payload[0][REMAINING_TIME] -= payload[3]
+                requeue(payload[0], time)
+                self.waiting += 1
+                heappush(idle_tellers, teller_id)
+            # Hand waiting customers to idle tellers, lowest teller id first
+            while idle_tellers and self.waiting:
+                teller_id = heappop(idle_tellers)
+                customer = select_next(time)
+                self.waiting -= 1
+                if customer[FIRST_START_TIME] is None:
+                    customer[FIRST_START_TIME] = time
+                    self.unstarted -= 1
+                # Read after select_next(): a policy may vary the quantum per customer
+                quantum, remaining_time = policy.quantum, customer[REMAINING_TIME]
+                if quantum is not None and remaining_time > quantum:
+                    end_time = time + quantum
+                    slice_ = running[teller_id] = (customer, time, end_time, quantum)
+                    heappush(events, (end_time, QUANTUM_EXPIRED, self.sequence, teller_id, slice_))
+                else:
+                    end_time = time + remaining_time
+                    slice_ = running[teller_id] = (customer, time, end_time, remaining_time)
+                    heappush(events, (end_time, DEPARTURE, self.sequence, teller_id, slice_))
+                self.sequence += 1
+        return bool(events)
+
+    # Write the full state to `path`, replacing it atomically: clock, pending
+    # events, every teller's slice, the policy's ready queue, the statistics
+    # and how many arrivals have been read. One pickle keeps shared objects
+    # shared, so stale-event detection by identity still works after load().
+    def save(self, path):
+        data = CHECKPOINT_MAGIC + zlib.compress(pickle.dumps(self, pickle.HIGHEST_PROTOCOL))
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+
+    # Rebuild a simulator from save(), ready for resume(). The workload is not
+    # stored: pass the same one again (same seed and parameters, or the same
+    # trace) and the arrivals already read are skipped, which leaves
+    # generate_workload()'s random stream exactly where it was.
+    @classmethod
+    def load(cls, path, workload):
+        with open(path, "rb") as f:
+            data = f.read()
+        if not data.startswith(CHECKPOINT_MAGIC):
+            raise ValueError(f"{path} is not an event engine checkpoint")
+        sim = pickle.loads(zlib.decompress(data[len(CHECKPOINT_MAGIC):]))
+        sim.arrivals = islice(iter(workload), sim.next_customer_id - 1, None)
+        return sim
+
+    def stats(self):
+        served = len(self.turnaround_times)
+        return {
+            "served": served,
+            "dropped": self.dropped,
+            "preemptions": self.preemptions,
+            "avg_turnaround_time": self.turnaround_times.mean,
+            "avg_waiting_time": self.waiting_times.mean,
+            "avg_response_time": self.response_times.mean,
+            "makespan": self.clock,
+        }
+
+
+# Convenience wrapper: build a simulator, run it over a workload and return it
+def simulate(policy, workload, num_tellers=3, quantum=None, queue_size=None):
+    return EventSimulator(policy, num_tellers, quantum, queue_size).run(workload)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    num_customers = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    for policy in POLICIES:
+        started = time.perf_counter()
+        sim = simulate(policy, generate_workload(num_customers, seed=1), num_tellers=3, quantum=2, queue_size=10)
+        elapsed = time.perf_counter() - started
+        stats = sim.stats()
+        print(f"{policy}: {stats['served']} served, {stats['dropped']} dropped in {elapsed:.2f}s wall-clock "
+              f"({stats['served'] / elapsed:,.0f} customers/s), "
+              f"avg turnaround {stats['avg_turnaround_time']:.4f}, avg waiting {stats['avg_waiting_time']:.4f}")
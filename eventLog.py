@@ -0,0 +1,183 @@
+import collections
+import json
+import struct
+import sys
+import threading
+import time
+
+from simClock import clock
+
+# Log levels; records below the configured level cost one comparison
+DEBUG = 10
+INFO = 20
+WARNING = 30
+OFF = 100
+LEVELS = {"debug": DEBUG, "info": INFO, "warning": WARNING, "off": OFF}
+
+# Event kinds
+ENQUEUE = 1
+DISPATCH = 2
+PREEMPT = 3
+DEPARTURE = 4
+DROP = 5
+BALK = 6
+KIND_NAMES = {ENQUEUE: "enqueue", DISPATCH: "dispatch", PREEMPT: "preempt", DEPARTURE: "departure", DROP: "drop",
+              BALK: "balk"}
+
+# Console rendering, matching the messages the simulators used to print
+CONSOLE_FORMATS = {
+    ENQUEUE: "Customer {customer_id} enters the Queue with service time {value:g} at {time}",
+    DISPATCH: "Customer {customer_id} is in Teller {teller_id} at {time}",
+    PREEMPT: "Customer {customer_id} leaves Teller {teller_id} with {value:g} seconds remaining at {time}",
+    DEPARTURE: "Customer {customer_id} leaves the Teller {teller_id} at {time}",
+    DROP: "Queue is FULL. Customer {customer_id} turned away at {time}",
+    BALK: "Customer {customer_id} sees {value:g} waiting and leaves without joining at {time}",
+}
+
+# Binary record: timestamp, level, kind, customer id, teller id, value
+RECORD = struct.Struct("<dBBiid")
+
+
+# In-memory event log for the teller hot paths.
+# record() only appends a tuple to a bounded ring buffer (deque appends are
+# atomic, so no lock is taken); a background writer drains it in batches to
+# the console, an NDJSON file (.ndjson/.jsonl) or a binary file (anything
+# else). If the writer falls behind, the oldest events are overwritten and
+# counted (approximately, without locking) in `overwritten`, which close()
+# reports on stderr. Nothing is written until start() is called; flush()
+# waits until everything recorded so far is out, e.g. before printing stats.
+class EventLog:
+    def __init__(self, level=DEBUG, sink="console", capacity=65536, flush_interval=0.2):
+        self.level = level
+        self.sink = sink
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.buffer = collections.deque(maxlen=capacity)
+        self.overwritten = 0
+        self.written = 0
+        self.writer = None
+        self.closing = threading.Event()
+        self.wakeup = threading.Event()  # Set to make the writer drain now
+        self.flushes = collections.deque()  # Events set once the writer has drained past them
+
+    def enabled(self, level):
+        return level >= self.level
+
+    def record(self, kind, customer_id, teller_id=0, value=0.0, level=DEBUG):
+        if level < self.level:
+            return
+        if len(self.buffer) == self.capacity:
+            self.overwritten += 1
+        self.buffer.append((clock.time(), level, kind, customer_id, teller_id, value))
+
+    def start(self):
+        if self.writer is None and self.sink is not None and self.level < OFF:
+            self.closing.clear()
+            self.writer = threading.Thread(target=self._write_loop, name="event-log-writer", daemon=True)
+            self.writer.start()
+        return self
+
+    # Block until every event recorded before the call has been written
+    def flush(self):
+        if self.writer is None:
+            return
+        done = threading.Event()
+        self.flushes.append(done)
+        self.wakeup.set()
+        done.wait()
+
+    # Stop the writer after it has flushed everything recorded so far, and
+    # warn if the ring buffer overwrote events before the writer got to them
+    def close(self):
+        if self.writer is not None:
+            self.closing.set()
+            self.wakeup.set()
+            self.writer.join()
+            self.writer = None
+        if self.overwritten:
+            print(f"Event log: {self.overwritten} events were overwritten before they were written; "
+                  f"raise the capacity ({self.capacity}) or the log level", file=sys.stderr)
+
+    def _drain(self):
+        batch = []
+        popleft = self.buffer.popleft
+        try:
+            for _ in range(self.capacity):
+                batch.append(popleft())
+        except IndexError:
+            pass
+        return batch
+
+    def _write_loop(self):
+        if self.sink == "console":
+            out, write_batch = sys.stdout, self._write_console
+        elif self.sink.endswith((".ndjson", ".jsonl")):
+            out, write_batch = open(self.sink, "w"), self._write_ndjson
+        else:
+            out, write_batch = open(self.sink, "wb"), self._write_binary
+        try:
+            while True:
+                self.wakeup.wait(self.flush_interval)
+                self.wakeup.clear()
+                closing = self.closing.is_set()
+                # Taken before draining: whatever was recorded before these flushes is in this batch
+                flushes = [self.flushes.popleft() for _ in range(len(self.flushes))]
+                batch = self._drain()
+                if batch:
+                    write_batch(out, batch)
+                    out.flush()
+                    self.written += len(batch)
+                for done in flushes:
+                    done.set()
+                if closing and not self.buffer:
+                    break
+        finally:
+            if out is not sys.stdout:
+                out.close()
+
+    def _write_console(self, out, batch):
+        out.write("".join(format_console(event) + "\n" for event in batch))
+
+    def _write_ndjson(self, out, batch):
+        out.write("".join(
+            json.dumps({"time": timestamp, "level": level, "event": KIND_NAMES[kind],
+                        "customer": customer_id, "teller": teller_id, "value": value}) + "\n"
+            for timestamp, level, kind, customer_id, teller_id, value in batch))
+
+    def _write_binary(self, out, batch):
+        out.write(b"".join(RECORD.pack(*event) for event in batch))
+
+
+# One event as the console sink prints it
+def format_console(event):
+    timestamp, _, kind, customer_id, teller_id, value = event
+    formatted_time = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp))
+    return CONSOLE_FORMATS[kind].format(customer_id=customer_id, teller_id=teller_id, value=value, time=formatted_time)
+
+
+# Read back a binary event log as (time, level, kind, customer_id, teller_id, value) tuples
+def read_binary_log(path):
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(RECORD.size * 4096)
+            if not chunk:
+                break
+            yield from RECORD.iter_unpack(chunk)
+
+
+# Build an EventLog from the --log-level and --log-file command line options
+def from_argv(argv, default_level=DEBUG):
+    level = default_level
+    sink = "console"
+    if "--log-level" in argv:
+        level = LEVELS[argv[argv.index("--log-level") + 1].lower()]
+    if "--log-file" in argv:
+        sink = argv[argv.index("--log-file") + 1]
+    return EventLog(level, sink)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        sys.exit("usage: python eventLog.py <events.bin>  (print a binary event log as the console would)")
+    for event in read_binary_log(sys.argv[1]):
+        print(format_console(event))
@@ -1,164 +1,244 @@
 import threading
-import time
 import random
-import queue
-from collections import deque
-
-# Constants
-NUM_TELLERS = 3
-QUEUE_SIZE = 10
-MAX_SERVICE_TIME = 8
-QUANTUM_TIME = 2
-
-# Thread-safe queue for customers
-customer_queue = queue.Queue(QUEUE_SIZE)
+import sys
+
+from accumulators import ShardedStats, StreamingStats
+from admission import BALKED, BoundedWait, format_admission, from_argv as admission_from_argv
+from asyncTellers import AsyncTellerPool
+from completion import CompletionTracker
+from constants import MAX_SERVICE_TIME, NUM_TELLERS, QUANTUM_TIME, QUEUE_SIZE
+from contention import InstrumentedLock, format_report
+from eventLog import BALK, DEPARTURE, DISPATCH, DROP, ENQUEUE, INFO, PREEMPT, WARNING, EventLog, from_argv
+from eventEngine import EventSimulator, generate_workload
+from mlfqQueue import MLFQQueue
+from policies import ARRIVAL_TIME, CUSTOMER_ID, REMAINING_TIME, SERVICE_TIME, format_occupancy
+from simClock import clock, format_overshoot, from_argv as clock_from_argv
+from stealQueue import WorkStealingQueues, format_steals, teller_queue
+from threadedTellers import STOP, PolicyQueue, new_customer, serve
+from traceLoader import load_trace, replay
+
+# Thread-safe ready queue for customers; main() replaces it with one for each policy
+customer_queue = PolicyQueue("FCFS", QUEUE_SIZE)
+
+# "shared": every teller takes from customer_queue; "stealing": per-teller
+# queues with work stealing (stealQueue.WorkStealingQueues), for high teller counts
+dispatcher = "shared"
 
 # Statistics tracking
-arrival_times = {}
-service_times = {}
-completion_times = {}
-turnaround_times = []
-waiting_times = []
+turnaround_times = StreamingStats()
+waiting_times = StreamingStats()
 
-# Lock for thread-safe updates to statistics
-lock = threading.Lock()
+# Per-teller statistics buffers, merged into the totals above by merge_teller_stats()
+teller_stats = ShardedStats(("turnaround_times", "waiting_times"))
+
+# Lock for the shared totals; instrumented to show contention
+lock = InstrumentedLock()
 
 # Flag to stop threads
 stop_event = threading.Event()
 
-def timeConverter(t1):
-    local_time = time.localtime(t1)
-    formatted_time = time.strftime("%Y-%m-%d %H:%M:%S", local_time)
-    return formatted_time
+# Customers admitted but not yet departed; main() sleeps on it until the last one leaves
+completion = CompletionTracker()
+
+# Admission control for arrivals at a full queue; never blocks the arrival generator
+admission = BoundedWait(1.0)
 
-def empty_queue(q):
-    while not q.empty():
-        q.get()
+# Buffered event log for the teller hot paths; written by a background thread once started
+event_log = EventLog()
 
 # Common Customer Arrival Function
-def customer_arrival(customer_id):
-    service_time = random.randint(3, MAX_SERVICE_TIME)
-    arrival_time = time.time()
-    with lock:
-        arrival_times[customer_id] = arrival_time
-        service_times[customer_id] = service_time
-    print(f"Customer{customer_id} enters the Queue with service time {service_time} at {timeConverter(arrival_time)}")
-    try:
-        customer_queue.put((service_time, customer_id), timeout=1)
-    except queue.Full:
-        print("Queue is FULL.")
-
-# FCFS Teller Service Function
-def teller_service_fcfs(teller_id):
-    while not stop_event.is_set():
-        try:
-            service_time, customer_id = customer_queue.get(timeout=1)
-            start_time = time.time()
-            print(f"Customer {customer_id} is in Teller {teller_id} at {timeConverter(start_time)}")
-            time.sleep(service_time)
-            end_time = time.time()
-            with lock:
-                completion_times[customer_id] = end_time
-                turnaround_time = end_time - arrival_times[customer_id]
-                turnaround_times.append(turnaround_time)
-                waiting_time = start_time - arrival_times[customer_id]
-                waiting_times.append(waiting_time)
-            print(f"Customer {customer_id} leaves the Teller {teller_id} at {timeConverter(end_time)}")
-        except queue.Empty:
-            continue
-
-# SJF Teller Service Function
-def teller_service_sjf(teller_id):
-    while not stop_event.is_set():
-        try:
-            with lock:
-                sorted_customers = sorted(list(customer_queue.queue), key=lambda x: x[0])
-                customer_queue.queue.clear()
-                for customer in sorted_customers:
-                    customer_queue.put_nowait(customer)
-
-            service_time, customer_id = customer_queue.get(timeout=1)
-            start_time = time.time()
-            print(f"Customer {customer_id} is in Teller {teller_id} at {timeConverter(start_time)}")
-            time.sleep(service_time)
-            end_time = time.time()
-            with lock:
-                completion_times[customer_id] = end_time
-                turnaround_time = end_time - arrival_times[customer_id]
-                turnaround_times.append(turnaround_time)
-                waiting_time = start_time - arrival_times[customer_id]
-                waiting_times.append(waiting_time)
-            print(f"Customer {customer_id} leaves the Teller {teller_id} at {timeConverter(end_time)}")
-        except queue.Empty:
-            continue
-
-# Round Robin Teller Service Function
-def teller_service_rr(teller_id):
-    while not stop_event.is_set():
-        try:
-            service_time, customer_id = customer_queue.get(timeout=1)
-            print(f"Customer {customer_id} is in Teller {teller_id} for a quantum of {QUANTUM_TIME}")
-            start_time = time.time()
-            if service_time <= QUANTUM_TIME:
-                time.sleep(service_time)
-                end_time = time.time()
-                with lock:
-                    completion_times[customer_id] = end_time
-                    turnaround_time = end_time - arrival_times[customer_id]
-                    turnaround_times.append(turnaround_time)
-                    waiting_time = start_time - arrival_times[customer_id]
-                    waiting_times.append(waiting_time)
-                print(f"Customer {customer_id} leaves the Teller{teller_id}")
-            else:
-                time.sleep(QUANTUM_TIME)
-                remaining_time = service_time - QUANTUM_TIME
-                customer_queue.put((remaining_time, customer_id))
-        except queue.Empty:
-            continue
-
-# Start Tellers as Threads for a Given Service Function
-def start_tellers(service_function):
+def customer_arrival(customer_id, service_time=None):
+    if service_time is None:
+        service_time = random.randint(3, MAX_SERVICE_TIME)
+    completion.admit()  # Outstanding until it departs or customer_rejected() cancels it
+    admission.offer(new_customer(customer_id, clock.time(), service_time))  # Admits, turns away or hands to a waiting room at once
+
+# Called by the admission stage, possibly from its own thread, once a customer is in the
+# ready queue. The customer record itself carries its times through the queue.
+def customer_admitted(customer):
+    event_log.record(ENQUEUE, customer[CUSTOMER_ID], value=customer[SERVICE_TIME])
+
+# Called by the admission stage, possibly from its own thread, for customers it turned away
+def customer_rejected(customer, outcome):
+    customer_id = customer[CUSTOMER_ID]
+    completion.cancel()
+    if outcome == BALKED:
+        event_log.record(BALK, customer_id, value=admission.waiting(), level=INFO)
+    else:
+        event_log.record(DROP, customer_id, level=WARNING)
+
+# Teller callbacks for threadedTellers.serve(); each runs on the teller's own thread
+def customer_started(teller_id, customer, start_time):
+    event_log.record(DISPATCH, customer[CUSTOMER_ID], teller_id)
+
+def customer_requeued(teller_id, customer):
+    event_log.record(PREEMPT, customer[CUSTOMER_ID], teller_id, customer[REMAINING_TIME])
+    completion.requeue()
+
+def customer_departed(teller_id, customer, start_time, end_time):
+    customer_id = customer[CUSTOMER_ID]
+    stats = teller_stats.shard(teller_id)  # This teller's own accumulators, recorded without a lock
+    stats["turnaround_times"].add(end_time - customer[ARRIVAL_TIME])
+    stats["waiting_times"].add(start_time - customer[ARRIVAL_TIME])
+    event_log.record(DEPARTURE, customer_id, teller_id)
+    completion.depart()
+
+# Teller Service Function: the ready queue's policy picks the customer and its slice
+def teller_service(teller_id):
+    serve(teller_id, teller_queue(customer_queue, teller_id), customer_departed, customer_started,
+          customer_requeued, stop_event)
+
+# Every policy gets a threadedTellers.PolicyQueue (MLFQ its subclass, for the occupancy
+# report), whose requeue() never blocks. With the stealing dispatcher FCFS, SJF and RR
+# get per-teller queues instead.
+def new_customer_queue(policy, num_tellers):
+    if dispatcher == "stealing" and policy != "MLFQ":
+        return WorkStealingQueues.for_policy(num_tellers, QUEUE_SIZE, policy, QUANTUM_TIME)
+    if policy == "MLFQ":
+        return MLFQQueue(QUEUE_SIZE, QUANTUM_TIME)
+    return PolicyQueue(policy, QUEUE_SIZE, QUANTUM_TIME)
+
+# Start Tellers as Threads
+def start_tellers(num_tellers):
     tellers = []
-    for i in range(1, NUM_TELLERS + 1):
-        t = threading.Thread(target=service_function, args=(i,))
+    for i in range(1, num_tellers + 1):
+        t = threading.Thread(target=teller_service, args=(i,))
         t.start()
         tellers.append(t)
     return tellers
 
+# Wake every teller with a STOP item so it exits at once, then join them.
+# After an interrupt the tellers leave on their own once they see stop_event.
+def stop_tellers(tellers):
+    if not stop_event.is_set():
+        for _ in tellers:
+            customer_queue.put(STOP)
+    for t in tellers:
+        t.join()
+
 # Main Loop to Simulate Customer Arrivals
-def main(service_function, description):
-    empty_queue(customer_queue)
+def main(policy, description, trace=None, num_tellers=NUM_TELLERS):
+    global customer_queue
+    customer_queue = new_customer_queue(policy, num_tellers)
+    admission.attach(customer_queue, QUEUE_SIZE, on_admit=customer_admitted, on_reject=customer_rejected)
     customer_id = 1
+    start_time = clock.time()
     try:
-        tellers = start_tellers(service_function)
-        start_time = time.time()
-        while customer_id <= 50:
+        tellers = start_tellers(num_tellers)
+        if trace is not None:
+            replay(load_trace(trace), customer_arrival, stop_event)
+        while trace is None and customer_id <= 50:
             customer_arrival(customer_id)
             customer_id += 1
-            time.sleep(random.uniform(0.5, 2))  # Random arrival time
+            clock.sleep(random.uniform(0.5, 2))  # Random arrival time
     except KeyboardInterrupt:
         print("Simulation stopped.")
         stop_event.set()
     finally:
-        for t in tellers:
-            t.join()
-        calculate_stats(description)
+        completion.close()
+        if not stop_event.is_set():
+            completion.wait()  # Returns the moment the last admitted customer departs
+        admission.close(discard=stop_event.is_set())
+        stop_tellers(tellers)
+        calculate_stats(description, completion.shutdown_latency)
+        print(format_admission(admission.report(completion.summary()["departed"], clock.time() - start_time)))
+        print(format_overshoot(clock.report()))
+        clock.reset()
+        if isinstance(customer_queue, MLFQQueue):
+            print(format_occupancy(customer_queue.occupancy()))
+        elif isinstance(customer_queue, WorkStealingQueues):
+            print(format_steals(customer_queue.steals))
+        completion.reset()
         stop_event.clear()
 
+# Run the same 50-customer experiment (or a recorded trace) on the virtual clock instead of real threads
+def main_virtual(policy, description, num_customers=50, seed=None, trace=None, num_tellers=NUM_TELLERS):
+    turnaround_times.clear()
+    waiting_times.clear()
+    if trace is not None:
+        workload = load_trace(trace)
+    else:
+        workload = generate_workload(num_customers, seed, max_service_time=MAX_SERVICE_TIME)
+    sim = EventSimulator(policy, num_tellers, quantum=QUANTUM_TIME, queue_size=QUEUE_SIZE).run(workload)
+    with lock:
+        turnaround_times.merge(sim.turnaround_times)
+        waiting_times.merge(sim.waiting_times)
+    calculate_stats(description)
+    if hasattr(sim.policy, "occupancy"):
+        print(format_occupancy(sim.policy.occupancy(sim.clock)))
+
+# Run the experiment on the asyncio backend: tellers are coroutines sharing one policy-driven ready queue
+def main_async(policy, description, trace=None, num_tellers=NUM_TELLERS):
+    turnaround_times.clear()
+    waiting_times.clear()
+    if trace is not None:
+        workload = load_trace(trace)
+    else:
+        workload = generate_workload(50, max_service_time=MAX_SERVICE_TIME)
+    pool = AsyncTellerPool(policy, num_tellers, quantum=QUANTUM_TIME, queue_size=QUEUE_SIZE, speedup=clock.speedup,
+                          log=event_log).run(workload)
+    with lock:
+        turnaround_times.merge(pool.turnaround_times)
+        waiting_times.merge(pool.waiting_times)
+    calculate_stats(description)
+    if hasattr(pool.policy, "occupancy"):
+        print(format_occupancy(pool.policy.occupancy(pool.now())))
+
+# Fold the per-teller buffers into the totals; called once the tellers have stopped
+def merge_teller_stats():
+    with lock:
+        teller_stats.merge_into({"turnaround_times": turnaround_times, "waiting_times": waiting_times})
+        teller_stats.clear()
+
 # Calculate and Print Statistics
-def calculate_stats(description):
+def calculate_stats(description, shutdown_latency=None):
+    event_log.flush()  # Console events first, so they do not land inside the stats block
+    merge_teller_stats()
     with lock:
-        avg_turnaround_time = sum(turnaround_times) / len(turnaround_times)
-        avg_waiting_time = sum(waiting_times) / len(waiting_times)
+        avg_turnaround_time = turnaround_times.mean
+        avg_waiting_time = waiting_times.mean
     print(f"\nStatistics for {description}:")
     print(f"Average Turnaround Time: {avg_turnaround_time:.4f} seconds")
     print(f"Average Waiting Time: {avg_waiting_time:.4f} seconds")
+    if shutdown_latency is not None:
+        print(f"Shutdown latency: {shutdown_latency * 1000:.2f} ms after the last departure")
+    print(format_report("Stats lock", lock.report()))
+    lock.reset()
 
 # Run the Simulations
 if __name__ == "__main__":
-    print("Starting FCFS Simulation...")
-    main(teller_service_fcfs, "FCFS")
-    print("\nStarting SJF Simulation...")
-    main(teller_service_sjf, "SJF")
-    print("\nStarting Round Robin Simulation...")
-    main(teller_service_rr, "Round Robin")
+    # Optional: --trace <file.csv|file.bin> replays recorded arrivals instead of random ones
+    trace = sys.argv[sys.argv.index("--trace") + 1] if "--trace" in sys.argv else None
+    # Optional: --log-level debug|info|warning|off and --log-file events.ndjson|events.bin
+    event_log = from_argv(sys.argv).start()
+    # Optional: --admission reject|balk|wait|overflow for arrivals that find the queue full
+    admission = admission_from_argv(sys.argv)
+    # Optional: --tellers N and --dispatcher shared|stealing (per-teller queues with work stealing)
+    num_tellers = int(sys.argv[sys.argv.index("--tellers") + 1]) if "--tellers" in sys.argv else NUM_TELLERS
+    if "--dispatcher" in sys.argv:
+        dispatcher = sys.argv[sys.argv.index("--dispatcher") + 1]
+    # Optional: --speedup N runs the threaded (or asyncio) tellers N times faster; times stay in simulated seconds
+    clock_from_argv(sys.argv)
+    try:
+        if "--virtual" in sys.argv:
+            main_virtual("FCFS", "FCFS", trace=trace, num_tellers=num_tellers)
+            main_virtual("SJF", "SJF", trace=trace, num_tellers=num_tellers)
+            main_virtual("RR", "Round Robin", trace=trace, num_tellers=num_tellers)
+            main_virtual("MLFQ", "MLFQ", trace=trace, num_tellers=num_tellers)
+        # Optional: --backend asyncio runs tellers as coroutines instead of threads
+        elif "--backend" in sys.argv and sys.argv[sys.argv.index("--backend") + 1] == "asyncio":
+            main_async("FCFS", "FCFS", trace, num_tellers=num_tellers)
+            main_async("SJF", "SJF", trace, num_tellers=num_tellers)
+            main_async("RR", "Round Robin", trace, num_tellers=num_tellers)
+            main_async("MLFQ", "MLFQ", trace, num_tellers=num_tellers)
+        else:
+            print("Starting FCFS Simulation...")
+            main("FCFS", "FCFS", trace, num_tellers=num_tellers)
+            print("\nStarting SJF Simulation...")
+            main("SJF", "SJF", trace, num_tellers=num_tellers)
+            print("\nStarting Round Robin Simulation...")
+            main("RR", "Round Robin", trace, num_tellers=num_tellers)
+            print("\nStarting MLFQ Simulation...")
+            main("MLFQ", "MLFQ", trace, num_tellers=num_tellers)
+    finally:
+        event_log.close()
@@ -0,0 +1,17 @@
+from policies import MLFQPolicy
+from simClock import clock
+from threadedTellers import PolicyQueue
+
+
+# Bounded, thread-safe multi-level feedback queue for the threaded tellers:
+# a threadedTellers.PolicyQueue over policies.MLFQPolicy, so the threaded and
+# virtual-clock runs schedule identically. get() hands out the quantum of the
+# level served and requeue() demotes; maxsize bounds only customers that have
+# not had a quantum yet, so demoted customers never turn new arrivals away.
+class MLFQQueue(PolicyQueue):
+    def __init__(self, maxsize=0, quantum=1, levels=3, boost_interval=None):
+        super().__init__(MLFQPolicy(quantum, levels, boost_interval), maxsize)
+
+    def occupancy(self):
+        with self.mutex:
+            return self.policy.occupancy(clock.time())
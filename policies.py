@@ -0,0 +1,279 @@
+import heapq
+import itertools
+from collections import deque
+
+from fieldState import FieldState
+
+# Customer record layout shared by the dispatch core and the policies
+# (a plain list so policies can update the remaining time in place)
+CUSTOMER_ID = 0
+ARRIVAL_TIME = 1
+SERVICE_TIME = 2
+REMAINING_TIME = 3
+FIRST_START_TIME = 4
+
+
+# Interface between the dispatch core (eventEngine.EventSimulator) and a
+# scheduling algorithm. The policy owns the ready queue; the core owns the
+# clock, the tellers and the statistics, and calls:
+#   on_arrival(customer, now)          a customer joins the ready queue
+#   select_next(now)                   pop the customer an idle teller should serve;
+#                                      it runs for at most `quantum` (None: to completion)
+#   on_quantum_expired(customer, now)  its slice ended (or it was preempted) with work left
+#   on_complete(customer, now)         it departed
+#   should_preempt(remaining, now)     preemptive policies: take a teller whose customer
+#                                      still needs `remaining` seconds?
+# len(policy) is the number of customers waiting.
+class SchedulingPolicy(FieldState):
+    name = None
+    preemptive = False
+    quantum = None
+    needs_quantum = False  # Time-sliced: must be built with a quantum
+
+    # quantum only matters to time-sliced policies; the others ignore it
+    def __init__(self, quantum=None):
+        pass
+
+    def __len__(self):
+        raise NotImplementedError
+
+    def on_arrival(self, customer, now):
+        raise NotImplementedError
+
+    def select_next(self, now):
+        raise NotImplementedError
+
+    def on_quantum_expired(self, customer, now):
+        self.on_arrival(customer, now)
+
+    def on_complete(self, customer, now):
+        pass
+
+    def should_preempt(self, remaining_time, now):
+        return False
+
+
+# First come, first served: a FIFO deque
+class FCFSPolicy(SchedulingPolicy):
+    name = "FCFS"
+    state_fields = ("ready",)
+
+    def __init__(self, quantum=None):
+        super().__init__(quantum)
+        self.ready = deque()
+
+    def __len__(self):
+        return len(self.ready)
+
+    def on_arrival(self, customer, now):
+        self.ready.append(customer)
+
+    def select_next(self, now):
+        return self.ready.popleft()
+
+
+# Shortest job first: a heap keyed on total service time, FIFO among equals
+class SJFPolicy(SchedulingPolicy):
+    name = "SJF"
+    key = SERVICE_TIME
+    state_fields = ("ready", "sequence")
+
+    def __init__(self, quantum=None):
+        super().__init__(quantum)
+        self.ready = []
+        self.sequence = itertools.count()
+
+    def __len__(self):
+        return len(self.ready)
+
+    def on_arrival(self, customer, now):
+        heapq.heappush(self.ready, (customer[self.key], next(self.sequence), customer))
+
+    on_quantum_expired = on_arrival
+
+    def select_next(self, now):
+        return heapq.heappop(self.ready)[2]
+
+    # Checkpoints store the counter's next value; itertools.count stops being picklable in Python 3.14
+    def __getstate__(self):
+        state = super().__getstate__()
+        state["sequence"] = next(self.sequence)
+        self.sequence = itertools.count(state["sequence"])
+        return state
+
+    def __setstate__(self, state):
+        super().__setstate__({**state, "sequence": itertools.count(state["sequence"])})
+
+
+# Shortest remaining time first: SJF keyed on remaining time, and an arrival
+# preempts the customer with the most work left when it needs less
+class SRTFPolicy(SJFPolicy):
+    name = "SRTF"
+    key = REMAINING_TIME
+    preemptive = True
+
+    def should_preempt(self, remaining_time, now):
+        return bool(self.ready) and self.ready[0][0] < remaining_time
+
+
+# Round Robin: a FIFO deque, at most one quantum per dispatch, unfinished
+# customers go to the back
+class RoundRobinPolicy(SchedulingPolicy):
+    name = "RR"
+    needs_quantum = True
+    state_fields = ("quantum", "ready")
+
+    def __init__(self, quantum=None):
+        if not quantum:
+            raise ValueError("Round Robin needs a positive quantum")
+        super().__init__(quantum)
+        self.quantum = quantum
+        self.ready = deque()
+
+    def __len__(self):
+        return len(self.ready)
+
+    def on_arrival(self, customer, now):
+        self.ready.append(customer)
+
+    on_quantum_expired = on_arrival  # Back of the queue, without the extra call
+
+    def select_next(self, now):
+        return self.ready.popleft()
+
+
+# Multi-level feedback queue: `levels` Round Robin deques, the top one with the
+# base quantum and every level below with twice the quantum of the one above.
+# Arrivals start at the top and a customer that uses its whole quantum drops a
+# level, so short jobs finish at high priority without knowing service times.
+# Every `boost_interval` seconds every customer goes back to the top so long
+# jobs cannot starve. select_next() sets self.quantum to the level it served,
+# which the core reads for the slice length.
+class MLFQPolicy(SchedulingPolicy):
+    name = "MLFQ"
+    needs_quantum = True
+    state_fields = ("quanta", "quantum", "boost_interval", "next_boost", "ready", "level", "waiting",
+                    "started", "changed", "area", "peak", "dispatched", "demoted", "boosts")
+
+    def __init__(self, quantum=None, levels=3, boost_interval=None):
+        if not quantum:
+            raise ValueError("MLFQ needs a positive base quantum")
+        super().__init__(quantum)
+        self.quanta = [quantum * 2 ** level for level in range(levels)]
+        self.quantum = quantum
+        self.boost_interval = boost_interval if boost_interval is not None else 10 * quantum
+        self.next_boost = None  # Set from the first arrival's time
+        self.ready = [deque() for _ in range(levels)]
+        self.level = {}  # Customer id -> the level it waits in or was last served from
+        self.waiting = 0
+
+        # Occupancy: each level's length integrated over time since `started`,
+        # its peak length, and the dispatches from and demotions into it
+        self.started = None
+        self.changed = [0.0] * levels
+        self.area = [0.0] * levels
+        self.peak = [0] * levels
+        self.dispatched = [0] * levels
+        self.demoted = [0] * levels
+        self.boosts = 0
+
+    def __len__(self):
+        return self.waiting
+
+    # Add the time since this level last changed length to its integral
+    def account(self, level, now):
+        self.area[level] += len(self.ready[level]) * (now - self.changed[level])
+        self.changed[level] = now
+
+    def enqueue(self, customer, level, now):
+        self.account(level, now)
+        ready = self.ready[level]
+        ready.append(customer)
+        if len(ready) > self.peak[level]:
+            self.peak[level] = len(ready)
+        self.level[customer[CUSTOMER_ID]] = level
+        self.waiting += 1
+
+    # Move every waiting customer to the top level, oldest level first, and
+    # reset the level of those being served so they restart at the top too
+    def boost(self, now):
+        top = self.ready[0]
+        self.account(0, now)
+        for level in range(1, len(self.ready)):
+            self.account(level, now)
+            top.extend(self.ready[level])
+            self.ready[level].clear()
+        self.peak[0] = max(self.peak[0], len(top))
+        for customer_id in self.level:
+            self.level[customer_id] = 0
+        self.boosts += 1
+        # Boosts that fell due while nothing happened collapse into this one
+        self.next_boost += self.boost_interval * ((now - self.next_boost) // self.boost_interval + 1)
+
+    def on_arrival(self, customer, now):
+        if self.started is None:
+            self.started = now
+            self.changed = [now] * len(self.ready)
+            self.next_boost = now + self.boost_interval
+        elif now >= self.next_boost:
+            self.boost(now)
+        self.enqueue(customer, 0, now)
+
+    # The customer used its whole quantum: one level down, the bottom level is plain RR
+    def on_quantum_expired(self, customer, now):
+        if now >= self.next_boost:
+            self.boost(now)
+        level = self.level[customer[CUSTOMER_ID]]
+        if level + 1 < len(self.ready):
+            level += 1
+            self.demoted[level] += 1
+        self.enqueue(customer, level, now)
+
+    def select_next(self, now):
+        if now >= self.next_boost:
+            self.boost(now)
+        for level, ready in enumerate(self.ready):
+            if ready:
+                self.account(level, now)
+                self.waiting -= 1
+                self.dispatched[level] += 1
+                self.quantum = self.quanta[level]
+                return ready.popleft()
+        raise IndexError("select_next() on an empty MLFQ")
+
+    def on_complete(self, customer, now):
+        del self.level[customer[CUSTOMER_ID]]
+
+    # Per level: its quantum, time-averaged and peak length, dispatches and demotions
+    def occupancy(self, now):
+        elapsed = now - self.started if self.started is not None else 0.0
+        levels = []
+        for level, ready in enumerate(self.ready):
+            area = self.area[level] + len(ready) * (now - self.changed[level])
+            levels.append({
+                "level": level,
+                "quantum": self.quanta[level],
+                "avg_length": area / elapsed if elapsed > 0 else 0.0,
+                "max_length": self.peak[level],
+                "dispatched": self.dispatched[level],
+                "demoted_into": self.demoted[level],
+            })
+        return levels
+
+
+def format_occupancy(levels):
+    return "\n".join(f"Level {row['level']} (quantum {row['quantum']}): avg length {row['avg_length']:.2f}, "
+                     f"max {row['max_length']}, {row['dispatched']} dispatches, "
+                     f"{row['demoted_into']} demoted in" for row in levels)
+
+
+POLICIES = {policy.name: policy for policy in (FCFSPolicy, SJFPolicy, SRTFPolicy, RoundRobinPolicy, MLFQPolicy)}
+
+
+# Build a policy from its name ("FCFS", "SJF", "SRTF", "RR", "MLFQ"), or pass an instance through
+def make_policy(policy, quantum=None):
+    if isinstance(policy, SchedulingPolicy):
+        return policy
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy {policy!r}, expected one of {tuple(POLICIES)}")
+    return POLICIES[policy](quantum)
@@ -0,0 +1,70 @@
+import gc
+import math
+import sys
+import time
+
+import baselineEngine
+from eventEngine import EventSimulator, generate_workload
+
+# What each plugin replaced: the pre-plugin engine's FCFS, SJF and RR, and
+# SJF/srtfAlgorithm.py's preemptive dispatch for SRTF. MLFQ was written as a
+# plugin and replaced nothing, so it has no baseline.
+BASELINES = {
+    "FCFS": ("engine FCFS", lambda tellers, quantum, size: baselineEngine.EventSimulator("FCFS", tellers, quantum, size)),
+    "SJF": ("engine SJF", lambda tellers, quantum, size: baselineEngine.EventSimulator("SJF", tellers, quantum, size)),
+    "SRTF": ("srtfAlgorithm", lambda tellers, quantum, size: baselineEngine.SRTFSimulator(tellers, size)),
+    "RR": ("engine RR", lambda tellers, quantum, size: baselineEngine.EventSimulator("RR", tellers, quantum, size)),
+    "MLFQ": (None, None),
+}
+
+
+# Wall-clock seconds for one simulator to run one workload
+def time_run(simulator, workload):
+    gc.disable()  # Collections triggered by the other side's garbage would land on this run
+    try:
+        started = time.perf_counter()
+        simulator.run(workload)
+        return time.perf_counter() - started, simulator
+    finally:
+        gc.enable()
+
+
+# Same served, dropped and averages, up to floating-point summation order
+def same_results(stats, reference):
+    return all(math.isclose(value, stats[name], rel_tol=1e-9) for name, value in reference.items() if name in stats)
+
+
+# Customers/s of every plugin on the shared core against the implementation
+# it replaced (baselineEngine.py). Plugin and baseline runs alternate and the
+# best of `repeats` is kept, so machine noise hits both sides alike. Arrivals
+# keep the tellers about 80% busy and the queue is unbounded, so nobody is
+# dropped: the pre-plugin code bounded every waiting customer, the plugins
+# only those not yet served, and a bound would make the results differ.
+# Returns (policy, baseline name or None, plugin seconds, baseline seconds or None, results identical)
+def benchmark(num_customers=200_000, num_tellers=3, quantum=2, queue_size=None, seed=1, repeats=5):
+    workload = list(generate_workload(num_customers, seed=seed, min_interarrival=1.5, max_interarrival=3))
+    results = []
+    for policy, (baseline, build_baseline) in BASELINES.items():
+        plugin_elapsed = float("inf")
+        baseline_elapsed = float("inf") if build_baseline is not None else None
+        for _ in range(repeats):
+            if build_baseline is not None:
+                elapsed, reference = time_run(build_baseline(num_tellers, quantum, queue_size), workload)
+                baseline_elapsed = min(baseline_elapsed, elapsed)
+            elapsed, simulator = time_run(EventSimulator(policy, num_tellers, quantum, queue_size), workload)
+            plugin_elapsed = min(plugin_elapsed, elapsed)
+        identical = build_baseline is not None and same_results(simulator.stats(), reference.stats())
+        results.append((policy, baseline, plugin_elapsed, baseline_elapsed, identical))
+    return results
+
+
+if __name__ == "__main__":
+    num_customers = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    print(f"{'policy':>6} {'baseline':>14} {'plugin/s':>12} {'baseline/s':>12} {'ratio':>6}  identical")
+    for policy, baseline, plugin_elapsed, baseline_elapsed, identical in benchmark(num_customers):
+        if baseline is None:
+            print(f"{policy:>6} {'none':>14} {num_customers / plugin_elapsed:>12,.0f} {'-':>12} {'-':>6}  -")
+            continue
+        print(f"{policy:>6} {baseline:>14} {num_customers / plugin_elapsed:>12,.0f} "
+              f"{num_customers / baseline_elapsed:>12,.0f} {baseline_elapsed / plugin_elapsed:>6.2f}  "
+              f"{'yes' if identical else 'no'}")
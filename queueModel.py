@@ -0,0 +1,185 @@
+import argparse
+import math
+import statistics
+import time
+
+from eventEngine import POLICIES, EventSimulator, generate_workload
+from constants import MAX_SERVICE_TIME, NUM_TELLERS, QUANTUM_TIME
+
+
+# Arrival and service parameters of a workload: the arrival rate, the mean
+# service time and the squared coefficients of variation (variance / mean²)
+# of the inter-arrival and service times. SCV 1 is exponential, 0 constant.
+class Rates:
+    def __init__(self, arrival_rate, mean_service_time, arrival_scv=1.0, service_scv=1.0):
+        self.arrival_rate = arrival_rate
+        self.mean_service_time = mean_service_time
+        self.arrival_scv = arrival_scv
+        self.service_scv = service_scv
+
+    def __repr__(self):
+        return (f"Rates(arrival_rate={self.arrival_rate:.4f}, mean_service_time={self.mean_service_time:.4f}, "
+                f"arrival_scv={self.arrival_scv:.4f}, service_scv={self.service_scv:.4f})")
+
+
+# Measure the rates from (arrival_time, service_time, ...) records, e.g.
+# generate_workload() or a trace from traceLoader.load_trace()
+def fit_rates(workload):
+    arrivals = []
+    services = []
+    for record in workload:
+        arrivals.append(record[0])
+        services.append(record[1])
+    if len(arrivals) < 3:
+        raise ValueError("Need at least three customers to fit arrival and service rates")
+    gaps = [later - earlier for earlier, later in zip(arrivals, arrivals[1:])]
+    mean_gap = statistics.fmean(gaps)
+    mean_service_time = statistics.fmean(services)
+    return Rates(1 / mean_gap, mean_service_time,
+                 statistics.pvariance(gaps, mean_gap) / mean_gap ** 2,
+                 statistics.pvariance(services, mean_service_time) / mean_service_time ** 2)
+
+
+# The rates generate_workload() (and final.py) draw from: service times from
+# random.randint(min, max), inter-arrival gaps from random.uniform(min, max)
+def rates_from_parameters(min_service_time=3, max_service_time=MAX_SERVICE_TIME,
+                          min_interarrival=0.5, max_interarrival=2):
+    mean_gap = (min_interarrival + max_interarrival) / 2
+    gap_variance = (max_interarrival - min_interarrival) ** 2 / 12
+    mean_service_time = (min_service_time + max_service_time) / 2
+    service_variance = ((max_service_time - min_service_time + 1) ** 2 - 1) / 12
+    return Rates(1 / mean_gap, mean_service_time,
+                 gap_variance / mean_gap ** 2, service_variance / mean_service_time ** 2)
+
+
+# Probability that an arrival has to wait with `servers` tellers and an
+# offered load of `load` = arrival rate * mean service time (Erlang C).
+# Uses the Erlang B recursion, which stays stable for large teller counts.
+def erlang_c(servers, load):
+    if load >= servers:
+        return 1.0
+    blocking = 1.0
+    for k in range(1, servers + 1):
+        blocking = load * blocking / (k + load * blocking)
+    return blocking / (1 - load / servers * (1 - blocking))
+
+
+# M/M/c with FCFS service: utilization, probability of waiting, and the
+# expected wait in queue, time in system, queue length and customers in
+# system. An overloaded system (utilization >= 1) has infinite waits.
+def mmc(servers, arrival_rate, mean_service_time):
+    load = arrival_rate * mean_service_time
+    utilization = load / servers
+    if utilization >= 1:
+        return {"utilization": utilization, "p_wait": 1.0, "wait": math.inf, "time_in_system": math.inf,
+                "queue_length": math.inf, "in_system": math.inf}
+    p_wait = erlang_c(servers, load)
+    wait = p_wait * mean_service_time / (servers - load)
+    return {
+        "utilization": utilization,
+        "p_wait": p_wait,
+        "wait": wait,
+        "time_in_system": wait + mean_service_time,
+        "queue_length": arrival_rate * wait,
+        "in_system": arrival_rate * (wait + mean_service_time),
+    }
+
+
+# M/G/c by the Allen-Cunneen approximation: the M/M/c wait scaled by
+# (arrival SCV + service SCV) / 2. With Poisson arrivals (SCV 1) this is the
+# usual M/G/c estimate; passing the measured arrival SCV extends it to the
+# uniform gaps this repo draws.
+def mgc(servers, rates):
+    result = mmc(servers, rates.arrival_rate, rates.mean_service_time)
+    if result["utilization"] >= 1:
+        return result
+    wait = result["wait"] * (rates.arrival_scv + rates.service_scv) / 2
+    result.update(wait=wait, time_in_system=wait + rates.mean_service_time,
+                  queue_length=rates.arrival_rate * wait,
+                  in_system=rates.arrival_rate * (wait + rates.mean_service_time))
+    return result
+
+
+# Both models for `servers` tellers
+def predict(servers, rates):
+    return {"M/M/c": mmc(servers, rates.arrival_rate, rates.mean_service_time), "M/G/c": mgc(servers, rates)}
+
+
+# The model's quantities measured from a finished EventSimulator: mean wait in
+# queue before first service, mean time in system, teller utilization, and
+# the queue length and customers in system by Little's law
+def observed(sim, total_service_time):
+    served = len(sim.turnaround_times)
+    arrival_rate = served / sim.clock if sim.clock > 0 else 0.0
+    return {
+        "utilization": total_service_time / (sim.num_tellers * sim.clock) if sim.clock > 0 else 0.0,
+        "wait": sim.response_times.mean,
+        "time_in_system": sim.turnaround_times.mean,
+        "queue_length": arrival_rate * sim.response_times.mean,
+        "in_system": arrival_rate * sim.turnaround_times.mean,
+    }
+
+
+# Relative deviation of each simulated quantity from the model, (sim - model) / model.
+# The model assumes FCFS; other policies keep utilization but reorder waits.
+def deviation(simulated, model):
+    result = {}
+    for key, value in simulated.items():
+        expected = model[key]
+        if math.isinf(expected) or expected == 0:
+            result[key] = None
+        else:
+            result[key] = (value - expected) / expected
+    return result
+
+
+def format_value(value):
+    return "inf" if math.isinf(value) else f"{value:.4f}"
+
+
+def format_deviation(change):
+    return "n/a" if change is None else f"{change:+.1%}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Erlang C / M/M/c and M/G/c estimates, checked against the event engine")
+    parser.add_argument("--tellers", default=f"{NUM_TELLERS},5,6", help="comma-separated teller counts")
+    parser.add_argument("--min-service", type=int, default=3)
+    parser.add_argument("--max-service", type=int, default=MAX_SERVICE_TIME)
+    parser.add_argument("--min-interarrival", type=float, default=0.5)
+    parser.add_argument("--max-interarrival", type=float, default=2)
+    parser.add_argument("--customers", type=int, default=200_000, help="simulated customers per comparison run")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rates = rates_from_parameters(args.min_service, args.max_service, args.min_interarrival, args.max_interarrival)
+    workload = list(generate_workload(args.customers, args.seed, args.min_service, args.max_service,
+                                      args.min_interarrival, args.max_interarrival))
+    fitted = fit_rates(workload)
+    total_service_time = sum(service_time for _, service_time in workload)
+    print(f"From parameters: {rates}")
+    print(f"Fitted:          {fitted}")
+
+    for servers in map(int, args.tellers.split(",")):
+        started = time.perf_counter()
+        models = predict(servers, rates)
+        elapsed = time.perf_counter() - started
+        print(f"\n{servers} tellers: both models in {elapsed * 1e6:.1f} µs, "
+              f"utilization {models['M/M/c']['utilization']:.3f}, P(wait) {models['M/M/c']['p_wait']:.3f}")
+        print(f"{'':<14} {'wait':>10} {'in system':>10} {'queue len':>10} {'utilization':>12}")
+        for name, model in models.items():
+            print(f"{name:<14} {format_value(model['wait']):>10} {format_value(model['time_in_system']):>10} "
+                  f"{format_value(model['queue_length']):>10} {model['utilization']:>12.4f}")
+        if models["M/M/c"]["utilization"] >= 1:
+            print("Overloaded: the queue grows without bound, so the simulation has no steady state to compare")
+            continue
+        # Unbounded queue, as the models assume; deviations are against M/G/c
+        for policy in POLICIES:
+            sim = EventSimulator(policy, servers, quantum=QUANTUM_TIME).run(workload)
+            simulated = observed(sim, total_service_time)
+            change = deviation(simulated, models["M/G/c"])
+            print(f"{policy + ' (sim)':<14} {format_value(simulated['wait']):>10} "
+                  f"{format_value(simulated['time_in_system']):>10} {format_value(simulated['queue_length']):>10} "
+                  f"{simulated['utilization']:>12.4f}   vs M/G/c: wait {format_deviation(change['wait'])}, "
+                  f"in system {format_deviation(change['time_in_system'])}, "
+                  f"utilization {format_deviation(change['utilization'])}")
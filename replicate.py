@@ -0,0 +1,99 @@
+import math
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from eventEngine import POLICIES, EventSimulator, generate_workload
+from constants import MAX_SERVICE_TIME, NUM_TELLERS, QUANTUM_TIME, QUEUE_SIZE
+
+METRICS = ("turnaround_times", "waiting_times", "response_times")
+PERCENTILES = (50, 95, 99)
+
+
+# Derive one independent seed per replication from the master seed.
+# Every policy gets the same seeds so they are compared on identical workloads.
+def replication_seeds(master_seed, replications):
+    rng = random.Random(master_seed)
+    return [rng.getrandbits(64) for _ in range(replications)]
+
+
+# Run one seeded replication of one policy and summarise it.
+# Kept at module level so ProcessPoolExecutor can pickle it.
+def run_replication(task):
+    policy, seed, num_customers, num_tellers, quantum, queue_size, max_service_time = task
+    workload = generate_workload(num_customers, seed, max_service_time=max_service_time)
+    sim = EventSimulator(policy, num_tellers, quantum=quantum, queue_size=queue_size).run(workload)
+    return policy, summarise(sim)
+
+
+# Served/dropped counts, and mean and percentiles of each metric, of a finished run
+def summarise(sim):
+    summary = {"served": len(sim.turnaround_times), "dropped": sim.dropped}
+    for metric in METRICS:
+        stats = getattr(sim, metric)
+        summary[metric] = {
+            "mean": stats.mean,
+            **{f"p{p}": stats.quantile(p / 100) for p in PERCENTILES},
+        }
+    return summary
+
+
+# Combine per-replication summaries: mean, standard deviation and a 95%
+# confidence half-width across replications for each statistic
+def aggregate(summaries):
+    result = {"replications": len(summaries)}
+    for metric in METRICS:
+        result[metric] = {}
+        for stat in summaries[0][metric]:
+            values = [summary[metric][stat] for summary in summaries]
+            mean = statistics.fmean(values)
+            std = statistics.stdev(values) if len(values) > 1 else 0.0
+            result[metric][stat] = {
+                "mean": mean,
+                "std": std,
+                "ci95": 1.96 * std / math.sqrt(len(values)),
+            }
+    result["served"] = statistics.fmean(summary["served"] for summary in summaries)
+    result["dropped"] = statistics.fmean(summary["dropped"] for summary in summaries)
+    return result
+
+
+# Run `replications` independent replications of every policy across a process pool.
+# Results depend only on master_seed, not on how work lands on the workers.
+def run_replications(replications, master_seed=0, policies=POLICIES, num_customers=50,
+                     num_tellers=NUM_TELLERS, quantum=QUANTUM_TIME, queue_size=QUEUE_SIZE,
+                     max_service_time=MAX_SERVICE_TIME, max_workers=None):
+    seeds = replication_seeds(master_seed, replications)
+    tasks = [(policy, seed, num_customers, num_tellers, quantum, queue_size, max_service_time)
+             for policy in policies for seed in seeds]
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(tasks) // (workers * 4))
+    summaries = {policy: [] for policy in policies}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for policy, summary in executor.map(run_replication, tasks, chunksize=chunksize):
+            summaries[policy].append(summary)
+    return {policy: aggregate(summaries[policy]) for policy in policies}
+
+
+def print_report(results):
+    for policy, result in results.items():
+        print(f"\nStatistics for {policy} ({result['replications']} replications, "
+              f"{result['served']:.1f} served / {result['dropped']:.1f} dropped on average):")
+        for metric in METRICS:
+            name = metric.replace("_times", "").capitalize()
+            line = ", ".join(f"{stat} {values['mean']:.4f} ± {values['ci95']:.4f} (sd {values['std']:.4f})"
+                             for stat, values in result[metric].items())
+            print(f"{name} Time: {line}")
+
+
+if __name__ == "__main__":
+    replications = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    master_seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    started = time.perf_counter()
+    results = run_replications(replications, master_seed)
+    elapsed = time.perf_counter() - started
+    print_report(results)
+    print(f"\n{replications} replications x {len(results)} policies in {elapsed:.2f} seconds")
@@ -0,0 +1,102 @@
+import os
+import subprocess
+import sys
+
+# Modules the simulation core must start without
+PLOTTING_MODULES = ("matplotlib", "pandas")
+
+
+# Charts for one run, collected while the simulation runs and drawn to PNG
+# files in one pass by render(). matplotlib is only imported there, with the
+# Agg backend, so nothing blocks on a window and runs without a report never
+# load it at all.
+class RunReport:
+    def __init__(self, output_dir):
+        self.output_dir = output_dir
+        self.charts = []  # (name, draw function, data)
+
+    # The average turnaround/waiting/response line chart the simulators used to show
+    def averages(self, name, avg_turnaround_time, avg_waiting_time, avg_response_time):
+        self.charts.append((name, _draw_averages, (avg_turnaround_time, avg_waiting_time, avg_response_time)))
+
+    # Turnaround/waiting/response histograms from {metric: StreamingStats}
+    def histograms(self, name, metrics):
+        data = {metric: stats.histogram() for metric, stats in metrics.items()}
+        self.charts.append((name, _draw_histograms, data))
+
+    def render(self):
+        if not self.charts:
+            return []
+        import matplotlib
+        matplotlib.use("Agg")
+        import matplotlib.pyplot as plt
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        paths = []
+        for name, draw, data in self.charts:
+            fig = draw(plt, data)
+            path = os.path.join(self.output_dir, file_name(name))
+            fig.savefig(path)
+            plt.close(fig)
+            paths.append(path)
+        self.charts.clear()
+        return paths
+
+
+def file_name(name):
+    return "".join(c if c.isalnum() else "_" for c in name).strip("_").lower() + ".png"
+
+
+def _draw_averages(plt, values):
+    labels = ['Turnaround Time', 'Waiting Time', 'Response Time']
+    fig = plt.figure(figsize=(8, 6))
+    plt.plot(labels, list(values), marker='o', linestyle='-')
+    plt.xlabel('Metrics')
+    plt.ylabel('Time (seconds)')
+    plt.title('Average Turnaround Time, Waiting Time, and Response Time')
+    plt.grid(True)  # Add grid lines
+    return fig
+
+
+def _draw_histograms(plt, histograms):
+    titles = {'turnaround_times': ('Turnaround Times', 'blue'),
+              'waiting_times': ('Waiting Times', 'green'),
+              'response_times': ('Response Times', 'red')}
+    fig = plt.figure(figsize=(10, 5))
+    for position, (metric, (values, counts)) in enumerate(histograms.items(), start=1):
+        title, color = titles.get(metric, (metric, 'gray'))
+        plt.subplot(1, len(histograms), position)
+        plt.hist(values, weights=counts, bins=20, alpha=0.7, color=color)
+        plt.title(title)
+        plt.xlabel('Time')
+        plt.ylabel('Frequency')
+    plt.tight_layout()
+    return fig
+
+
+# A RunReport writing to the --report directory, or None when no report was asked for
+def report_from_argv(argv):
+    if "--report" not in argv:
+        return None
+    return RunReport(argv[argv.index("--report") + 1])
+
+
+# Import `module` in a fresh interpreter; returns the wall-clock import time
+# and whichever plotting modules it pulled in
+def measure_import(module, cwd=None):
+    code = (f"import sys, time; started = time.perf_counter(); import {module}; "
+            f"elapsed = time.perf_counter() - started; "
+            f"print(elapsed, *sorted({{m.split('.')[0] for m in sys.modules}} & set({PLOTTING_MODULES!r})))")
+    output = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True, check=True)
+    elapsed, *loaded = output.stdout.split()
+    return float(elapsed), loaded
+
+
+if __name__ == "__main__":
+    # Import cost of each entry point, and proof that none of them loads matplotlib or pandas
+    modules = sys.argv[1:] or ["eventEngine", "final", "simul", "replicate", "sweep", "test",
+                               "FCFS.fcfsAlgorithm", "SJF.sjfAlgorithm", "SJF.srtfAlgorithm", "matplotlib.pyplot"]
+    print(f"{'module':<28} {'import':>9}  plotting modules loaded")
+    for module in modules:
+        elapsed, loaded = measure_import(module, os.path.dirname(os.path.abspath(__file__)))
+        print(f"{module:<28} {elapsed * 1000:>7.1f}ms  {', '.join(loaded) or 'none'}")
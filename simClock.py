@@ -0,0 +1,135 @@
+import random
+import threading
+import time
+
+from accumulators import ShardedStats
+
+
+# Simulated time for the threaded simulators, running `speedup` times faster
+# than the wall clock. Tellers and arrival generators call clock.time() and
+# clock.sleep() instead of time.time() and time.sleep(), so timestamps, waits
+# and turnarounds all come out in simulated seconds while the threads still
+# really run concurrently. time() starts at the wall-clock time (so
+# timeConverter still prints a sensible date) and only its differences mean
+# anything. Timeouts given to Event.wait(), Condition.wait() and friends are
+# real seconds; convert simulated ones with real(), or call clock.wait().
+# Every sleep records how far it overran, in simulated seconds: OS timer
+# slack and GIL hand-offs are a fixed real cost, so the same overrun is
+# `speedup` times larger in simulated time and distorts the results more
+# the faster the clock runs.
+class SimClock:
+    def __init__(self, speedup=1.0):
+        self.speedup = 1.0
+        self.origin = time.time()
+        self.real_origin = time.perf_counter()
+        self.overshoot = ShardedStats(("overshoot", "relative_overshoot"))  # One shard per sleeping thread
+        self.set_speedup(speedup)
+
+    # Change the speed-up; simulated time carries on from where it is. Call
+    # it between runs, not while threads are reading the clock.
+    def set_speedup(self, speedup):
+        if speedup <= 0:
+            raise ValueError(f"Speed-up must be positive, got {speedup!r}")
+        self.origin = self.time()
+        self.real_origin = time.perf_counter()
+        self.speedup = speedup
+
+    def time(self):
+        return self.origin + (time.perf_counter() - self.real_origin) * self.speedup
+
+    # Real seconds that `seconds` of simulated time take
+    def real(self, seconds):
+        return seconds / self.speedup
+
+    def sleep(self, seconds):
+        if seconds <= 0:
+            return
+        started = time.perf_counter()
+        time.sleep(seconds / self.speedup)
+        self.record_overshoot(seconds, started)
+
+    # waitable.wait() (a Condition or Event) for at most `seconds` of simulated
+    # time; a wait that runs its full length counts as a sleep
+    def wait(self, waitable, seconds):
+        started = time.perf_counter()
+        notified = waitable.wait(seconds / self.speedup)
+        if not notified and seconds > 0:
+            self.record_overshoot(seconds, started)
+        return notified
+
+    def record_overshoot(self, seconds, started):
+        late = (time.perf_counter() - started) * self.speedup - seconds
+        if late < 0:
+            late = 0.0
+        stats = self.overshoot.shard(threading.get_ident())
+        stats["overshoot"].add(late)
+        stats["relative_overshoot"].add(late / seconds)
+
+    # Sleep overshoot since the last reset(), in simulated seconds; relative
+    # overshoot is the overrun as a fraction of the sleep asked for
+    def report(self):
+        stats = self.overshoot.snapshot()
+        overshoot = stats["overshoot"]
+        return {
+            "speedup": self.speedup,
+            "sleeps": overshoot.count,
+            "total": overshoot.total,
+            "mean": overshoot.mean,
+            "p99": overshoot.quantile(0.99),
+            "max": overshoot.max if overshoot.count else 0.0,
+            "mean_relative": stats["relative_overshoot"].mean,
+            "p99_relative": stats["relative_overshoot"].quantile(0.99),
+        }
+
+    def reset(self):
+        self.overshoot.clear()
+
+
+# The clock every threaded module shares; --speedup changes it in place
+clock = SimClock()
+
+
+def format_overshoot(report):
+    return (f"Sleep overshoot at {report['speedup']:g}x: {report['sleeps']} sleeps ran "
+            f"{report['mean']:.4f} simulated seconds late on average (p99 {report['p99']:.4f}, "
+            f"max {report['max']:.4f}), stretching each by {report['mean_relative']:.2%} "
+            f"(p99 {report['p99_relative']:.2%}); {report['total']:.2f} simulated seconds in all")
+
+
+# Set the shared clock from the --speedup N command line option and return it
+def from_argv(argv):
+    if "--speedup" in argv:
+        clock.set_speedup(float(argv[argv.index("--speedup") + 1]))
+    return clock
+
+
+# How much sleep overshoot distorts a run at each speed-up: `threads` threads
+# sleep like tellers and arrival generators do (service times of 3-8
+# seconds, gaps of 0.5-2 seconds) `sleeps` times each on a fresh clock
+def measure_overshoot(speedups=(100, 1000, 10000), threads=4, sleeps=20, seed=1):
+    results = []
+    for speedup in speedups:
+        sim_clock = SimClock(speedup)
+
+        def sleeper(index):
+            rng = random.Random(seed + index)
+            for _ in range(sleeps):
+                sim_clock.sleep(rng.randint(3, 8) if index else rng.uniform(0.5, 2))
+
+        workers = [threading.Thread(target=sleeper, args=(index,)) for index in range(threads)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        results.append(sim_clock.report())
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    speedups = tuple(map(float, sys.argv[1].split(","))) if len(sys.argv) > 1 else (100, 1000, 10000)
+    print(f"{'speed-up':>9} {'sleeps':>7} {'mean late':>10} {'p99 late':>10} {'mean stretch':>13} {'p99 stretch':>12}")
+    for result in measure_overshoot(speedups):
+        print(f"{result['speedup']:>8g}x {result['sleeps']:>7} {result['mean']:>10.4f} {result['p99']:>10.4f} "
+              f"{result['mean_relative']:>13.2%} {result['p99_relative']:>12.2%}")
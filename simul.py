@@ -1,8 +1,15 @@
 import threading
-import time
 import random
-import queue
-from collections import deque
+import sys
+
+from accumulators import ShardedStats, StreamingStats
+from admission import BALKED, BoundedWait, format_admission, from_argv as admission_from_argv
+from completion import CompletionTracker
+from contention import InstrumentedLock, format_report
+from eventLog import BALK, DEPARTURE, DISPATCH, DROP, ENQUEUE, INFO, PREEMPT, WARNING, EventLog, from_argv
+from policies import ARRIVAL_TIME, CUSTOMER_ID, REMAINING_TIME, SERVICE_TIME
+from simClock import clock, format_overshoot, from_argv as clock_from_argv
+from threadedTellers import STOP, PolicyQueue, new_customer, serve
 
 # Constants
 NUM_TELLERS = 3
@@ -10,147 +17,151 @@ QUEUE_SIZE = 10
 MAX_SERVICE_TIME = 8
 QUANTUM_TIME = 2
 
-# Thread-safe queue for customers
-customer_queue = queue.Queue(QUEUE_SIZE)
+# Thread-safe ready queue for customers; main() replaces it with one for each policy
+customer_queue = PolicyQueue("FCFS", QUEUE_SIZE)
 
 # Statistics tracking
-arrival_times = {}
-service_times = {}
-completion_times = {}
-turnaround_times = []
-waiting_times = []
+turnaround_times = StreamingStats()
+waiting_times = StreamingStats()
+
+# Per-teller statistics buffers, merged into the totals above by merge_teller_stats()
+teller_stats = ShardedStats(("turnaround_times", "waiting_times"))
+
+# Lock for the shared totals; instrumented to show contention
+lock = InstrumentedLock()
 
-# Lock for thread-safe updates to statistics
-lock = threading.Lock()
+# Customers admitted but not yet departed; main() sleeps on it until the last one leaves
+completion = CompletionTracker()
+
+# Admission control for arrivals at a full queue; never blocks the arrival generator
+admission = BoundedWait(1.0)
+
+# Buffered event log for the teller hot paths; written by a background thread once started
+event_log = EventLog()
 
 # Common Customer Arrival Function
 def customer_arrival(customer_id):
     service_time = random.randint(4, MAX_SERVICE_TIME)
-    arrival_time = time.time()
-    local_time = time.localtime(arrival_time)
-
-# Format the struct_time object into a human-readable string
-    formatted_time = time.strftime("%Y-%m-%d %H:%M:%S", local_time)
-    with lock:
-        arrival_times[customer_id] = arrival_time
-        service_times[customer_id] = service_time
-    print(f"Customer{customer_id} enters the Queue with service time {service_time} at {formatted_time}")
-    try:
-        customer_queue.put((service_time, customer_id), timeout=1)
-    except queue.Full:
-        print("Queue is FULL.")
-
-# FCFS Teller Service Function
-def teller_service_fcfs(teller_id):
-    while True:
-        try:
-            service_time, customer_id = customer_queue.get(timeout=1)
-            start_time = time.time()
-            print(f"Customer {customer_id} is in Teller {teller_id}")
-            time.sleep(service_time)
-            end_time = time.time()
-            with lock:
-                completion_times[customer_id] = end_time
-                turnaround_time = end_time - arrival_times[customer_id]
-                turnaround_times.append(turnaround_time)
-                waiting_time = start_time - arrival_times[customer_id]
-                waiting_times.append(waiting_time)
-            print(f"Customer {customer_id} leaves the Teller {teller_id}")
-        except queue.Empty:
-            continue
-
-# SJF Teller Service Function
-def teller_service_sjf(teller_id):
-    while True:
-        try:
-            with lock:
-                sorted_customers = sorted(list(customer_queue.queue), key=lambda x: x[0])
-                customer_queue.queue.clear()
-                for customer in sorted_customers:
-                    customer_queue.put_nowait(customer)
-
-            service_time, customer_id = customer_queue.get(timeout=1)
-            start_time = time.time()
-            print(f"Customer {customer_id} is in Teller{teller_id}")
-            time.sleep(service_time)
-            end_time = time.time()
-            with lock:
-                completion_times[customer_id] = end_time
-                turnaround_time = end_time - arrival_times[customer_id]
-                turnaround_times.append(turnaround_time)
-                waiting_time = start_time - arrival_times[customer_id]
-                waiting_times.append(waiting_time)
-            print(f"Customer {customer_id} leaves the Teller{teller_id}")
-        except queue.Empty:
-            continue
-
-# Round Robin Teller Service Function
-def teller_service_rr(teller_id):
-    while True:
-        try:
-            service_time, customer_id = customer_queue.get(timeout=1)
-            print(f"Customer {customer_id} is in Teller{teller_id} for a quantum of {QUANTUM_TIME}")
-            start_time = time.time()
-            if service_time <= QUANTUM_TIME:
-                time.sleep(service_time)
-                end_time = time.time()
-                with lock:
-                    completion_times[customer_id] = end_time
-                    turnaround_time = end_time - arrival_times[customer_id]
-                    turnaround_times.append(turnaround_time)
-                    waiting_time = start_time - arrival_times[customer_id]
-                    waiting_times.append(waiting_time)
-                print(f"Customer {customer_id} leaves the Teller{teller_id}")
-            else:
-                time.sleep(QUANTUM_TIME)
-                remaining_time = service_time - QUANTUM_TIME
-                customer_queue.put((remaining_time, customer_id))
-        except queue.Empty:
-            continue
-
-# Start Tellers as Threads for a Given Service Function
-def start_tellers(service_function):
+    completion.admit()  # Outstanding until it departs or customer_rejected() cancels it
+    admission.offer(new_customer(customer_id, clock.time(), service_time))  # Admits, turns away or hands to a waiting room at once
+
+# Called by the admission stage, possibly from its own thread, once a customer is in the
+# ready queue. The customer record itself carries its times through the queue.
+def customer_admitted(customer):
+    event_log.record(ENQUEUE, customer[CUSTOMER_ID], value=customer[SERVICE_TIME])
+
+# Called by the admission stage, possibly from its own thread, for customers it turned away
+def customer_rejected(customer, outcome):
+    customer_id = customer[CUSTOMER_ID]
+    completion.cancel()
+    if outcome == BALKED:
+        event_log.record(BALK, customer_id, value=admission.waiting(), level=INFO)
+    else:
+        event_log.record(DROP, customer_id, level=WARNING)
+
+# Teller callbacks for threadedTellers.serve(); each runs on the teller's own thread
+def customer_started(teller_id, customer, start_time):
+    event_log.record(DISPATCH, customer[CUSTOMER_ID], teller_id)
+
+def customer_requeued(teller_id, customer):
+    event_log.record(PREEMPT, customer[CUSTOMER_ID], teller_id, customer[REMAINING_TIME])
+    completion.requeue()
+
+def customer_departed(teller_id, customer, start_time, end_time):
+    customer_id = customer[CUSTOMER_ID]
+    stats = teller_stats.shard(teller_id)  # This teller's own accumulators, recorded without a lock
+    stats["turnaround_times"].add(end_time - customer[ARRIVAL_TIME])
+    stats["waiting_times"].add(start_time - customer[ARRIVAL_TIME])
+    event_log.record(DEPARTURE, customer_id, teller_id)
+    completion.depart()
+
+# Teller Service Function: the ready queue's policy picks the customer and its slice
+def teller_service(teller_id):
+    serve(teller_id, customer_queue, customer_departed, customer_started, customer_requeued)
+
+# Start Tellers as Threads
+def start_tellers():
     tellers = []
     for i in range(1, NUM_TELLERS + 1):
-        t = threading.Thread(target=service_function, args=(i,))
+        t = threading.Thread(target=teller_service, args=(i,))
         t.start()
         tellers.append(t)
     return tellers
 
+# Wake every teller with a STOP item so it exits at once, then join them
+def stop_tellers(tellers):
+    for _ in tellers:
+        customer_queue.put(STOP)
+    for t in tellers:
+        t.join()
+
 # Main Loop to Simulate Customer Arrivals
-def main(service_function, description):
+def main(policy, description):
+    global customer_queue
+    # Requeued customers never count against QUEUE_SIZE, so a full queue cannot stall the tellers
+    customer_queue = PolicyQueue(policy, QUEUE_SIZE, QUANTUM_TIME)
+    admission.attach(customer_queue, QUEUE_SIZE, on_admit=customer_admitted, on_reject=customer_rejected)
     customer_id = 1
+    start_time = clock.time()
     try:
-        tellers = start_tellers(service_function)
-        start_time = time.time()
+        tellers = start_tellers()
         while customer_id <= 50:
             customer_arrival(customer_id)
             customer_id += 1
-            time.sleep(random.uniform(0.5, 2))  # Random arrival time
+            clock.sleep(random.uniform(0.5, 2))  # Random arrival time
     except KeyboardInterrupt:
         print("Simulation stopped.")
     finally:
-        time.sleep(20)  # Allow all threads to complete
-        calculate_stats(description)
+        completion.close()
+        completion.wait()  # Returns the moment the last admitted customer departs
+        admission.close()
+        stop_tellers(tellers)
+        calculate_stats(description, completion.shutdown_latency)
+        print(format_admission(admission.report(completion.summary()["departed"], clock.time() - start_time)))
+        print(format_overshoot(clock.report()))
+        clock.reset()
+        completion.reset()
+
+# Fold the per-teller buffers into the totals; called once the tellers have stopped
+def merge_teller_stats():
+    with lock:
+        teller_stats.merge_into({"turnaround_times": turnaround_times, "waiting_times": waiting_times})
+        teller_stats.clear()
 
 # Calculate and Print Statistics
-def calculate_stats(description):
+def calculate_stats(description, shutdown_latency=None):
+    event_log.flush()  # Console events first, so they do not land inside the stats block
+    merge_teller_stats()
     with lock:
-        avg_turnaround_time = sum(turnaround_times) / len(turnaround_times)
-        avg_waiting_time = sum(waiting_times) / len(waiting_times)
+        avg_turnaround_time = turnaround_times.mean
+        avg_waiting_time = waiting_times.mean
     print(f"\nStatistics for {description}:")
     print(f"Average Turnaround Time: {avg_turnaround_time:.4f} seconds")
     print(f"Average Waiting Time: {avg_waiting_time:.4f} seconds")
-    print(f"Waiting time list: {waiting_times}")
+    if shutdown_latency is not None:
+        print(f"Shutdown latency: {shutdown_latency * 1000:.2f} ms after the last departure")
+    print(format_report("Stats lock", lock.report()))
+    lock.reset()
+    print(f"Waiting time p50/p95/p99: {waiting_times.quantile(0.5):.4f} / "
+          f"{waiting_times.quantile(0.95):.4f} / {waiting_times.quantile(0.99):.4f} seconds")
     
 
 # Run the Simulations
 if __name__ == "__main__":
-    print("Starting FCFS Simulation...")
-    main(teller_service_fcfs, "FCFS")
-    print("\nStarting SJF Simulation...")
-    main(teller_service_sjf, "SJF")
-    print("\nStarting Round Robin Simulation...")
-    main(teller_service_rr, "Round Robin")
+    # Optional: --log-level debug|info|warning|off and --log-file events.ndjson|events.bin
+    event_log = from_argv(sys.argv).start()
+    # Optional: --admission reject|balk|wait|overflow for arrivals that find the queue full
+    admission = admission_from_argv(sys.argv)
+    # Optional: --speedup N runs the threaded tellers N times faster; times stay in simulated seconds
+    clock_from_argv(sys.argv)
+    try:
+        print("Starting FCFS Simulation...")
+        main("FCFS", "FCFS")
+        print("\nStarting SJF Simulation...")
+        main("SJF", "SJF")
+        print("\nStarting Round Robin Simulation...")
+        main("RR", "Round Robin")
+    finally:
+        event_log.close()
 
 
@@ -0,0 +1,86 @@
+import heapq
+import itertools
+import queue
+import random
+import threading
+import time
+
+
+# Bounded, thread-safe shortest-job-first queue.
+# Built on queue.Queue the same way queue.PriorityQueue is, so put/get keep
+# the usual blocking, timeout and maxsize behaviour and all locking happens
+# on the queue's own mutex. Items are kept in a heap keyed by key(item),
+# with an arrival counter so customers with equal service times stay FIFO.
+class SJFQueue(queue.Queue):
+    def __init__(self, maxsize=0, key=lambda item: item[0]):
+        self.key = key
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self.queue = []
+        self.counter = itertools.count()
+
+    def _qsize(self):
+        return len(self.queue)
+
+    def _put(self, item):
+        heapq.heappush(self.queue, (self.key(item), next(self.counter), item))
+
+    def _get(self):
+        return heapq.heappop(self.queue)[2]
+
+    # Look at the shortest waiting item without removing it
+    def peek(self):
+        with self.mutex:
+            if not self.queue:
+                raise queue.Empty
+            return self.queue[0][2]
+
+
+# The approach teller_service_sjf used before: sort the whole queue, clear it
+# and put everything back, then take the head
+def sort_clear_reinsert_get(q, lock):
+    with lock:
+        sorted_customers = sorted(list(q.queue), key=lambda x: x[0])
+        q.queue.clear()
+        for customer in sorted_customers:
+            q.put_nowait(customer)
+    return q.get_nowait()
+
+
+# Microbenchmark: cost of one dispatch (get + put of a replacement customer)
+# at a steady queue depth, old approach versus SJFQueue
+def benchmark(depths=(10, 1_000, 100_000), max_service_time=8, seed=1):
+    rng = random.Random(seed)
+    results = []
+    for depth in depths:
+        dispatches = max(20, min(10_000, 2_000_000 // depth))
+        customers = [(rng.randint(3, max_service_time), i) for i in range(depth + dispatches)]
+
+        old_queue = queue.Queue()
+        lock = threading.Lock()
+        for customer in customers[:depth]:
+            old_queue.put_nowait(customer)
+        started = time.perf_counter()
+        for customer in customers[depth:]:
+            sort_clear_reinsert_get(old_queue, lock)
+            old_queue.put_nowait(customer)
+        old_elapsed = (time.perf_counter() - started) / dispatches
+
+        new_queue = SJFQueue()
+        for customer in customers[:depth]:
+            new_queue.put_nowait(customer)
+        started = time.perf_counter()
+        for customer in customers[depth:]:
+            new_queue.get_nowait()
+            new_queue.put_nowait(customer)
+        new_elapsed = (time.perf_counter() - started) / dispatches
+
+        results.append((depth, old_elapsed, new_elapsed))
+    return results
+
+
+if __name__ == "__main__":
+    print(f"{'depth':>8} {'sort-reinsert':>15} {'SJFQueue':>12} {'speed-up':>10}")
+    for depth, old_elapsed, new_elapsed in benchmark():
+        print(f"{depth:>8} {old_elapsed * 1e6:>12.1f} us {new_elapsed * 1e6:>9.2f} us {old_elapsed / new_elapsed:>9.0f}x")
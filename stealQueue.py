@@ -0,0 +1,299 @@
+import heapq
+import itertools
+import queue
+import random
+import threading
+import time
+from collections import deque
+from operator import itemgetter
+
+from policies import REMAINING_TIME, MLFQPolicy, SJFPolicy, make_policy
+from sjfQueue import SJFQueue
+
+# Returned by the local pop/steal helpers when they found nothing
+MISSING = object()
+
+
+# Per-teller ready queues with randomized work stealing, for high teller counts.
+# Every teller owns a local queue with its own lock: a deque served oldest
+# first, or for SJF (key given) a heap keyed on key(item), FIFO among equals.
+# Arrivals go to the shorter of two randomly chosen local queues, and a
+# teller's requeued customers go back on its own queue. A teller whose queue
+# is empty steals from the others in random order: the oldest item of the
+# first non-empty queue, or for SJF the shortest job among the first `probes`
+# non-empty queues. maxsize bounds only arrivals no teller has taken yet:
+# put() reserves a slot under space_available and take() gives it back, while
+# customers put back by a teller never count. Only tellers with nothing to
+# do, taking a new arrival from a bounded queue, and arrivals waiting for
+# room touch the shared conditions, so a busy teller serving requeued work
+# never takes a lock another teller's hot path uses. steals[teller_id] counts
+# the items each teller stole. Teller ids run from 1 to num_tellers;
+# use teller(teller_id) for a view with the queue.Queue get/put interface.
+# With a quantum, next_slice() serves customer records at most that long each.
+class WorkStealingQueues:
+    def __init__(self, num_tellers, maxsize=0, key=None, probes=2, seed=None, quantum=None):
+        self.num_tellers = num_tellers
+        self.maxsize = maxsize
+        self.key = key
+        self.quantum = quantum
+        self.probes = probes
+        self.rng = random.Random(seed)
+        self.counter = itertools.count()
+        # Indexed by teller id; slot 0 is never used
+        self.locks = [threading.Lock() for _ in range(num_tellers + 1)]
+        self.queues = [deque() if key is None else [] for _ in range(num_tellers + 1)]
+        self.steals = [0] * (num_tellers + 1)
+
+        # Shared only on the idle paths
+        self.idle_tellers = 0
+        self.work_available = threading.Condition()
+        self.unstarted = 0  # Arrivals put but not yet taken; guarded by space_available
+        self.blocked_arrivals = 0
+        self.space_available = threading.Condition()
+
+    # Queues that order and slice customer records the way `policy` (a name or
+    # policies.SchedulingPolicy) does. Only orders that do not change while a
+    # customer waits can be split across tellers: FCFS, SJF and RR, not SRTF or MLFQ.
+    @classmethod
+    def for_policy(cls, num_tellers, maxsize, policy, quantum=None, seed=None):
+        policy = make_policy(policy, quantum)
+        if policy.preemptive or isinstance(policy, MLFQPolicy):
+            raise ValueError(f"{policy.name} cannot be split across per-teller queues")
+        key = itemgetter(policy.key) if isinstance(policy, SJFPolicy) else None
+        return cls(num_tellers, maxsize, key, seed=seed, quantum=policy.quantum)
+
+    def teller(self, teller_id):
+        return TellerQueue(self, teller_id)
+
+    # A bounded queue stores (item, arrival) entries, arrival being True for
+    # new arrivals whose slot take() frees; an unbounded one the bare items
+    def push(self, teller_id, item, arrival=False):
+        entry = (item, arrival) if self.maxsize > 0 else item
+        with self.locks[teller_id]:
+            if self.key is None:
+                self.queues[teller_id].append(entry)
+            else:
+                heapq.heappush(self.queues[teller_id], (self.key(item), next(self.counter), entry))
+        if self.idle_tellers:
+            with self.work_available:
+                self.work_available.notify()
+
+    def pop(self, teller_id):
+        local = self.queues[teller_id]
+        if not local:
+            return MISSING
+        with self.locks[teller_id]:
+            if not local:
+                return MISSING
+            return local.popleft() if self.key is None else heapq.heappop(local)[2]
+
+    # Other tellers' queues in random order, skipping those that look empty
+    def victims(self, thief):
+        num_tellers = self.num_tellers
+        start = self.rng.randrange(num_tellers)
+        for offset in range(num_tellers):
+            victim = (start + offset) % num_tellers + 1
+            if victim != thief and self.queues[victim]:
+                yield victim
+
+    def steal(self, thief):
+        if self.key is None:
+            for victim in self.victims(thief):
+                entry = self.pop(victim)
+                if entry is not MISSING:
+                    self.steals[thief] += 1
+                    return entry
+            return MISSING
+        # SJF: peek (without locking) at a few victims' shortest jobs and take the shortest
+        candidates = []
+        for victim in self.victims(thief):
+            try:
+                candidates.append((self.queues[victim][0][:2], victim))
+            except IndexError:
+                continue
+            if len(candidates) == self.probes:
+                break
+        for _, victim in sorted(candidates):
+            entry = self.pop(victim)
+            if entry is not MISSING:
+                self.steals[thief] += 1
+                return entry
+        return MISSING
+
+    def take(self, teller_id):
+        entry = self.pop(teller_id)
+        if entry is MISSING:
+            entry = self.steal(teller_id)
+        if entry is MISSING or not self.maxsize:
+            return entry
+        item, arrival = entry
+        if arrival:
+            with self.space_available:
+                self.unstarted -= 1
+                if self.blocked_arrivals:
+                    self.space_available.notify()
+        return item
+
+    # Next customer for teller_id: its own queue first, then a steal; blocks
+    # like queue.Queue.get() when there is nothing anywhere
+    def get(self, teller_id, block=True, timeout=None):
+        item = self.take(teller_id)
+        if item is not MISSING:
+            return item
+        if not block:
+            raise queue.Empty
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.work_available:
+            self.idle_tellers += 1
+            try:
+                while True:
+                    # Re-check after counting ourselves idle, so a push in between is not missed
+                    item = self.take(teller_id)
+                    if item is not MISSING:
+                        return item
+                    if deadline is None:
+                        self.work_available.wait()
+                    else:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise queue.Empty
+                        self.work_available.wait(remaining)
+            finally:
+                self.idle_tellers -= 1
+
+    # New arrival: bounded by maxsize like queue.Queue.put(). The slot is
+    # reserved under space_available, so concurrent puts cannot overfill it.
+    def put(self, item, block=True, timeout=None):
+        if self.maxsize > 0:
+            with self.space_available:
+                if self.unstarted >= self.maxsize:
+                    if not block:
+                        raise queue.Full
+                    deadline = None if timeout is None else time.monotonic() + timeout
+                    self.blocked_arrivals += 1
+                    try:
+                        while self.unstarted >= self.maxsize:
+                            if deadline is None:
+                                self.space_available.wait()
+                            else:
+                                remaining = deadline - time.monotonic()
+                                if remaining <= 0:
+                                    raise queue.Full
+                                self.space_available.wait(remaining)
+                    finally:
+                        self.blocked_arrivals -= 1
+                self.unstarted += 1
+        first = self.rng.randrange(1, self.num_tellers + 1)
+        second = self.rng.randrange(1, self.num_tellers + 1)
+        self.push(first if len(self.queues[first]) <= len(self.queues[second]) else second, item, True)
+
+    def put_nowait(self, item):
+        self.put(item, block=False)
+
+    def qsize(self):
+        return sum(map(len, self.queues))
+
+    def empty(self):
+        return not any(self.queues)
+
+    def full(self):
+        with self.space_available:
+            return 0 < self.maxsize <= self.unstarted
+
+
+# One teller's view of a WorkStealingQueues: get() and next_slice() serve this
+# teller, and put() and requeue() put back onto its own queue without blocking
+class TellerQueue:
+    def __init__(self, queues, teller_id):
+        self.queues = queues
+        self.teller_id = teller_id
+
+    def get(self, block=True, timeout=None):
+        return self.queues.get(self.teller_id, block, timeout)
+
+    def put(self, item, block=True, timeout=None):
+        self.queues.push(self.teller_id, item)
+
+    def requeue(self, item):
+        self.queues.push(self.teller_id, item)
+
+    # As threadedTellers.PolicyQueue: (customer, time_slice) for threadedTellers.serve()
+    def next_slice(self, timeout=None):
+        customer = self.queues.get(self.teller_id, timeout=timeout)
+        quantum, time_slice = self.queues.quantum, customer[REMAINING_TIME]
+        if quantum is not None and time_slice > quantum:
+            time_slice = quantum
+        return customer, time_slice
+
+    def complete(self, customer):
+        pass
+
+    def qsize(self):
+        return self.queues.qsize()
+
+
+def format_steals(steals):
+    by_teller = ", ".join(f"{teller_id}: {count}" for teller_id, count in enumerate(steals) if teller_id)
+    return f"Work stealing: {sum(steals)} steals (by teller {by_teller})"
+
+
+# The queue a teller should use: its own view of a work-stealing dispatcher,
+# or the shared queue itself
+def teller_queue(ready_queue, teller_id):
+    if isinstance(ready_queue, WorkStealingQueues):
+        return ready_queue.teller(teller_id)
+    return ready_queue
+
+
+# Dispatch throughput with num_tellers threads: every teller takes customers
+# until `customers` have been dispatched. "drain" starts with all of them
+# queued, so tellers that run dry steal; "requeue" keeps a few per teller in
+# circulation the way Round Robin requeues after each quantum.
+def run_dispatch(ready_queue, num_tellers, customers, pattern, seed=1):
+    rng = random.Random(seed)
+    backlog = customers if pattern == "drain" else num_tellers * 4
+    for customer_id in range(backlog):
+        ready_queue.put((rng.randint(3, 8), customer_id))
+    per_teller = customers // num_tellers
+    start = threading.Barrier(num_tellers + 1)
+
+    def teller(teller_id):
+        ready = teller_queue(ready_queue, teller_id)
+        start.wait()
+        for _ in range(per_teller):
+            item = ready.get(timeout=1)
+            if pattern == "requeue":
+                ready.put(item)
+
+    threads = [threading.Thread(target=teller, args=(teller_id,)) for teller_id in range(1, num_tellers + 1)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return per_teller * num_tellers / (time.perf_counter() - started)
+
+
+# Shared queue.Queue / SJFQueue versus WorkStealingQueues at each teller count
+def benchmark(teller_counts=(1, 4, 16, 64, 256, 512), customers=102_400, patterns=("drain", "requeue")):
+    results = []
+    for sjf in (False, True):
+        for pattern in patterns:
+            for num_tellers in teller_counts:
+                shared = SJFQueue() if sjf else queue.Queue()
+                stealing = WorkStealingQueues(num_tellers, key=(lambda item: item[0]) if sjf else None, seed=1)
+                results.append(("SJF" if sjf else "FIFO", pattern, num_tellers,
+                                run_dispatch(shared, num_tellers, customers, pattern),
+                                run_dispatch(stealing, num_tellers, customers, pattern), sum(stealing.steals)))
+    return results
+
+
+if __name__ == "__main__":
+    import sys
+
+    customers = int(sys.argv[1]) if len(sys.argv) > 1 else 102_400
+    print(f"{'queue':<6} {'pattern':<8} {'tellers':>7} {'shared/s':>12} {'stealing/s':>12} {'speed-up':>9} {'steals':>8}")
+    for kind, pattern, num_tellers, shared, stealing, steals in benchmark(customers=customers):
+        print(f"{kind:<6} {pattern:<8} {num_tellers:>7} {shared:>12,.0f} {stealing:>12,.0f} "
+              f"{stealing / shared:>8.2f}x {steals:>8,}")
@@ -0,0 +1,176 @@
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from eventEngine import CHECKPOINT_EVERY, ENGINE_VERSION, POLICIES, EventSimulator, generate_workload
+from constants import MAX_SERVICE_TIME, NUM_TELLERS, QUANTUM_TIME, QUEUE_SIZE
+from replicate import METRICS, replication_seeds, summarise
+
+CACHE_DIR = ".sweep_cache"
+PARAMETERS = ("policy", "num_tellers", "queue_size", "quantum", "max_service_time", "num_customers", "seed")
+
+
+# Expand a grid {parameter: values} into sweep points, one per seed.
+# The quantum only affects time-sliced policies (RR, MLFQ), so the others drop it and are not run twice.
+def expand_grid(grid, seeds):
+    points = []
+    seen = set()
+    names = ("policy", "num_tellers", "queue_size", "quantum", "max_service_time", "num_customers")
+    for values in itertools.product(*(grid[name] for name in names)):
+        point = dict(zip(names, values))
+        if not POLICIES[point["policy"]].needs_quantum:
+            point["quantum"] = None
+        for seed in seeds:
+            key = tuple(point.values()) + (seed,)
+            if key not in seen:
+                seen.add(key)
+                points.append({**point, "seed": seed})
+    return points
+
+
+# Cache key of a point; includes the engine version so results cached before
+# an engine change are recomputed after it
+def point_key(point):
+    canonical = json.dumps([ENGINE_VERSION] + [point[name] for name in PARAMETERS])
+    return hashlib.sha1(canonical.encode()).hexdigest()
+
+
+def cache_path(cache_dir, point):
+    return os.path.join(cache_dir, point_key(point) + ".json")
+
+
+def load_cached(cache_dir, point):
+    try:
+        with open(cache_path(cache_dir, point)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+# Write through a temporary file so an interrupted sweep never leaves a half-written entry
+def store_cached(cache_dir, point, summary):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = cache_path(cache_dir, point)
+    with open(path + ".tmp", "w") as f:
+        json.dump(summary, f)
+    os.replace(path + ".tmp", path)
+
+
+def checkpoint_path(cache_dir, point):
+    return os.path.join(cache_dir, point_key(point) + ".ckpt")
+
+
+# Run one point as replicate.run_replication() would. With a cache directory
+# the run is checkpointed there every `checkpoint_every` events, and a point
+# interrupted by an earlier sweep resumes from its last checkpoint.
+def run_point(point, cache_dir=None, checkpoint_every=CHECKPOINT_EVERY):
+    workload = generate_workload(point["num_customers"], point["seed"], max_service_time=point["max_service_time"])
+    if cache_dir is None:
+        sim = EventSimulator(point["policy"], point["num_tellers"], point["quantum"], point["queue_size"]).run(workload)
+        return summarise(sim)
+    os.makedirs(cache_dir, exist_ok=True)
+    checkpoint = checkpoint_path(cache_dir, point)
+    if os.path.exists(checkpoint):
+        sim = EventSimulator.load(checkpoint, workload).resume(checkpoint, checkpoint_every)
+    else:
+        sim = EventSimulator(point["policy"], point["num_tellers"], point["quantum"], point["queue_size"])
+        sim.run(workload, checkpoint, checkpoint_every)
+    return summarise(sim)
+
+
+# Flatten a point and its summary into one tidy row
+def to_row(point, summary):
+    row = {name: point[name] for name in PARAMETERS}
+    row["served"] = summary["served"]
+    row["dropped"] = summary["dropped"]
+    for metric in METRICS:
+        for stat, value in summary[metric].items():
+            row[f"{metric[:-1]}_{stat}"] = value
+    return row
+
+
+# Run every point of the grid, reusing cached results, and return tidy rows in grid order
+def run_sweep(grid, seeds, cache_dir=CACHE_DIR, max_workers=None, checkpoint_every=CHECKPOINT_EVERY):
+    points = expand_grid(grid, seeds)
+    summaries = [load_cached(cache_dir, point) for point in points]
+    missing = [i for i, summary in enumerate(summaries) if summary is None]
+    print(f"{len(points)} points, {len(points) - len(missing)} cached, {len(missing)} to run")
+    if missing:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(partial(run_point, cache_dir=cache_dir, checkpoint_every=checkpoint_every),
+                                   [points[i] for i in missing],
+                                   chunksize=max(1, len(missing) // ((os.cpu_count() or 1) * 4)))
+            for i, summary in zip(missing, results):
+                store_cached(cache_dir, points[i], summary)
+                summaries[i] = summary
+                if os.path.exists(checkpoint_path(cache_dir, points[i])):
+                    os.remove(checkpoint_path(cache_dir, points[i]))
+    return [to_row(point, summary) for point, summary in zip(points, summaries)]
+
+
+def write_rows(rows, path):
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+# Parse "3", "1,2,4" or "start:stop[:step]" (stop inclusive) into a list of values
+def parse_values(text, cast=int):
+    values = []
+    for part in text.split(","):
+        if part == "none":
+            values.append(None)
+        elif ":" in part:
+            start, stop, *step = part.split(":")
+            step = cast(step[0]) if step else cast(1)
+            value = cast(start)
+            while value <= cast(stop):
+                values.append(value)
+                value += step
+        else:
+            values.append(cast(part))
+    return values
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep scheduler parameters on the event engine")
+    parser.add_argument("--policies", default=",".join(POLICIES))
+    parser.add_argument("--tellers", default=str(NUM_TELLERS))
+    parser.add_argument("--queue-size", default=str(QUEUE_SIZE), help="use 'none' for an unbounded queue")
+    parser.add_argument("--quantum", default=str(QUANTUM_TIME))
+    parser.add_argument("--max-service-time", default=str(MAX_SERVICE_TIME))
+    parser.add_argument("--customers", type=int, default=50)
+    parser.add_argument("--replications", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0, help="master seed for the replication seeds")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--checkpoint-every", type=int, default=CHECKPOINT_EVERY,
+                        help="events between checkpoints of a running point, kept in the cache directory")
+    parser.add_argument("--output", default="sweepData.csv")
+    args = parser.parse_args()
+
+    grid = {
+        "policy": args.policies.split(","),
+        "num_tellers": parse_values(args.tellers),
+        "queue_size": parse_values(args.queue_size),
+        "quantum": parse_values(args.quantum, float),
+        "max_service_time": parse_values(args.max_service_time),
+        "num_customers": [args.customers],
+    }
+    unknown = set(grid["policy"]) - set(POLICIES)
+    if unknown:
+        sys.exit(f"Unknown policies: {', '.join(sorted(unknown))}")
+    # Checked here rather than in a worker process, where EventSimulator would raise
+    sliced = [policy for policy in grid["policy"] if POLICIES[policy].needs_quantum]
+    if sliced and None in grid["quantum"]:
+        sys.exit(f"--quantum none is not valid for time-sliced policies: {', '.join(sliced)}")
+    rows = run_sweep(grid, replication_seeds(args.seed, args.replications), args.cache_dir,
+                     checkpoint_every=args.checkpoint_every)
+    write_rows(rows, args.output)
+    print(f"Wrote {len(rows)} rows to {args.output}")
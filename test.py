@@ -1,216 +1,136 @@
 import threading
-import queue
 import random
+import sys
 import time
-from queue import PriorityQueue
-import matplotlib.pyplot as plt
-
-class Customer:
-    def __init__(self, id, service_time):
-        self.id = id
-        self.service_time = service_time
-        self.remaining_time = service_time
-        self.arrival_time = time.time()
-        self.start_time = None
-        self.end_time = None
-
-    def start_service(self):
-        self.start_time = time.time()
-
-    def end_service(self):
-        self.end_time = time.time()
-    
-    def turnaround_time(self):
-        return self.end_time - self.arrival_time
-    
-    def waiting_time(self):
-        return self.start_time - self.arrival_time
-    
-    def response_time(self):
-        return self.start_time - self.arrival_time
 
-
-def fcfs_scheduler():
-    customer_queue = queue.Queue(MAX_QUEUE_SIZE)
+from accumulators import ShardedStats, StreamingStats
+from completion import CompletionTracker
+from eventLog import DEPARTURE, DISPATCH, DROP, ENQUEUE, WARNING, EventLog, from_argv
+from policies import ARRIVAL_TIME, CUSTOMER_ID, FIRST_START_TIME
+from report import report_from_argv
+from simClock import clock, format_overshoot, from_argv as clock_from_argv
+from threadedTellers import STOP, PolicyQueue, new_customer, serve
+
+# CPU time used by each scheduler thread: name -> (CPU seconds, wall seconds)
+thread_cpu_times = {}
+
+
+# Start target in a named thread that records its own CPU time when it finishes
+def start_thread(name, target, *args):
+    def run():
+        started = time.monotonic()
+        try:
+            target(*args)
+        finally:
+            thread_cpu_times[name] = (time.thread_time(), time.monotonic() - started)
+
+    t = threading.Thread(target=run, name=name)
+    t.start()
+    return t
+
+
+def print_cpu_times():
+    for name, (cpu_time, wall_time) in thread_cpu_times.items():
+        print(f"{name}: {cpu_time:.3f}s CPU over {wall_time:.1f}s ({cpu_time / wall_time:.1%})")
+    thread_cpu_times.clear()
+
+
+# One run: NUM_TELLERS threads serve a threadedTellers.PolicyQueue scheduled by
+# `policy` while arrivals come in for SIMULATION_TIME, then the queue drains
+def run_scheduler(policy, quantum=None):
+    # Arrivals are bounded by MAX_QUEUE_SIZE; requeueing after a quantum never blocks
+    customer_queue = PolicyQueue(policy, MAX_QUEUE_SIZE, quantum)
+    completion = CompletionTracker()
+    stop_arrivals = threading.Event()
     teller_threads = []
 
-    def teller(teller_id):
-        while True:
-            customer = customer_queue.get()
-            if customer is None:
-                break
-            customer.start_service()
-            print(f"Customer {customer.id} is in Teller {teller_id}")
-            time.sleep(customer.service_time)
-            customer.end_service()
-            print(f"Customer {customer.id} leaves Teller {teller_id}")
-            customer_queue.task_done()
-            log_metrics(customer)
+    def started(teller_id, customer, start_time):
+        event_log.record(DISPATCH, customer[CUSTOMER_ID], teller_id)
 
-    def generate_customers():
-        customer_id = 1
-        while True:
-            time.sleep(random.randint(*ARRIVAL_INTERVAL))
-            if not customer_queue.full():
-                service_time = random.randint(MIN_SERVICE_TIME, MAX_SERVICE_TIME)
-                customer = Customer(customer_id, service_time)
-                print(f"Customer {customer_id} enters the Queue")
-                customer_queue.put(customer)
-                customer_id += 1
-            else:
-                print("Queue is FULL.")
+    def requeued(teller_id, customer):
+        completion.requeue()
 
-    for i in range(NUM_TELLERS):
-        t = threading.Thread(target=teller, args=(i + 1,))
-        t.start()
-        teller_threads.append(t)
-
-    threading.Thread(target=generate_customers).start()
-
-    time.sleep(SIMULATION_TIME)
-    for i in range(NUM_TELLERS):
-        customer_queue.put(None)
-    for t in teller_threads:
-        t.join()
-
-
-def sjf_scheduler():
-    customer_queue = PriorityQueue()
-    teller_threads = []
+    def departed(teller_id, customer, start_time, end_time):
+        event_log.record(DEPARTURE, customer[CUSTOMER_ID], teller_id)
+        log_metrics(customer, start_time, end_time, teller_id)
+        completion.depart()
 
     def teller(teller_id):
-        while True:
-            if customer_queue.empty():
-                continue
-            _, customer = customer_queue.get()
-            if customer is None:
-                break
-            customer.start_service()
-            print(f"Customer {customer.id} is in Teller {teller_id}")
-            time.sleep(customer.service_time)
-            customer.end_service()
-            print(f"Customer {customer.id} leaves Teller {teller_id}")
-            log_metrics(customer)
+        serve(teller_id, customer_queue, departed, started, requeued)
 
     def generate_customers():
         customer_id = 1
-        while True:
-            time.sleep(random.randint(*ARRIVAL_INTERVAL))
-            if customer_queue.qsize() < MAX_QUEUE_SIZE:
+        while not clock.wait(stop_arrivals, random.randint(*ARRIVAL_INTERVAL)):
+            if not customer_queue.full():
                 service_time = random.randint(MIN_SERVICE_TIME, MAX_SERVICE_TIME)
-                customer = Customer(customer_id, service_time)
-                print(f"Customer {customer_id} enters the Queue")
-                customer_queue.put((service_time, customer))
-                customer_id += 1
+                event_log.record(ENQUEUE, customer_id, value=service_time)
+                completion.admit()
+                customer_queue.put(new_customer(customer_id, clock.time(), service_time))
             else:
-                print("Queue is FULL.")
+                event_log.record(DROP, customer_id, level=WARNING)
+            customer_id += 1
 
     for i in range(NUM_TELLERS):
-        t = threading.Thread(target=teller, args=(i + 1,))
-        t.start()
-        teller_threads.append(t)
+        teller_threads.append(start_thread(f"Teller {i + 1}", teller, i + 1))
 
-    threading.Thread(target=generate_customers).start()
+    generator = start_thread("Arrivals", generate_customers)
 
-    time.sleep(SIMULATION_TIME)
+    clock.sleep(SIMULATION_TIME)
+    stop_arrivals.set()
+    generator.join()
+    # Customers may still be waiting or circulating after arrivals stop; send the sentinels once the last one leaves
+    completion.close()
+    completion.wait()
     for i in range(NUM_TELLERS):
-        customer_queue.put((0, None))
+        customer_queue.put(STOP)
     for t in teller_threads:
         t.join()
 
 
-def rr_scheduler(quantum):
-    customer_queue = queue.Queue(MAX_QUEUE_SIZE)
-    teller_threads = []
-    lock = threading.Lock()
+def fcfs_scheduler():
+    run_scheduler("FCFS")
 
-    def teller(teller_id):
-        while True:
-            customer = None
-            with lock:
-                if not customer_queue.empty():
-                    customer = customer_queue.get()
-            if customer is None:
-                continue
-            customer.start_service()
-            print(f"Customer {customer.id} is in Teller {teller_id}")
-            if customer.remaining_time <= quantum:
-                time.sleep(customer.remaining_time)
-                customer.end_service()
-                print(f"Customer {customer.id} leaves Teller {teller_id}")
-                log_metrics(customer)
-            else:
-                time.sleep(quantum)
-                customer.remaining_time -= quantum
-                with lock:
-                    customer_queue.put(customer)
-            customer_queue.task_done()
 
-    def generate_customers():
-        customer_id = 1
-        while True:
-            time.sleep(random.randint(*ARRIVAL_INTERVAL))
-            if not customer_queue.full():
-                service_time = random.randint(MIN_SERVICE_TIME, MAX_SERVICE_TIME)
-                customer = Customer(customer_id, service_time)
-                print(f"Customer {customer_id} enters the Queue")
-                customer_queue.put(customer)
-                customer_id += 1
-            else:
-                print("Queue is FULL.")
+def sjf_scheduler():
+    run_scheduler("SJF")
 
-    for i in range(NUM_TELLERS):
-        t = threading.Thread(target=teller, args=(i + 1,))
-        t.start()
-        teller_threads.append(t)
 
-    threading.Thread(target=generate_customers).start()
+def rr_scheduler(quantum):
+    run_scheduler("RR", quantum)
 
-    time.sleep(SIMULATION_TIME)
-    for t in teller_threads:
-        t.join()
 
+def new_metrics():
+    return {
+        'turnaround_times': StreamingStats(),
+        'waiting_times': StreamingStats(),
+        'response_times': StreamingStats()
+    }
 
-metrics = {
-    'turnaround_times': [],
-    'waiting_times': [],
-    'response_times': []
-}
+metrics = new_metrics()
 
-def log_metrics(customer):
-    metrics['turnaround_times'].append(customer.turnaround_time())
-    metrics['waiting_times'].append(customer.waiting_time())
-    metrics['response_times'].append(customer.response_time())
+# Per-teller buffers, so concurrent tellers never update the same accumulator;
+# merged into metrics by calculate_averages() once the tellers have stopped
+teller_stats = ShardedStats(('turnaround_times', 'waiting_times', 'response_times'))
+
+def log_metrics(customer, start_time, end_time, teller_id):
+    stats = teller_stats.shard(teller_id)
+    stats['turnaround_times'].add(end_time - customer[ARRIVAL_TIME])
+    stats['waiting_times'].add(start_time - customer[ARRIVAL_TIME])
+    stats['response_times'].add(customer[FIRST_START_TIME] - customer[ARRIVAL_TIME])
 
 def calculate_averages():
-    avg_turnaround_time = sum(metrics['turnaround_times']) / len(metrics['turnaround_times'])
-    avg_waiting_time = sum(metrics['waiting_times']) / len(metrics['waiting_times'])
-    avg_response_time = sum(metrics['response_times']) / len(metrics['response_times'])
+    event_log.flush()  # Console events first, so they do not land inside the stats block
+    teller_stats.merge_into(metrics)
+    teller_stats.clear()
+    avg_turnaround_time = metrics['turnaround_times'].mean
+    avg_waiting_time = metrics['waiting_times'].mean
+    avg_response_time = metrics['response_times'].mean
     return avg_turnaround_time, avg_waiting_time, avg_response_time
 
-def plot_metrics():
-    plt.figure(figsize=(10, 5))
-
-    plt.subplot(131)
-    plt.hist(metrics['turnaround_times'], bins=20, alpha=0.7, color='blue')
-    plt.title('Turnaround Times')
-    plt.xlabel('Time')
-    plt.ylabel('Frequency')
-
-    plt.subplot(132)
-    plt.hist(metrics['waiting_times'], bins=20, alpha=0.7, color='green')
-    plt.title('Waiting Times')
-    plt.xlabel('Time')
-    plt.ylabel('Frequency')
-
-    plt.subplot(133)
-    plt.hist(metrics['response_times'], bins=20, alpha=0.7, color='red')
-    plt.title('Response Times')
-    plt.xlabel('Time')
-    plt.ylabel('Frequency')
-
-    plt.tight_layout()
-    plt.show()
+# Queue the histograms for this scheduler's run; drawn by report.render() at the end
+def plot_metrics(name):
+    if report is not None:
+        report.histograms(name, metrics)
 
 
 NUM_TELLERS = 3
@@ -220,16 +140,32 @@ MAX_SERVICE_TIME = 5
 ARRIVAL_INTERVAL = (1, 3)  # Range for random arrival intervals
 SIMULATION_TIME = 30  # Duration to run the simulation
 
+# Charts for this run; set from --report DIR, None skips plotting entirely
+report = None
+
+# Buffered event log for the teller hot paths; written by a background thread once started
+event_log = EventLog()
+
 if __name__ == '__main__':
+    # Optional: --report DIR renders each scheduler's histograms to PNG files once all runs end
+    report = report_from_argv(sys.argv)
+    # Optional: --speedup N runs the schedulers N times faster; times stay in simulated seconds
+    clock_from_argv(sys.argv)
+    # Optional: --log-level debug|info|warning|off and --log-file events.ndjson|events.bin
+    event_log = from_argv(sys.argv).start()
+
     print("Starting FCFS Scheduler")
     fcfs_scheduler()
     avg_turnaround, avg_waiting, avg_response = calculate_averages()
     print(f"FCFS Average Turnaround Time: {avg_turnaround}")
     print(f"FCFS Average Waiting Time: {avg_waiting}")
     print(f"FCFS Average Response Time: {avg_response}")
-    plot_metrics()
+    print_cpu_times()
+    print(format_overshoot(clock.report()))
+    clock.reset()
+    plot_metrics("FCFS histograms")
 
-    metrics = {'turnaround_times': [], 'waiting_times': [], 'response_times': []}
+    metrics = new_metrics()
     
     print("Starting SJF Scheduler")
     sjf_scheduler()
@@ -237,9 +173,12 @@ if __name__ == '__main__':
     print(f"SJF Average Turnaround Time: {avg_turnaround}")
     print(f"SJF Average Waiting Time: {avg_waiting}")
     print(f"SJF Average Response Time: {avg_response}")
-    plot_metrics()
+    print_cpu_times()
+    print(format_overshoot(clock.report()))
+    clock.reset()
+    plot_metrics("SJF histograms")
 
-    metrics = {'turnaround_times': [], 'waiting_times': [], 'response_times': []}
+    metrics = new_metrics()
 
     quantum = 2  # Quantum time for Round Robin
     print("Starting Round Robin Scheduler")
@@ -248,4 +187,12 @@ if __name__ == '__main__':
     print(f"RR Average Turnaround Time: {avg_turnaround}")
     print(f"RR Average Waiting Time: {avg_waiting}")
     print(f"RR Average Response Time: {avg_response}")
-    plot_metrics()
+    print_cpu_times()
+    print(format_overshoot(clock.report()))
+    clock.reset()
+    plot_metrics("Round Robin histograms")
+    event_log.close()
+
+    if report is not None:
+        for path in report.render():
+            print(f"Wrote {path}")
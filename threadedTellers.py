@@ -0,0 +1,133 @@
+import queue
+import time
+
+from policies import CUSTOMER_ID, FIRST_START_TIME, REMAINING_TIME, make_policy
+from simClock import clock
+
+# Put once per teller to make it exit. A customer record with no id; its
+# infinite service time sorts it after every customer in a heap keyed on time.
+STOP = (None, None, float("inf"), float("inf"), None)
+
+
+# A policies customer record for the threaded tellers
+def new_customer(customer_id, arrival_time, service_time):
+    return [customer_id, arrival_time, service_time, service_time, None]
+
+
+# Bounded, thread-safe ready queue that schedules with a policies.SchedulingPolicy
+# (or its name), so the threaded tellers order and slice customers exactly as
+# eventEngine.EventSimulator does. Built on queue.Queue like SJFQueue, so all
+# locking happens on the queue's own mutex and put() keeps the usual blocking,
+# timeout and maxsize behaviour. Items are customer records (new_customer());
+# STOP records are kept outside the policy and handed out only once no customer
+# is waiting. maxsize bounds only admitted customers that have not been served
+# yet, as in RoundRobinQueue, so customers given back after a slice never turn
+# new arrivals away. get() returns (customer, time_slice): the policy's quantum
+# for the customer, or all of its remaining time. Tellers give back a customer
+# with work left through requeue(), which never blocks, and report departures
+# through complete().
+class PolicyQueue(queue.Queue):
+    def __init__(self, policy, maxsize=0, quantum=None):
+        self.policy = make_policy(policy, quantum)
+        super().__init__(maxsize)
+
+    def _init(self, maxsize):
+        self.stops = []
+        self.unstarted = 0  # Admitted customers that have not been served yet
+
+    def _qsize(self):
+        return len(self.policy) + len(self.stops)
+
+    # queue.Queue.put(), bounded by the customers still waiting for their first slice
+    def put(self, item, block=True, timeout=None):
+        with self.not_full:
+            if self.maxsize > 0 and item[CUSTOMER_ID] is not None:
+                if not block:
+                    if self.unstarted >= self.maxsize:
+                        raise queue.Full
+                elif timeout is None:
+                    while self.unstarted >= self.maxsize:
+                        self.not_full.wait()
+                else:
+                    deadline = time.monotonic() + timeout
+                    while self.unstarted >= self.maxsize:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise queue.Full
+                        self.not_full.wait(remaining)
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def _put(self, customer):
+        if customer[CUSTOMER_ID] is None:
+            self.stops.append(customer)
+            return
+        self.unstarted += 1
+        self.policy.on_arrival(customer, clock.time())
+
+    def _get(self):
+        if not len(self.policy):
+            return self.stops.pop(), None
+        customer = self.policy.select_next(clock.time())
+        if customer[FIRST_START_TIME] is None:
+            self.unstarted -= 1
+        # Read after select_next(): a policy may vary the quantum per customer
+        quantum, time_slice = self.policy.quantum, customer[REMAINING_TIME]
+        if quantum is not None and time_slice > quantum:
+            time_slice = quantum
+        return customer, time_slice
+
+    # The next customer and how long to serve it, as get()
+    def next_slice(self, timeout=None):
+        return self.get(timeout=timeout)
+
+    def full(self):
+        with self.mutex:
+            return 0 < self.maxsize <= self.unstarted
+
+    # Give back a customer whose slice ended with work left
+    def requeue(self, customer):
+        with self.mutex:
+            self.policy.on_quantum_expired(customer, clock.time())
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def complete(self, customer):
+        with self.mutex:
+            self.policy.on_complete(customer, clock.time())
+
+
+# The teller loop every threaded simulator runs. The ready queue decides who
+# goes next and for how long (next_slice() returns (customer, time_slice));
+# the teller serves that slice, then gives the customer back with requeue() if
+# work is left or reports it with complete() if not. The callbacks run on the
+# teller's own thread:
+#   on_start(teller_id, customer, start_time)            a slice begins
+#   on_requeue(teller_id, customer)                       a slice ended with work left
+#   on_depart(teller_id, customer, start_time, end_time)  the customer leaves
+# FIRST_START_TIME is set on a customer's first slice. The loop ends on a STOP
+# record, or within a second of stop_event being set.
+def serve(teller_id, ready, on_depart, on_start=None, on_requeue=None, stop_event=None):
+    while stop_event is None or not stop_event.is_set():
+        try:
+            customer, time_slice = ready.next_slice(timeout=1)
+        except queue.Empty:
+            continue
+        if customer[CUSTOMER_ID] is None:
+            break
+        start_time = clock.time()
+        if customer[FIRST_START_TIME] is None:
+            customer[FIRST_START_TIME] = start_time
+        if on_start is not None:
+            on_start(teller_id, customer, start_time)
+        clock.sleep(time_slice)
+        if time_slice < customer[REMAINING_TIME]:
+            customer[REMAINING_TIME] -= time_slice
+            if on_requeue is not None:
+                on_requeue(teller_id, customer)
+            ready.requeue(customer)
+        else:
+            ready.complete(customer)
+            on_depart(teller_id, customer, start_time, clock.time())
+
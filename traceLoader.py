@@ -0,0 +1,143 @@
+import csv
+import mmap
+import os
+import struct
+import sys
+
+from simClock import clock
+
+# Binary trace layout: a header followed by fixed-size little-endian records
+# of (arrival_time: double, service_time: double, customer_class: int32)
+MAGIC = b"SCHT"
+VERSION = 1
+HEADER = struct.Struct("<4sHHQ")  # magic, version, record size, record count
+RECORD = struct.Struct("<ddi")
+CHUNK_RECORDS = 65536
+
+
+# Stream (arrival_time, service_time, customer_class) from a CSV file.
+# Accepts arrival_time/service_time[/class] columns, read one row at a time, or
+# the "Arrival Time", "Start Time" and "End Time" columns written by the
+# threaded simulators (service time is then End - Start). Those files are
+# written in completion order, so their rows are read whole and sorted by
+# arrival time; they hold one run's customers, never a long trace.
+def read_csv_trace(path):
+    records = _read_csv_rows(path)
+    if next(records):
+        return iter(sorted(records, key=lambda record: record[0]))
+    return records
+
+
+# The CSV rows as records, preceded by whether the file is a simulator's output
+def _read_csv_rows(path):
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = [name.strip().lower().replace(" ", "_") for name in next(reader)]
+        arrival_column = header.index("arrival_time")
+        if "service_time" in header:
+            service_column = header.index("service_time")
+            start_column = end_column = None
+        elif "start_time" in header and "end_time" in header:
+            service_column = None
+            start_column, end_column = header.index("start_time"), header.index("end_time")
+        else:
+            raise ValueError(f"{path}: need a service_time column or start_time and end_time columns")
+        class_column = header.index("class") if "class" in header else None
+        yield service_column is None
+
+        for row in reader:
+            if not row:
+                continue
+            arrival_time = float(row[arrival_column])
+            if service_column is not None:
+                service_time = float(row[service_column])
+            else:
+                service_time = float(row[end_column]) - float(row[start_column])
+            customer_class = int(row[class_column]) if class_column is not None else 0
+            yield arrival_time, service_time, customer_class
+
+
+# Stream records from a memory-mapped binary trace, one chunk of records at a time
+def read_binary_trace(path):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            raise ValueError(f"{path}: not a binary trace")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            magic, version, record_size, count = HEADER.unpack_from(mapped, 0)
+            if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+                raise ValueError(f"{path}: not a version {VERSION} binary trace")
+            view = memoryview(mapped)
+            try:
+                offset = HEADER.size
+                end = offset + count * RECORD.size
+                released = 0
+                while offset < end:
+                    chunk_end = min(end, offset + CHUNK_RECORDS * RECORD.size)
+                    yield from RECORD.iter_unpack(view[offset:chunk_end])
+                    offset = chunk_end
+                    # Drop pages already consumed so resident memory stays at about one chunk
+                    page_end = offset - offset % mmap.PAGESIZE
+                    if hasattr(mapped, "madvise") and page_end > released:
+                        mapped.madvise(mmap.MADV_DONTNEED, released, page_end - released)
+                        released = page_end
+            finally:
+                view.release()
+
+
+# Write records to a binary trace; returns the number of records written
+def write_binary_trace(records, path):
+    count = 0
+    with open(path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, 0))
+        buffer = bytearray()
+        for arrival_time, service_time, *rest in records:
+            buffer += RECORD.pack(arrival_time, service_time, rest[0] if rest else 0)
+            count += 1
+            if len(buffer) >= CHUNK_RECORDS * RECORD.size:
+                f.write(buffer)
+                buffer.clear()
+        f.write(buffer)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, RECORD.size, count))
+    return count
+
+
+# Ensure arrivals never go backwards and, optionally, shift them so the trace starts at 0
+def ordered(records, rebase=True):
+    first = None
+    previous = None
+    for arrival_time, service_time, customer_class in records:
+        if first is None:
+            first = arrival_time if rebase else 0.0
+        arrival_time -= first
+        if previous is not None and arrival_time < previous:
+            raise ValueError(f"Trace is not sorted by arrival time ({arrival_time} after {previous})")
+        previous = arrival_time
+        yield arrival_time, service_time, customer_class
+
+
+# Open a trace by extension: .csv is parsed as text, anything else as the binary format
+def load_trace(path, rebase=True):
+    if path.endswith(".csv"):
+        return ordered(read_csv_trace(path), rebase)
+    return ordered(read_binary_trace(path), rebase)
+
+
+# Feed trace records to a threaded simulator on the shared simulated clock:
+# sleep until each customer's arrival offset, then call submit(customer_id, service_time)
+def replay(records, submit, stop_event=None):
+    started = clock.time()
+    for customer_id, (arrival_time, service_time, _) in enumerate(records, start=1):
+        if stop_event is not None and stop_event.is_set():
+            break
+        delay = started + arrival_time - clock.time()
+        if delay > 0:
+            clock.sleep(delay)
+        submit(customer_id, service_time)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        sys.exit("usage: python traceLoader.py <trace.csv> <trace.bin>  (convert CSV to the binary format)")
+    written = write_binary_trace(read_csv_trace(sys.argv[1]), sys.argv[2])
+    print(f"Wrote {written} records to {sys.argv[2]}")